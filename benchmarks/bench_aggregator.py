@@ -0,0 +1,59 @@
+##------------------------------------------------------------------------------
+## Worker processes logging through the vlogging aggregator of the parent,
+## which writes every record to one file.
+##
+## Usage:
+## python benchmarks/bench_aggregator.py [processes] [records]
+##------------------------------------------------------------------------------
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import common
+import vlogging
+from vlogging import aggregator
+
+
+def work(count: int) -> None:
+    logger = vlogging.getLogger("vlogging.bench.worker")
+    for i in range(count):
+        logger.info("worker %d record %d %s", os.getpid(), i, "x" * 80)
+
+
+def run(processes: int, count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "bench.log")
+        vlogging.basicConfig(filename=filename, format=vlogging.formatters.BASIC_FORMAT,
+                             level="INFO")
+        server = aggregator.start()
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=work, args=(count,)) for _ in range(processes)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        total = processes * count
+        while server.received < total:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        aggregator.stop()
+        vlogging.basicConfig()
+        with open(filename) as f:
+            lines = f.read().splitlines()
+        common.report(f"aggregator ({processes} processes)", total, elapsed)
+        print(f"{'':<48} {len(lines)} lines")
+
+
+def main() -> None:
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    for n in sorted({1, processes // 2 or 1, processes}):
+        run(n, count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+##------------------------------------------------------------------------------
+## Event loop lag under heavy logging, vlogging.info against vlogging.aio.info.
+##
+## Usage:
+## python benchmarks/bench_aio.py
+##------------------------------------------------------------------------------
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import common
+import vlogging
+import vlogging.aio
+
+TICK = 0.001
+RECORDS = 20000
+
+
+class SlowHandler(logging.Handler):
+    """Stands in for a stderr pipe to a slow log collector."""
+
+    count = 0
+
+    def emit(self, record):
+        self.count += 1
+        if self.count % 50 == 0:
+            time.sleep(0.002)
+
+
+async def ticker(lags: list, stopped: asyncio.Event) -> None:
+    while not stopped.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def producer(log, count: int) -> None:
+    for i in range(count):
+        log("request %d handled %s", i, "x" * 100)
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+
+
+async def run(log) -> list:
+    lags = []
+    stopped = asyncio.Event()
+    task = asyncio.create_task(ticker(lags, stopped))
+    await asyncio.gather(*(producer(log, RECORDS // 4) for _ in range(4)))
+    stopped.set()
+    await task
+    await vlogging.aio.flush()
+    return lags
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for sink in ("file", "slow pipe"):
+            vlogging.basicConfig(filename=os.path.join(tmpdir, "bench.log"))
+            if sink == "slow pipe":
+                logging.getLogger(vlogging.DEFAUT_LOGGER).addHandler(SlowHandler())
+            for name, log in (("vlogging.info", vlogging.info),
+                              ("vlogging.aio.info", vlogging.aio.info)):
+                start = time.perf_counter()
+                lags = asyncio.run(run(log))
+                common.report(f"{name} ({sink})", RECORDS, time.perf_counter() - start)
+                print(f"{'':<48} loop lag p50 {percentile(lags, 0.5) * 1000:.3f} ms"
+                      f" p99 {percentile(lags, 0.99) * 1000:.3f} ms"
+                      f" max {max(lags) * 1000:.3f} ms")
+        asyncio.run(vlogging.aio.shutdown())
+
+
+if __name__ == "__main__":
+    main()
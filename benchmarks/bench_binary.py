@@ -0,0 +1,50 @@
+##------------------------------------------------------------------------------
+## BinaryFileHandler against a FileHandler with SIMPLE_FORMAT and
+## BASIC_FORMAT, and the size of the files they write.
+##
+## Usage:
+## python benchmarks/bench_binary.py
+##------------------------------------------------------------------------------
+
+import logging
+import os
+import tempfile
+
+import common
+from vlogging import handlers
+from vlogging.formatters import (
+    SIMPLE_FORMAT,
+    BASIC_FORMAT,
+    Formatter,
+)
+
+COUNT = 100000
+
+
+def run(handler, record) -> None:
+    handle = handler.handle
+    for _ in range(COUNT):
+        handle(record)
+    handler.flush()
+
+
+def main() -> None:
+    record = logging.LogRecord("bench", logging.DEBUG, __file__, 10,
+                               "request %s took %d ms (%.3f)", ("GET /index", 12, 0.25), None)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, fmt in (("SIMPLE_FORMAT", SIMPLE_FORMAT), ("BASIC_FORMAT", BASIC_FORMAT)):
+            filename = os.path.join(directory, f"{name}.log")
+            handler = handlers.FileHandler(filename, "w")
+            handler.setFormatter(Formatter(fmt))
+            common.report(f"FileHandler {name}", COUNT, common.measure(run, handler, record, repeat=1))
+            handler.close()
+            print(f"{'':<48} {os.path.getsize(filename):>8} bytes")
+        filename = os.path.join(directory, "binary.vlog")
+        handler = handlers.BinaryFileHandler(filename, "w")
+        common.report("BinaryFileHandler", COUNT, common.measure(run, handler, record, repeat=1))
+        handler.close()
+        print(f"{'':<48} {os.path.getsize(filename):>8} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+##------------------------------------------------------------------------------
+## Per request context: Logger.bind against logging.LoggerAdapter and a new
+## logger name per request.
+##
+## Usage:
+## python benchmarks/bench_bind.py
+##------------------------------------------------------------------------------
+
+import itertools
+import logging
+import os
+
+import common
+import vlogging
+
+COUNT = 10000
+CALLS = 10
+
+_run = itertools.count()
+
+
+class ContextAdapter(logging.LoggerAdapter):
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return msg, kwargs
+
+
+def requests(makeLogger) -> None:
+    for i in range(COUNT):
+        logger = makeLogger(i)
+        for _ in range(CALLS):
+            logger.info("handled %s", "GET /index")
+
+
+def main() -> None:
+    vlogging.basicConfig(format="%(levelname)s %(requestId)s %(message)s",
+                         filename=os.devnull, level="DEBUG")
+    logger = vlogging.getLogger("bench.bind")
+    prefix = f"bench.bind{next(_run)}"
+    total = COUNT * CALLS
+    common.report("Logger.bind", total,
+                  common.measure(requests, lambda i: logger.bind(requestId=i)))
+    common.report("LoggerAdapter", total,
+                  common.measure(requests, lambda i: ContextAdapter(logger, {"requestId": i})))
+    names = len(logging.Logger.manager.loggerDict)
+
+    def named(i):
+        child = vlogging.getLogger(f"{prefix}.{i}")
+        return ContextAdapter(child, {"requestId": i})
+
+    common.report("getLogger per request", total, common.measure(requests, named, repeat=1))
+    print(f"loggers registered by getLogger per request: "
+          f"{len(logging.Logger.manager.loggerDict) - names}")
+    vlogging.basicConfig()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+##------------------------------------------------------------------------------
+## Calls per second of disabled log calls, through a stdlib logger, a vlogging
+## logger and the vlogging module functions.
+##
+## Usage:
+## python benchmarks/bench_disabled.py
+##------------------------------------------------------------------------------
+
+import logging
+
+import common
+import vlogging
+
+COUNT = 1000000
+
+
+def run(debug) -> None:
+    for _ in range(COUNT):
+        debug("value %s", 1)
+
+
+def main() -> None:
+    vlogging.basicConfig(level="INFO")
+    stdlib = logging.Logger("bench.stdlib")
+    stdlib.setLevel(logging.INFO)
+    logger = vlogging.getLogger("bench.disabled")
+    assert not logger.isEnabledFor(logging.DEBUG)
+
+    common.report("logging.Logger.debug", COUNT, common.measure(run, stdlib.debug))
+    # The class method still checks isEnabledFor, as before the rebinding.
+    common.report("vlogging Logger.debug (isEnabledFor)", COUNT,
+                  common.measure(run, vlogging.Logger.debug.__get__(logger)))
+    common.report("vlogging Logger.debug (rebound)", COUNT, common.measure(run, logger.debug))
+    common.report("vlogging.debug (rebound)", COUNT, common.measure(run, vlogging.debug))
+
+
+if __name__ == "__main__":
+    main()
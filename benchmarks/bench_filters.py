@@ -0,0 +1,34 @@
+##------------------------------------------------------------------------------
+## Overhead of RateLimitFilter per allowed and per dropped record.
+##
+## Usage:
+## python benchmarks/bench_filters.py
+##------------------------------------------------------------------------------
+
+import logging
+
+import common
+from vlogging.filters import RateLimitFilter
+
+COUNT = 1000000
+
+
+def run(filter, record) -> None:
+    check = filter.filter
+    for _ in range(COUNT):
+        check(record)
+
+
+def main() -> None:
+    record = logging.LogRecord("bench", logging.WARNING, __file__, 10, "hot loop", None, None)
+    common.report("logging.Filter", COUNT, common.measure(run, logging.Filter(), record))
+    allowed = RateLimitFilter(rate=1e12, burst=1e12)
+    common.report("RateLimitFilter (allowed)", COUNT, common.measure(run, allowed, record))
+    dropped = RateLimitFilter(rate=1, burst=1)
+    common.report("RateLimitFilter (dropped)", COUNT, common.measure(run, dropped, record))
+    sampled = RateLimitFilter(sampling={"WARNING": 0.0})
+    common.report("RateLimitFilter (sampled out)", COUNT, common.measure(run, sampled, record))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+##------------------------------------------------------------------------------
+## Compiled vlogging formatters against the stdlib formatting path.
+##
+## Usage:
+## python benchmarks/bench_formatters.py
+##------------------------------------------------------------------------------
+
+import logging
+
+import common
+from vlogging.formatters import (
+    SIMPLE_FORMAT,
+    BASIC_FORMAT,
+    Formatter,
+)
+
+COUNT = 100000
+
+
+def run(func, record) -> None:
+    for _ in range(COUNT):
+        func(record)
+
+
+def main() -> None:
+    record = logging.LogRecord("bench", logging.INFO, __file__, 10,
+                               "Hello %s", ("vlogging",), None)
+    record.message = record.getMessage()
+    record.asctime = "2023-02-10 15:24:31.358"
+    for name, fmt in (("SIMPLE_FORMAT", SIMPLE_FORMAT), ("BASIC_FORMAT", BASIC_FORMAT)):
+        stdlib = logging.Formatter(fmt)
+        compiled = Formatter(fmt)
+        common.report(f"{name} formatMessage (stdlib)", COUNT,
+                      common.measure(run, stdlib.formatMessage, record))
+        common.report(f"{name} formatMessage (compiled)", COUNT,
+                      common.measure(run, compiled.formatMessage, record))
+        common.report(f"{name} format (stdlib)", COUNT,
+                      common.measure(run, stdlib.format, record))
+        common.report(f"{name} format (vlogging)", COUNT,
+                      common.measure(run, compiled.format, record))
+
+
+if __name__ == "__main__":
+    main()
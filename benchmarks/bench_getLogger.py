@@ -0,0 +1,42 @@
+##------------------------------------------------------------------------------
+## Startup cost of vlogging.getLogger with many new logger names.
+##
+## Usage:
+## python benchmarks/bench_getLogger.py
+##------------------------------------------------------------------------------
+
+import itertools
+
+import common
+import vlogging
+
+_run = itertools.count()
+
+
+def register(count: int) -> None:
+    prefix = f"bench.register{next(_run)}"
+    for i in range(count):
+        vlogging.getLogger(f"{prefix}.module{i}")
+
+
+def reconfigure(count: int) -> None:
+    """The previous behaviour: a full dictConfig for every new name."""
+    prefix = f"bench.reconfigure{next(_run)}"
+    loggers = vlogging._config.config["loggers"]
+    for i in range(count):
+        loggers[f"{prefix}.module{i}"] = loggers[vlogging.DEFAUT_LOGGER].copy()
+        vlogging._config.configure()
+
+
+def main() -> None:
+    vlogging.basicConfig(stream="ext://sys.stdout", level="CRITICAL")
+    # The old path is quadratic, so it is measured first and on fewer names.
+    common.report("getLogger (full dictConfig per name)", 500,
+                  common.measure(reconfigure, 500, repeat=1))
+    for count in (1000, 10000):
+        common.report("getLogger (incremental registration)", count,
+                      common.measure(register, count, repeat=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+##------------------------------------------------------------------------------
+## Import time of vlogging measured with python -X importtime, and the cost
+## of configuring, which is deferred until the first log call.
+##
+## Usage:
+## python benchmarks/bench_import.py [runs]
+##------------------------------------------------------------------------------
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import common  # noqa: F401, adds ../src to sys.path
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+TIMED = """
+import time
+start = time.perf_counter()
+import vlogging
+{statement}
+print(int((time.perf_counter() - start) * 1e6))
+"""
+STATEMENTS = {
+    "import vlogging + configure (eager import)": "vlogging._config.ensureConfigured()",
+    "import vlogging + first record": "vlogging.info('first record')",
+}
+
+
+def importTime(module: str, env: dict) -> int:
+    """Return the cumulative import time of a module in microseconds."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=env, check=True, capture_output=True, text=True)
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise RuntimeError(f"No import time for {module}")
+
+
+def timedRun(statement: str, env: dict) -> int:
+    """Return the time of importing vlogging and running a statement in microseconds."""
+    result = subprocess.run([sys.executable, "-c", TIMED.format(statement=statement)],
+                            env=env, check=True, capture_output=True, text=True)
+    return int(result.stdout)
+
+
+def report(name: str, times: list) -> None:
+    print(f"{name:<48} median {statistics.median(times) / 1000:>8.2f} ms"
+          f"  min {min(times) / 1000:>8.2f} ms")
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as cache:
+        # Write and use bytecode caches, as an installed package would.
+        env = dict(os.environ, PYTHONPATH=SRC, PYTHONPYCACHEPREFIX=cache)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        timedRun("import logging.config", env)
+        for module in ("logging", "logging.config", "vlogging"):
+            report(f"import {module}", [importTime(module, env) for _ in range(runs)])
+        for name, statement in STATEMENTS.items():
+            report(name, [timedRun(statement, env) for _ in range(runs)])
+
+
+if __name__ == "__main__":
+    main()
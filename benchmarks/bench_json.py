@@ -0,0 +1,60 @@
+##------------------------------------------------------------------------------
+## JsonFormatter against a formatter that calls json.dumps on a dict.
+##
+## Usage:
+## python benchmarks/bench_json.py
+##------------------------------------------------------------------------------
+
+import json
+import logging
+
+import common
+from vlogging.formatters import (
+    SIMPLE_FORMAT,
+    BASIC_FORMAT,
+    Formatter,
+    JsonFormatter,
+)
+
+COUNT = 100000
+
+
+class DumpsFormatter(Formatter):
+    """The naive approach: build a dict per record and call json.dumps."""
+
+    def __init__(self, fields, extras, static):
+        super().__init__()
+        self.jsonFields, self.extras, self.static = fields, extras, static
+
+    def format(self, record):
+        record.message = record.getMessage()
+        record.asctime = self.formatTime(record, self.datefmt)
+        data = {field: getattr(record, field, None) for field in self.jsonFields}
+        for extra in self.extras:
+            if extra in record.__dict__:
+                data[extra] = record.__dict__[extra]
+        data.update(self.static)
+        return json.dumps(data, default=str)
+
+
+def run(formatter, record) -> None:
+    format = formatter.format
+    for _ in range(COUNT):
+        format(record)
+
+
+def main() -> None:
+    record = logging.LogRecord("bench", logging.INFO, __file__, 10,
+                               "user %s logged in from %s", ("alice", "10.0.0.1"), None)
+    record.requestId = "0f8fad5b-d9cb-469f-a165-70867728950e"
+    static = {"service": "api", "region": "eu-west-1"}
+    for name, fmt in (("SIMPLE_FORMAT", SIMPLE_FORMAT), ("BASIC_FORMAT", BASIC_FORMAT)):
+        fast = JsonFormatter(fmt, extras=["requestId"], static=static)
+        naive = DumpsFormatter(fast.jsonFields, ["requestId"], static)
+        assert json.loads(fast.format(record)) == json.loads(naive.format(record))
+        common.report(f"{name} json.dumps", COUNT, common.measure(run, naive, record))
+        common.report(f"{name} JsonFormatter", COUNT, common.measure(run, fast, record))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+##------------------------------------------------------------------------------
+## Expensive log arguments computed eagerly against vlogging.lazy, at a
+## disabled level and at an enabled level.
+##
+## Usage:
+## python benchmarks/bench_lazy.py
+##------------------------------------------------------------------------------
+
+import json
+import os
+
+import common
+import vlogging
+
+COUNT = 20000
+PAYLOAD = {"items": [{"id": i, "name": f"item{i}", "tags": ["a", "b"]} for i in range(50)]}
+
+
+def eager(call) -> None:
+    for _ in range(COUNT):
+        call("payload %s", json.dumps(PAYLOAD))
+
+
+def deferred(call) -> None:
+    lazy = vlogging.lazy
+    for _ in range(COUNT):
+        call("payload %s", lazy(json.dumps, PAYLOAD))
+
+
+def main() -> None:
+    vlogging.basicConfig(filename=os.devnull, level="INFO")
+    logger = vlogging.getLogger("bench.lazy")
+    for level, call in (("disabled", logger.debug), ("enabled", logger.info)):
+        common.report(f"{level} json.dumps argument", COUNT, common.measure(eager, call))
+        common.report(f"{level} vlogging.lazy(json.dumps)", COUNT, common.measure(deferred, call))
+    vlogging.basicConfig()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+##------------------------------------------------------------------------------
+## Overhead of vlogging.metrics on enabled log calls to a file handler.
+##
+## Usage:
+## python benchmarks/bench_metrics.py
+##------------------------------------------------------------------------------
+
+import os
+import tempfile
+
+import common
+import vlogging
+from vlogging import metrics
+
+COUNT = 200000
+
+
+def run(logger) -> None:
+    info = logger.info
+    for i in range(COUNT):
+        info("request %s took %d ms", "GET /index", i)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        vlogging.basicConfig(filename=os.path.join(directory, "bench.log"), filemode="w")
+        logger = vlogging.getLogger("bench.metrics")
+        # Alternate the two cases so machine noise affects both alike.
+        baseline = instrumented = None
+        for _ in range(5):
+            elapsed = common.measure(run, logger, repeat=1)
+            baseline = elapsed if baseline is None else min(baseline, elapsed)
+            metrics.enable()
+            elapsed = common.measure(run, logger, repeat=1)
+            instrumented = elapsed if instrumented is None else min(instrumented, elapsed)
+            metrics.disable()
+        common.report("metrics disabled", COUNT, baseline)
+        common.report("metrics enabled", COUNT, instrumented)
+        print(f"overhead {(instrumented / baseline - 1) * 100:.1f}%")
+        vlogging.basicConfig()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+##------------------------------------------------------------------------------
+## Many processes writing to one log file at once.
+##
+## Usage:
+## python benchmarks/bench_multiprocess.py [processes] [records]
+##------------------------------------------------------------------------------
+
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import common
+from vlogging import handlers
+from vlogging.formatters import SIMPLE_FORMAT, Formatter
+
+
+def write(handler, count: int) -> None:
+    logger = logging.getLogger(f"bench.multiprocess.{os.getpid()}")
+    logger.propagate = False
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    for i in range(count):
+        logger.info("worker %d record %d %s", os.getpid(), i, "x" * 80)
+    handler.close()
+
+
+def run(name: str, factory, processes: int, count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "bench.log")
+        handler = factory(filename)
+        handler.setFormatter(Formatter(SIMPLE_FORMAT))
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=write, args=(handler, count))
+                   for _ in range(processes)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        handler.close()
+        if isinstance(handler, handlers.ShardedFileHandler):
+            handlers.mergeShardFiles(filename, remove=True)
+        with open(filename) as f:
+            lines = f.read().splitlines()
+        broken = sum(1 for line in lines if not line.endswith("x" * 80))
+        common.report(f"{name} ({processes} processes)", processes * count, elapsed)
+        print(f"{'':<48} {len(lines)} lines, {broken} broken")
+
+
+def main() -> None:
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    run("FileHandler", handlers.FileHandler, processes, count)
+    run("AppendFileHandler", handlers.AppendFileHandler, processes, count)
+    run("ShardedFileHandler + merge", handlers.ShardedFileHandler, processes, count)
+
+
+if __name__ == "__main__":
+    main()
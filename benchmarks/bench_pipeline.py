@@ -0,0 +1,228 @@
+##------------------------------------------------------------------------------
+## End to end benchmark of the vlogging pipeline.
+##
+## Measures records per second and the p50/p99 latency of single calls for:
+##   - disabled and enabled levels
+##   - SIMPLE_FORMAT and BASIC_FORMAT
+##   - default and DATE_FMT_MICROSECONDS timestamps
+##   - a console handler writing to os.devnull and a file handler
+##   - one and several logging threads
+## and the cost of vlogging.getLogger with N new names. The results are
+## written as JSON, and two result files can be compared.
+##
+## Usage:
+## python benchmarks/bench_pipeline.py [--count N] [--threads N] [--output FILE]
+## python benchmarks/bench_pipeline.py --compare OLD.json NEW.json
+##------------------------------------------------------------------------------
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import common  # noqa: F401, adds ../src to sys.path
+import vlogging
+from vlogging.formatters import (
+    SIMPLE_FORMAT,
+    BASIC_FORMAT,
+    DATE_FMT_MICROSECONDS,
+)
+
+LOGGER_NAME = "bench.pipeline"
+FORMATS = {"simple": SIMPLE_FORMAT, "basic": BASIC_FORMAT}
+DATE_FORMATS = {"default": None, "microseconds": DATE_FMT_MICROSECONDS}
+LEVELS = ("disabled", "enabled")
+HANDLERS = ("devnull", "file")
+GETLOGGER_COUNTS = (100, 1000, 10000)
+
+_run = itertools.count()
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Return a percentile of sorted values.
+
+    Parameters
+    ----------
+    values : list
+        sorted values
+    fraction : float
+        percentile between 0 and 1
+
+    Returns
+    -------
+    float
+        value at the percentile
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def configure(format: str, datefmt: str, handler: str, directory: str, devnull) -> None:
+    """Configure vlogging for one benchmark case."""
+    if handler == "file":
+        vlogging.basicConfig(format=format, datefmt=datefmt, level="INFO",
+                             filename=os.path.join(directory, "pipeline.log"), filemode="w")
+    else:
+        vlogging.basicConfig(format=format, datefmt=datefmt, level="INFO", stream=devnull)
+    vlogging.getLogger(LOGGER_NAME)
+
+
+def callThroughput(call, count: int) -> None:
+    for i in range(count):
+        call("request %s took %d ms", "GET /index", i)
+
+
+def callLatency(call, count: int, latencies: list) -> None:
+    clock = time.perf_counter_ns
+    append = latencies.append
+    for i in range(count):
+        start = clock()
+        call("request %s took %d ms", "GET /index", i)
+        append(clock() - start)
+
+
+def runThreads(target, threads: int, *args) -> float:
+    """Run target in threads and return the elapsed time in seconds."""
+    workers = [threading.Thread(target=target, args=args) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def measureCase(call, count: int, threads: int) -> dict:
+    """Measure throughput and latency of a logging call.
+
+    Parameters
+    ----------
+    call : callable
+        logging method
+    count : int
+        number of calls per thread
+    threads : int
+        number of logging threads
+
+    Returns
+    -------
+    dict
+        records per second and p50/p99 latency in microseconds
+    """
+    elapsed = runThreads(callThroughput, threads, call, count)
+    latencies = []
+    runThreads(callLatency, threads, call, count, latencies)
+    latencies.sort()
+    return {
+        "records": count * threads,
+        "recordsPerSecond": round(count * threads / elapsed),
+        "p50": round(percentile(latencies, 0.50) / 1000, 3),
+        "p99": round(percentile(latencies, 0.99) / 1000, 3),
+    }
+
+
+def benchPipeline(count: int, threadCounts: list) -> list:
+    """Run every pipeline combination."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        for format, datefmt, handler, level, threads in itertools.product(
+                FORMATS, DATE_FORMATS, HANDLERS, LEVELS, threadCounts):
+            configure(FORMATS[format], DATE_FORMATS[datefmt], handler, directory, devnull)
+            logger = vlogging.getLogger(LOGGER_NAME)
+            call = logger.info if level == "enabled" else logger.debug
+            params = {"format": format, "datefmt": datefmt, "handler": handler,
+                      "level": level, "threads": threads}
+            result = measureCase(call, count, threads)
+            results.append({"name": "pipeline", "params": params, **result})
+            print(f"{json.dumps(params):<100} {result['recordsPerSecond']:>12,} rec/s"
+                  f" p50 {result['p50']:>8.2f} us p99 {result['p99']:>8.2f} us", file=sys.stderr)
+    vlogging.basicConfig()
+    return results
+
+
+def benchGetLogger(counts: tuple) -> list:
+    """Measure vlogging.getLogger with new names."""
+    results = []
+    for count in counts:
+        prefix = f"bench.getLogger{next(_run)}"
+        latencies = []
+        clock = time.perf_counter_ns
+        start = time.perf_counter()
+        for i in range(count):
+            begin = clock()
+            vlogging.getLogger(f"{prefix}.module{i}")
+            latencies.append(clock() - begin)
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        result = {
+            "name": "getLogger",
+            "params": {"names": count},
+            "records": count,
+            "recordsPerSecond": round(count / elapsed),
+            "p50": round(percentile(latencies, 0.50) / 1000, 3),
+            "p99": round(percentile(latencies, 0.99) / 1000, 3),
+        }
+        results.append(result)
+        print(f"getLogger {count:>6} new names {result['recordsPerSecond']:>12,} names/s"
+              f" p50 {result['p50']:>8.2f} us p99 {result['p99']:>8.2f} us", file=sys.stderr)
+    return results
+
+
+def compare(old: str, new: str) -> None:
+    """Print the change of every result between two result files."""
+    with open(old) as f:
+        oldResults = json.load(f)
+    with open(new) as f:
+        newResults = json.load(f)
+    key = lambda result: (result["name"], json.dumps(result["params"], sort_keys=True))
+    before = {key(result): result for result in oldResults["results"]}
+    for result in newResults["results"]:
+        previous = before.get(key(result))
+        if previous is None:
+            continue
+        ratio = result["recordsPerSecond"] / max(previous["recordsPerSecond"], 1)
+        print(f"{result['name']:<10} {json.dumps(result['params']):<96}"
+              f" {ratio:>6.2f}x rec/s  p99 {previous['p99']:>8.2f} -> {result['p99']:>8.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End to end vlogging benchmark.")
+    parser.add_argument("--count", type=int, default=20000, help="calls per thread and case")
+    parser.add_argument("--threads", type=int, default=4, help="number of threads of the multi-thread cases")
+    parser.add_argument("--output", default=None, help="JSON result file (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = benchPipeline(args.count, [1, args.threads])
+    vlogging.basicConfig(stream="ext://sys.stderr", level="CRITICAL")
+    results += benchGetLogger(GETLOGGER_COUNTS)
+    vlogging.basicConfig()
+    report = {
+        "version": vlogging.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "latencyUnit": "us",
+        "results": results,
+    }
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+##------------------------------------------------------------------------------
+## Cost of keeping a record in FlightRecorderHandler against a bare deque
+## append and a FileHandler that writes every record.
+##
+## Usage:
+## python benchmarks/bench_recorder.py
+##------------------------------------------------------------------------------
+
+import collections
+import logging
+import os
+import tempfile
+
+import common
+from vlogging import handlers
+from vlogging.formatters import SIMPLE_FORMAT, Formatter
+
+COUNT = 1000000
+
+
+def run(handle, record) -> None:
+    for _ in range(COUNT):
+        handle(record)
+
+
+def main() -> None:
+    record = logging.LogRecord("bench", logging.DEBUG, __file__, 10, "value %d", (1,), None)
+    buffer = collections.deque(maxlen=handlers.DEFAULT_RECORDER_CAPACITY)
+    common.report("deque.append", COUNT, common.measure(run, buffer.append, record))
+    recorder = handlers.FlightRecorderHandler([logging.NullHandler()])
+    common.report("FlightRecorderHandler.emit", COUNT, common.measure(run, recorder.emit, record))
+    common.report("FlightRecorderHandler.handle", COUNT, common.measure(run, recorder.handle, record))
+    with tempfile.TemporaryDirectory() as directory:
+        handler = handlers.FileHandler(os.path.join(directory, "bench.log"), "w")
+        handler.setFormatter(Formatter(SIMPLE_FORMAT))
+        common.report("FileHandler.handle", COUNT, common.measure(run, handler.handle, record, repeat=1))
+        handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+##------------------------------------------------------------------------------
+## Throughput of file handlers as the number of logging threads grows from
+## 1 to 64: FileHandler, BufferedFileHandler and ThreadBufferedFileHandler.
+## The total number of records is the same for every thread count.
+##
+## Usage:
+## python benchmarks/bench_threads.py [records]
+##------------------------------------------------------------------------------
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import common
+from vlogging import handlers
+from vlogging.formatters import SIMPLE_FORMAT, Formatter
+
+THREAD_COUNTS = (1, 2, 4, 8, 16, 32, 64)
+HANDLERS = {
+    "FileHandler": handlers.FileHandler,
+    "BufferedFileHandler": handlers.BufferedFileHandler,
+    "ThreadBufferedFileHandler": handlers.ThreadBufferedFileHandler,
+}
+
+
+def write(logger: logging.Logger, count: int, start: threading.Event) -> None:
+    start.wait()
+    for i in range(count):
+        logger.info("request %s took %d ms", "GET /index", i)
+
+
+def run(factory, threads: int, records: int, directory: str) -> float:
+    """Log records from threads and return the elapsed time in seconds."""
+    handler = factory(os.path.join(directory, "bench.log"), mode="w")
+    handler.setFormatter(Formatter(SIMPLE_FORMAT))
+    logger = logging.getLogger("bench.threads")
+    logger.propagate = False
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    start = threading.Event()
+    workers = [threading.Thread(target=write, args=(logger, records // threads, start))
+               for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    begin = time.perf_counter()
+    start.set()
+    for worker in workers:
+        worker.join()
+    handler.close()
+    return time.perf_counter() - begin
+
+
+def main() -> None:
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 64000
+    with tempfile.TemporaryDirectory() as directory:
+        for threads in THREAD_COUNTS:
+            for name, factory in HANDLERS.items():
+                elapsed = min(run(factory, threads, records, directory) for _ in range(3))
+                common.report(f"{name} {threads} threads", records, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+##------------------------------------------------------------------------------
+## Repeated vlogging.exception calls for the same failure, formatted by
+## logging.Formatter and by vlogging.formatters.Formatter with and without
+## its traceback cache and in compact mode.
+##
+## Usage:
+## python benchmarks/bench_traceback.py
+##------------------------------------------------------------------------------
+
+import logging
+import sys
+
+import common
+from vlogging import formatters
+
+COUNT = 5000
+
+
+def connect(host: str) -> None:
+    raise ConnectionError(f"connection to {host} refused")
+
+
+def request(host: str) -> None:
+    try:
+        connect(host)
+    except ConnectionError as e:
+        raise RuntimeError("request failed") from e
+
+
+def failures() -> list:
+    result = []
+    for i in range(COUNT):
+        try:
+            request(f"10.0.0.{i % 250}")
+        except RuntimeError:
+            result.append(logging.makeLogRecord({"msg": "failed", "exc_info": sys.exc_info()}))
+    return result
+
+
+def formatAll(formatter: logging.Formatter, records: list) -> None:
+    for record in records:
+        record.exc_text = None
+        formatter.format(record)
+
+
+def main() -> None:
+    records = failures()
+    cases = (
+        ("logging.Formatter", logging.Formatter(formatters.SIMPLE_FORMAT)),
+        ("Formatter tracebackCacheSize=0",
+         formatters.Formatter(formatters.SIMPLE_FORMAT, tracebackCacheSize=0)),
+        ("Formatter", formatters.Formatter(formatters.SIMPLE_FORMAT)),
+        ("Formatter compactTracebacks",
+         formatters.Formatter(formatters.SIMPLE_FORMAT, compactTracebacks=True)),
+    )
+    for name, formatter in cases:
+        common.report(name, COUNT, common.measure(formatAll, formatter, records))
+
+
+if __name__ == "__main__":
+    main()
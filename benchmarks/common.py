@@ -0,0 +1,50 @@
+##------------------------------------------------------------------------------
+## Shared helpers for the vlogging benchmarks.
+##------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def measure(func, *args, repeat: int = 3) -> float:
+    """Return the best wall clock time of several calls in seconds.
+
+    Parameters
+    ----------
+    func : callable
+        function to measure
+    repeat : int, optional
+        number of calls, by default 3
+
+    Returns
+    -------
+    float
+        best elapsed time in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def report(name: str, count: int, elapsed: float) -> None:
+    """Print a benchmark result line.
+
+    Parameters
+    ----------
+    name : str
+        benchmark name
+    count : int
+        number of operations
+    elapsed : float
+        elapsed time in seconds
+    """
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"{name:<48} {count:>8} ops {elapsed * 1000:>10.2f} ms {rate:>14,.0f} ops/s")
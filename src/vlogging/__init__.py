@@ -1,13 +1,16 @@
 import logging
-import logging.config
+import os
+import threading
 from typing import Any
 
 from vlogging import (
+    filters,
     formatters,
     handlers,
     loggers,
+    metrics,
 )
-from vlogging.loggers import Logger
+from vlogging.loggers import Logger, Lazy, lazy
 
 from logging import (
     CRITICAL,
@@ -28,6 +31,8 @@ DEFAUT_FORMAT  = "vlogging_format"
 DEFAUT_FILTER  = "vlogging_filter"
 DEFAUT_HANDLER = "vlogging_handler"
 DEFAUT_LOGGER  = "vlogging"
+DEFAUT_TARGET_HANDLER = "vlogging_target_handler"
+AGGREGATOR_VARIABLE = "VLOGGING_AGGREGATOR"
 
 class Config(object):
 
@@ -46,9 +51,15 @@ class Config(object):
         },
     }
 
+    OBJECT_KEYS = ("formatters", "filters", "handlers")
+    HANDLER_OPTIONS = ("level", "formatter", "filters")
+
     def __init__(self):
         """Initializes the instance."""
         self.config = self.DEFAUT_CONFIG.copy()
+        self.configured = False
+        self.objects = {key: {} for key in self.OBJECT_KEYS}
+        self.lock = threading.RLock()
 
     def configure(self, config: dict=None) -> None:
         """Configure logger settings.
@@ -58,12 +69,284 @@ class Config(object):
         config : dict, optional
             config, by default None
         """
+        # Imported here, so that importing vlogging does not import logging.config.
+        from vlogging import configurator
+
         if config is not None:
             self.config["formatters"] = self.configureFormatters(config)
             self.config["filters"] = self.configureFilters(config)
             self.config["handlers"] = self.configureHandlers(config)
             self.config["loggers"] = self.configureLoggers(config)
-        logging.config.dictConfig(self.config)
+            # Kept apart from the caller's dicts, which apply compares against later.
+            self.config = self.copyConfig(self.config)
+        loggers.suspendRebind()
+        try:
+            if not self.configured:
+                # Loggers configured without a level keep the default level, as
+                # if the default settings had been applied on import.
+                for name, cfg in self.DEFAUT_CONFIG["loggers"].items():
+                    logging.getLogger(name).setLevel(cfg["level"])
+            settings = self.config
+            path = getAggregatorPath()
+            if path is not None:
+                from vlogging import aggregator
+
+                settings = aggregator.getClientConfig(self.config, path)
+            dictConfigurator = configurator.Configurator(settings)
+            dictConfigurator.configure()
+            self.objects = self.getObjects(dictConfigurator)
+            self.configured = True
+        finally:
+            loggers.resumeRebind()
+        loggers.updateLoggerFields()
+
+    def copyConfig(self, config: Any) -> Any:
+        """Return a copy of the dicts and lists of a config, sharing other values.
+
+        Parameters
+        ----------
+        config : Any
+            config or config value
+
+        Returns
+        -------
+        Any
+            copy
+        """
+        if isinstance(config, dict):
+            return {key: self.copyConfig(value) for key, value in config.items()}
+        if isinstance(config, list):
+            return [self.copyConfig(value) for value in config]
+        return config
+
+    def getObjects(self, dictConfigurator) -> dict:
+        """Return the formatters, filters and handlers a configurator created.
+
+        Parameters
+        ----------
+        dictConfigurator : configurator.Configurator
+            configurator which configured logging
+
+        Returns
+        -------
+        dict
+            objects keyed by config key and id.
+        """
+        objects = {}
+        for key in self.OBJECT_KEYS:
+            items = dictConfigurator.config.get(key, {})
+            objects[key] = {name: items[name] for name in items}
+        return objects
+
+    def apply(self, config: dict) -> None:
+        """Apply logger settings, changing only what differs from the current settings.
+
+        Unlike configure, the settings are compared with the current settings
+        id by id. Formatters and filters whose settings changed are created
+        again. A handler whose settings are unchanged is kept as it is, with
+        its open file and buffers; a handler whose level, formatter or filters
+        changed is updated in place; any other handler that changed is
+        replaced, and the old one is closed once no logger uses it. Levels,
+        handlers and filters of loggers are changed in place.
+
+        Parameters
+        ----------
+        config : dict
+            config
+        """
+        from vlogging import configurator
+
+        self.ensureConfigured()
+        if getAggregatorPath() is not None:
+            # The records of a child are written by the aggregator.
+            self.configure(config)
+            return
+        with self.lock:
+            old = self.config
+            new = self.DEFAUT_CONFIG.copy()
+            new["formatters"] = self.configureFormatters(config)
+            new["filters"] = self.configureFilters(config)
+            new["handlers"] = self.configureHandlers(config)
+            new["loggers"] = self.configureLoggers(config)
+            new = self.copyConfig(new)
+            # Loggers registered from the default logger follow its new settings.
+            defaut = old["loggers"].get(DEFAUT_LOGGER)
+            for name, cfg in old["loggers"].items():
+                if name not in new["loggers"] and cfg == defaut:
+                    new["loggers"][name] = new["loggers"][DEFAUT_LOGGER].copy()
+
+            dictConfigurator = configurator.Configurator(new)
+            loggers.suspendRebind()
+            try:
+                changed = self.applyObjects(dictConfigurator, old, new)
+                for name, cfg in new["loggers"].items():
+                    self.applyLogger(logging.getLogger(name), cfg, dictConfigurator.config)
+                for name in old["loggers"]:
+                    if name not in new["loggers"]:
+                        self.resetLogger(logging.getLogger(name))
+                objects = self.getObjects(dictConfigurator)
+                for name in changed:
+                    handler = self.objects["handlers"].get(name)
+                    if handler is not None:
+                        handler.close()
+                        # Closing removed the name of the new handler from logging._handlers.
+                        objects["handlers"][name].set_name(name)
+                for name, handler in self.objects["handlers"].items():
+                    if name not in objects["handlers"]:
+                        handler.close()
+                self.config = new
+                self.objects = objects
+            finally:
+                loggers.resumeRebind()
+        loggers.updateLoggerFields()
+
+    def applyObjects(self, dictConfigurator, old: dict, new: dict) -> set:
+        """Put the formatters, filters and handlers of new settings in a configurator.
+
+        Unchanged objects are reused and the others are created.
+
+        Parameters
+        ----------
+        dictConfigurator : configurator.Configurator
+            configurator of the new settings
+        old : dict
+            current config
+        new : dict
+            new config
+
+        Returns
+        -------
+        set
+            ids of the handlers which were replaced by new handlers.
+        """
+        converted = dictConfigurator.config
+        created = {}
+        for key, create in (("formatters", dictConfigurator.configure_formatter),
+                            ("filters", dictConfigurator.configure_filter)):
+            created[key] = set()
+            items = converted.get(key, {})
+            for name in list(items):
+                if name in self.objects[key] and old[key].get(name) == new[key][name]:
+                    items[name] = self.objects[key][name]
+                else:
+                    items[name] = create(items[name])
+                    created[key].add(name)
+
+        handlerConfigs = new["handlers"]
+        create = set()
+        update = set()
+        for name, cfg in handlerConfigs.items():
+            previous = old["handlers"].get(name)
+            if previous is None or name not in self.objects["handlers"]:
+                create.add(name)
+            elif self.withoutOptions(previous) != self.withoutOptions(cfg):
+                create.add(name)
+            elif (previous != cfg or cfg.get("formatter") in created["formatters"]
+                    or created["filters"].intersection(cfg.get("filters", ()))):
+                update.add(name)
+        # A handler writing to a replaced handler must be replaced as well.
+        grown = True
+        while grown:
+            grown = False
+            for name, cfg in handlerConfigs.items():
+                if name not in create and create.intersection(cfg.get("targets", ())):
+                    create.add(name)
+                    grown = True
+
+        items = converted["handlers"]
+        for name in handlerConfigs:
+            if name not in create:
+                items[name] = self.objects["handlers"][name]
+        for name in update:
+            self.applyHandler(items[name], handlerConfigs[name], converted)
+        pending = sorted(create)
+        while pending:
+            deferred = []
+            for name in pending:
+                try:
+                    handler = dictConfigurator.configure_handler(items[name])
+                except ValueError as e:
+                    if "target not configured yet" in str(e.__cause__):
+                        deferred.append(name)
+                        continue
+                    raise ValueError(f"Unable to configure handler {name!r}") from e
+                handler.name = name
+                items[name] = handler
+            if len(deferred) == len(pending):
+                raise ValueError(f"Unable to configure handlers {deferred!r}")
+            pending = deferred
+        return create & set(self.objects["handlers"])
+
+    def withoutOptions(self, config: dict) -> dict:
+        """Return a handler config without the settings a handler can change in place."""
+        return {key: value for key, value in config.items() if key not in self.HANDLER_OPTIONS}
+
+    def applyHandler(self, handler: logging.Handler, config: dict, objects: dict) -> None:
+        """Change the level, formatter and filters of a handler in place.
+
+        Parameters
+        ----------
+        handler : logging.Handler
+            handler
+        config : dict
+            handler config
+        objects : dict
+            configured formatters and filters keyed by config key and id
+        """
+        handler.setLevel(config.get("level") or logging.NOTSET)
+        formatter = config.get("formatter")
+        handler.setFormatter(objects["formatters"][formatter] if formatter else None)
+        handler.filters = [objects["filters"][name] for name in config.get("filters", [])]
+
+    def applyLogger(self, logger: logging.Logger, config: dict, objects: dict) -> None:
+        """Change a logger to match its settings, leaving unchanged values alone.
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            logger
+        config : dict
+            logger config
+        objects : dict
+            configured filters and handlers keyed by config key and id
+        """
+        level = config.get("level")
+        if level is not None and logger.level != logging._checkLevel(level):
+            logger.setLevel(level)
+        loggerHandlers = [objects["handlers"][name] for name in config.get("handlers", [])]
+        if logger.handlers != loggerHandlers:
+            logger.handlers = loggerHandlers
+        loggerFilters = [objects["filters"][name] for name in config.get("filters", [])]
+        if logger.filters != loggerFilters:
+            logger.filters = loggerFilters
+        propagate = config.get("propagate")
+        if propagate is not None:
+            logger.propagate = propagate
+        logger.disabled = False
+
+    def resetLogger(self, logger: logging.Logger) -> None:
+        """Remove the handlers, filters and level of a logger which is no longer configured.
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            logger
+        """
+        logger.handlers = []
+        logger.filters = []
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+
+    def ensureConfigured(self) -> None:
+        """Apply the current settings unless they were applied already.
+
+        vlogging is not configured on import, but on the first log call or
+        the first call of getLogger or basicConfig.
+        """
+        if not self.configured:
+            with self.lock:
+                if not self.configured:
+                    self.configure()
 
     def configureFormatters(self, config: dict) -> dict:
         """Configure formatter settings.
@@ -187,8 +470,60 @@ class Config(object):
             return
         loggers = self.config.get("loggers")
         if name not in loggers.keys():
-            loggers[name] = loggers.get("vlogging").copy()
-            self.configure()
+            loggers[name] = loggers.get(DEFAUT_LOGGER).copy()
+            self.register(name, DEFAUT_LOGGER)
+
+    def register(self, name: str, source: str) -> None:
+        """Register a logger by sharing the configuration of a configured logger.
+
+        The handler and filter objects of the source logger are attached to
+        the named logger as they are, so no handler is rebuilt and no file is
+        reopened.
+
+        Parameters
+        ----------
+        name : str
+            logger name
+        source : str
+            name of the configured logger to copy from
+        """
+        manager = logging.Logger.manager
+        isNew = name not in manager.loggerDict
+        src = logging.getLogger(source)
+        logger = logging.getLogger(name)
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        for filter in logger.filters[:]:
+            logger.removeFilter(filter)
+        if isNew:
+            # A brand new logger has no children and an empty level cache.
+            logger.level = src.level
+            logger.rebind()
+        else:
+            logger.setLevel(src.level)
+        logger.propagate = src.propagate
+        logger.disabled = src.disabled
+        for handler in src.handlers:
+            logger.addHandler(handler)
+        for filter in src.filters:
+            logger.addFilter(filter)
+
+
+def getAggregatorPath() -> str:
+    """Return the socket path of the aggregator of a parent process.
+
+    Returns
+    -------
+    str
+        socket path, or None if no parent process runs an aggregator
+    """
+    value = os.environ.get(AGGREGATOR_VARIABLE)
+    if not value:
+        return None
+    pid, _, path = value.partition(":")
+    if pid == str(os.getpid()):
+        return None
+    return path
 
 
 def basicConfig(**kwargs) -> None:
@@ -218,10 +553,19 @@ def basicConfig(**kwargs) -> None:
     encoding  If specified together with a filename, this encoding is passed to
               the created FileHandler, causing it to be used when the file is
               opened.
+    multiprocess
+              If "append", the file is shared by many processes and each
+              record is appended with a single write. If "shard", each
+              process writes to its own "<filename>.<pid>" file.
     stream    Use the specified stream to initialize the StreamHandler. Note
               that this argument is incompatible with 'filename' - if both
               are present, 'stream' is ignored.
     level     Set the logger level to the specified level.
+    async_    If true, the handler writes on a background thread and the
+              caller only puts the record on a bounded queue.
+    queueSize The maximum number of queued records in async mode.
+    overflow  What to do when the queue is full in async mode ("block",
+              "drop-newest" or "drop-oldest", defaults to "block").
     """
     format = kwargs.pop("format", formatters.SIMPLE_FORMAT)
     datefmt = kwargs.pop("datefmt", None)
@@ -237,17 +581,35 @@ def basicConfig(**kwargs) -> None:
     else:
         filemode = kwargs.pop("filemode", "a")
         encoding = kwargs.pop("encoding", None)
-        handlerConfig = handlers.getFileHandlerConfig(filename, filemode, encoding,
-                                                level, DEFAUT_FORMAT)
+        multiprocess = kwargs.pop("multiprocess", None)
+        if multiprocess == "append":
+            getConfig = handlers.getAppendFileHandlerConfig
+        elif multiprocess == "shard":
+            getConfig = handlers.getShardedFileHandlerConfig
+        elif multiprocess is None:
+            getConfig = handlers.getFileHandlerConfig
+        else:
+            raise ValueError(f"Unknown multiprocess mode: {multiprocess!r}")
+        handlerConfig = getConfig(filename, filemode, encoding, level, DEFAUT_FORMAT)
     loggerConfig = loggers.getLoggerConfig(level, [DEFAUT_HANDLER])
 
+    handlerConfigs = {
+        DEFAUT_HANDLER: handlerConfig,
+    }
+    if kwargs.pop("async_", False):
+        handlerConfigs = {
+            DEFAUT_HANDLER: handlers.getQueueHandlerConfig(
+                [DEFAUT_TARGET_HANDLER],
+                kwargs.pop("queueSize", handlers.DEFAULT_QUEUE_SIZE),
+                kwargs.pop("overflow", handlers.OVERFLOW_BLOCK)),
+            DEFAUT_TARGET_HANDLER: handlerConfig,
+        }
+
     config = {
         "formatters": {
             DEFAUT_FORMAT: formatConfig,
         },
-        "handlers": {
-            DEFAUT_HANDLER: handlerConfig,
-        },
+        "handlers": handlerConfigs,
         "loggers": {
             DEFAUT_LOGGER: loggerConfig,
         },
@@ -275,11 +637,59 @@ def getLogger(name: str=None, config: dict=None) -> Logger:
     """
     if config is not None:
         _config.configure(config)
+    else:
+        _config.ensureConfigured()
     if name is not None:
         _config.prepare(name)
     return logging.getLogger(name)
 
 
+def watchConfig(filename: str, interval: float = 1.0):
+    """
+    Apply a JSON, TOML or INI config file, and apply it again whenever it changes.
+
+    Only the settings which differ from the current settings are applied,
+    see Config.apply.
+
+    Parameters
+    ----------
+    filename : str
+        config file name
+    interval : float, optional
+        seconds between two checks of the file, by default 1.0
+
+    Returns
+    -------
+    watcher.ConfigWatcher
+        watcher, which stops watching when its stop method is called
+    """
+    # Imported here, so that importing vlogging does not import the file parsers.
+    from vlogging import watcher
+
+    configWatcher = watcher.ConfigWatcher(filename, _config.apply, interval)
+    configWatcher.start()
+    return configWatcher
+
+
+def stats() -> dict:
+    """Return a snapshot of the logging metrics.
+
+    Metrics are only collected after vlogging.metrics.enable() was called.
+
+    Returns
+    -------
+    dict
+        records per level and logger, handler counters and sampled
+        timings, and dropped records.
+    """
+    return metrics.snapshot()
+
+
+def resetStats() -> None:
+    """Set the logging metrics to zero."""
+    metrics.reset()
+
+
 def critical(msg: Any, *args, **kwargs):
     """Log a message with severity 'CRITICAL' on the root logger.
 
@@ -374,7 +784,31 @@ def log(level: int, msg: Any, *args, **kwargs):
     _logger.log(level, msg, *args, **kwargs)
 
 
+class _LazyLogger(object):
+    """Stands in for the vlogging logger until vlogging is configured."""
+
+    def __getattr__(self, name: str) -> Any:
+        _config.ensureConfigured()
+        return getattr(logging.getLogger(DEFAUT_LOGGER), name)
+
+
+def _rebindFunctions() -> None:
+    """Bind the module functions of disabled levels to a no-op."""
+    global _logger
+    if not _config.configured:
+        return
+    _logger = logging.getLogger(DEFAUT_LOGGER)
+    for name, function in _functions.items():
+        if getattr(_logger, name) is loggers.disabledCall:
+            globals()[name] = loggers.disabledCall
+        else:
+            globals()[name] = function
+
+
 logging.setLoggerClass(Logger)
+logging.Logger.manager.__class__ = loggers.Manager
 _config: Config = Config()
-_config.configure()
-_logger = getLogger(__name__)
+_logger = _LazyLogger()
+_functions = {name: globals()[name] for _, names in loggers.LEVEL_METHODS
+              for name in names if name in globals()}
+loggers.addRebindHook(_rebindFunctions)
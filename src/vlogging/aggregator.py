@@ -0,0 +1,301 @@
+"""
+Collect the records of child processes in the parent process.
+
+The parent starts an aggregator, which listens on a Unix domain socket:
+
+    from vlogging import aggregator
+    aggregator.start()
+    with ProcessPoolExecutor() as pool:
+        ...
+    aggregator.stop()
+
+Children started afterwards, by fork or spawn, send their records there
+instead of writing them with handlers of their own. Their loggers keep
+their levels and filters, but all their handlers are replaced by one
+AggregatorHandler. The aggregator passes every received record to the
+logger of the same name in the parent, so the parent's handlers and
+formatters write it, with the process id and name of the child.
+
+The socket path is passed to the children in the VLOGGING_AGGREGATOR
+environment variable. The socket is created in a directory only the user
+can access, as the records are decoded with marshal.
+"""
+import logging
+import marshal
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import traceback
+
+import vlogging
+from vlogging import handlers, loggers
+
+AGGREGATOR_HANDLER = "vlogging_aggregator_handler"
+
+_server = None
+
+
+def getClientConfig(config: dict, path: str) -> dict:
+    """Return the config of a child process sending its records to the aggregator.
+
+    Parameters
+    ----------
+    config : dict
+        config of the child
+    path : str
+        path of the Unix domain socket of the aggregator
+
+    Returns
+    -------
+    dict
+        config with the handlers of every logger replaced by one
+        AggregatorHandler; the loggers do not propagate, as the parent
+        propagates the records again.
+    """
+    loggerConfigs = {}
+    for name, cfg in config["loggers"].items():
+        cfg = dict(cfg)
+        cfg["handlers"] = [AGGREGATOR_HANDLER]
+        cfg["propagate"] = False
+        loggerConfigs[name] = cfg
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {},
+        "filters": config.get("filters", {}),
+        "handlers": {
+            AGGREGATOR_HANDLER: handlers.getAggregatorHandlerConfig(path),
+        },
+        "loggers": loggerConfigs,
+    }
+
+
+class Aggregator(object):
+    """
+    Server which receives records on a Unix domain socket and passes them
+    to the loggers of the current process.
+
+    Every connection is read by a thread of its own. A connection carries
+    frames of a 4 byte big-endian length followed by a marshal list of
+    packed records, see vlogging.handlers.AggregatorHandler.
+    """
+
+    def __init__(self, path: str = None):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        path : str, optional
+            socket path, by default a path in a new temporary directory
+        """
+        self.directory = None
+        if path is None:
+            self.directory = tempfile.mkdtemp(prefix="vlogging-")
+            path = os.path.join(self.directory, "aggregator.sock")
+        self.path = path
+        self.received = 0
+        self.sock = None
+        self.connections = set()
+        self.loggers = {}
+        self.lock = threading.Lock()
+        self._thread = None
+
+    def start(self) -> None:
+        """Listen on the socket and start accepting connections."""
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.directory is not None:
+            self.sock.bind(self.path)
+        else:
+            self._bindPrivate(self.path)
+        self.sock.listen()
+        self._thread = threading.Thread(target=self._accept, args=(self.sock,),
+                                        name="vlogging-aggregator", daemon=True)
+        self._thread.start()
+
+    def _bindPrivate(self, path: str) -> None:
+        """Bind to a path chosen by the caller without exposing the socket.
+
+        The socket is bound in a new directory only the user can access,
+        made private, and only then linked to the path.
+        """
+        directory = tempfile.mkdtemp(prefix=".vlogging-", dir=os.path.dirname(path) or None)
+        try:
+            private = os.path.join(directory, "aggregator.sock")
+            self.sock.bind(private)
+            os.chmod(private, 0o600)
+            os.link(private, path)
+            os.remove(private)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _accept(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            with self.lock:
+                self.connections.add(conn)
+            threading.Thread(target=self._serve, args=(conn,),
+                             name="vlogging-aggregator-connection", daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        try:
+            with conn.makefile("rb") as reader:
+                while True:
+                    header = reader.read(4)
+                    if len(header) < 4:
+                        return
+                    size = int.from_bytes(header, "big")
+                    payload = reader.read(size)
+                    if len(payload) < size:
+                        return
+                    for values in marshal.loads(payload):
+                        self.dispatch(handlers.unpackRecord(values))
+        except Exception:
+            if logging.raiseExceptions:
+                traceback.print_exc(file=sys.stderr)
+        finally:
+            with self.lock:
+                self.connections.discard(conn)
+            conn.close()
+
+    def dispatch(self, record: logging.LogRecord) -> None:
+        """Pass a received record to the logger of the same name.
+
+        A name with no configured logger among its ancestors is prepared
+        like vlogging.getLogger does in the child.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        with self.lock:
+            self.received += 1
+        logger = self.loggers.get(record.name)
+        if logger is None:
+            logger = self.loggers[record.name] = self.getLogger(record.name)
+        logger.handle(record)
+
+    def getLogger(self, name: str) -> logging.Logger:
+        """Return the logger which handles the records of a logger of a child."""
+        if name == "root":
+            return logging.getLogger()
+        configured = vlogging._config.config["loggers"]
+        parent = name
+        while parent:
+            if parent in configured:
+                return logging.getLogger(name)
+            parent = parent.rpartition(".")[0]
+        return vlogging.getLogger(name)
+
+    def stop(self) -> None:
+        """Stop listening, close the connections and remove the socket."""
+        if self.sock is not None:
+            try:
+                # Wakes up the accepting thread, which close alone does not.
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+            self._thread.join()
+        with self.lock:
+            connections = list(self.connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def start(path: str = None) -> Aggregator:
+    """Start the aggregator of the current process.
+
+    Parameters
+    ----------
+    path : str, optional
+        socket path, by default a path in a new temporary directory
+
+    Returns
+    -------
+    Aggregator
+        aggregator
+    """
+    global _server
+    if _server is not None:
+        raise RuntimeError("The aggregator is already running")
+    vlogging._config.ensureConfigured()
+    server = Aggregator(path)
+    server.start()
+    _server = server
+    os.environ[vlogging.AGGREGATOR_VARIABLE] = f"{os.getpid()}:{server.path}"
+    return server
+
+
+def stop() -> None:
+    """Stop the aggregator of the current process."""
+    global _server
+    server, _server = _server, None
+    if server is None:
+        return
+    os.environ.pop(vlogging.AGGREGATOR_VARIABLE, None)
+    server.stop()
+
+
+def _configureChild() -> None:
+    """Send the records of a forked child to the aggregator of its parent."""
+    global _server
+    server, _server = _server, None
+    if server is not None:
+        # Only the copies of the parent's sockets are closed.
+        if server.sock is not None:
+            server.sock.close()
+        for conn in list(server.connections):
+            conn.close()
+    path = vlogging.getAggregatorPath()
+    if vlogging._config.configured and path is not None:
+        try:
+            _redirectChild(path)
+        except Exception:
+            if logging.raiseExceptions:
+                traceback.print_exc(file=sys.stderr)
+
+
+def _redirectChild(path: str) -> None:
+    """Replace the handlers of the configured loggers by one AggregatorHandler.
+
+    The inherited handlers are discarded rather than closed: closing them
+    would write the records the parent buffered a second time, and close or
+    truncate files the parent still writes.
+
+    Parameters
+    ----------
+    path : str
+        path of the Unix domain socket of the aggregator
+    """
+    config = vlogging._config
+    aggregatorHandler = handlers.AggregatorHandler(path)
+    aggregatorHandler.set_name(AGGREGATOR_HANDLER)
+    inherited = set(config.objects.get("handlers", {}).values())
+    for name in config.config["loggers"]:
+        logger = logging.getLogger(name)
+        inherited.update(logger.handlers)
+        logger.handlers = [aggregatorHandler]
+        logger.propagate = False
+    for handler in inherited:
+        handlers.discardHandler(handler)
+    config.objects["handlers"] = {AGGREGATOR_HANDLER: aggregatorHandler}
+    loggers.updateLoggerFields()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_configureChild)
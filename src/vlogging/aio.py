@@ -0,0 +1,357 @@
+"""
+asyncio front end for vlogging.
+
+The functions and Logger methods of this module create the record on the
+calling thread and hand it to a sink, which runs the handlers on a worker
+thread. The event loop never waits for formatting or I/O.
+
+    import vlogging.aio
+
+    async def main():
+        logger = vlogging.aio.getLogger(__name__)
+        logger.info("Hello vlogging!")
+        await vlogging.aio.shutdown()
+"""
+import asyncio
+import collections
+import concurrent.futures
+import logging
+import sys
+import threading
+import traceback
+from typing import Any
+
+import vlogging
+from vlogging import handlers, loggers
+
+from logging import (
+    CRITICAL,
+    ERROR,
+    WARNING,
+    INFO,
+    DEBUG,
+)
+
+
+_STOP = object()
+
+
+class Sink(object):
+    """
+    Runs the handlers of records on a single worker thread, in order.
+
+    At most maxsize records wait for the worker thread. When the worker
+    falls behind, "drop-newest" drops the new record and "drop-oldest" the
+    oldest waiting one, and the record is counted in dropped. Blocking is
+    not offered, as it would block the event loop.
+    """
+
+    def __init__(self, maxsize: int = handlers.DEFAULT_QUEUE_SIZE,
+                    overflow: str = handlers.OVERFLOW_DROP_NEWEST):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            maximum number of waiting records, by default DEFAULT_QUEUE_SIZE
+        overflow : str, optional
+            "drop-newest" or "drop-oldest", by default "drop-newest"
+        """
+        if overflow not in (handlers.OVERFLOW_DROP_NEWEST, handlers.OVERFLOW_DROP_OLDEST):
+            raise ValueError(f"Unknown overflow policy: {overflow!r}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self._records = collections.deque()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stopping = None
+        self._loggers = set()
+        self._lock = threading.Lock()
+
+    def submit(self, logger: logging.Logger, record: logging.LogRecord) -> None:
+        """Hand a record to the worker thread.
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            logger which handles the record
+        record : logging.LogRecord
+            log record
+        """
+        if self._thread is None:
+            self._start()
+        if logger not in self._loggers:
+            self._loggers.add(logger)
+        records = self._records
+        if len(records) >= self.maxsize and not self._makeRoom(records):
+            self.dropped += 1
+            return
+        records.append((logger, record))
+        self._wakeup.set()
+
+    def _makeRoom(self, records: collections.deque) -> bool:
+        """Apply the overflow policy to a full deque, returning whether the new record fits."""
+        if self.overflow == handlers.OVERFLOW_DROP_NEWEST:
+            return False
+        try:
+            item = records.popleft()
+        except IndexError:
+            # The worker thread emptied it meanwhile.
+            return True
+        if item[0] is None or item[0] is _STOP:
+            # Flush and stop markers are never dropped.
+            records.appendleft(item)
+            return False
+        self.dropped += 1
+        return True
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._startLocked()
+
+    def _startLocked(self) -> None:
+        self._thread = threading.Thread(target=self._drain, name="vlogging-aio", daemon=True)
+        # Records submitted while the previous thread stopped are waiting.
+        self._wakeup.set()
+        self._thread.start()
+
+    def _drain(self) -> None:
+        records = self._records
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while records:
+                logger, record = records.popleft()
+                if logger is None:
+                    self._flushHandlers()
+                    record.set_result(None)
+                elif logger is _STOP:
+                    self._flushHandlers()
+                    record.set_result(None)
+                    return
+                else:
+                    try:
+                        logger.handle(record)
+                    except Exception:
+                        if logging.raiseExceptions:
+                            traceback.print_exc(file=sys.stderr)
+
+    def _flushHandlers(self) -> None:
+        flushed = set()
+        for logger in list(self._loggers):
+            while logger is not None:
+                for handler in logger.handlers:
+                    if handler not in flushed:
+                        flushed.add(handler)
+                        handler.flush()
+                logger = logger.parent if logger.propagate else None
+
+    def _mark(self, marker) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        self._records.append((marker, future))
+        self._wakeup.set()
+        return future
+
+    async def flush(self) -> None:
+        """Wait until the submitted records are handled and flush the handlers."""
+        if self._thread is not None:
+            await asyncio.wrap_future(self._mark(None))
+
+    async def shutdown(self) -> None:
+        """Handle the submitted records and stop the worker thread.
+
+        Records submitted meanwhile are handled by a new worker thread.
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            if self._stopping is None:
+                self._stopping = self._mark(_STOP)
+            stopping = self._stopping
+        await asyncio.wrap_future(stopping)
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        with self._lock:
+            if self._thread is thread:
+                self._thread = None
+                self._stopping = None
+                if self._records:
+                    self._startLocked()
+
+
+_sink = Sink()
+
+
+class Logger(loggers.ProxyLogger):
+    """A logger whose methods hand records to the sink instead of the handlers."""
+
+    __slots__ = ("logger",)
+
+    def __init__(self, logger: logging.Logger):
+        """Wrap a vlogging logger.
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            logger which handles the records
+        """
+        self.logger = logger
+
+    def _handle(self, record: logging.LogRecord) -> None:
+        """Hand the record to the sink.
+
+        The message is formatted on the worker thread, after the filters, so
+        lazy arguments of dropped records are never evaluated. A mapping of
+        arguments is copied; the arguments themselves must not be changed
+        after the call.
+        """
+        args = record.args
+        if args and not isinstance(args, tuple):
+            record.args = dict(args)
+        _sink.submit(self.logger, record)
+
+
+_loggers = {}
+
+
+def getLogger(name: str = None) -> Logger:
+    """Return an asyncio logger with the specified name, creating it if necessary.
+
+    Parameters
+    ----------
+    name : str, optional
+        logger name, by default None
+
+    Returns
+    -------
+    Logger
+        logger
+    """
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers[name] = Logger(vlogging.getLogger(name))
+    return logger
+
+
+def critical(msg: Any, *args, **kwargs):
+    """Log a message with severity 'CRITICAL' without blocking the event loop.
+
+    Parameters
+    ----------
+    msg : Any
+        log message
+    """
+    if _logger.isEnabledFor(CRITICAL):
+        _logger._log(CRITICAL, msg, args, **kwargs)
+
+
+def fatal(msg: Any, *args, **kwargs):
+    """Don't use this function, use critical() instead.
+
+    Parameters
+    ----------
+    msg : Any
+        log message
+    """
+    if _logger.isEnabledFor(CRITICAL):
+        _logger._log(CRITICAL, msg, args, **kwargs)
+
+
+def error(msg: Any, *args, **kwargs):
+    """Log a message with severity 'ERROR' without blocking the event loop.
+
+    Parameters
+    ----------
+    msg : Any
+        log message
+    """
+    if _logger.isEnabledFor(ERROR):
+        _logger._log(ERROR, msg, args, **kwargs)
+
+
+def exception(msg: Any, *args, exc_info=True, **kwargs):
+    """Log a message with severity 'ERROR', with exception information.
+
+    Parameters
+    ----------
+    msg : Any
+        log message
+    exc_info : bool, optional
+        exception information, by default True
+    """
+    if _logger.isEnabledFor(ERROR):
+        _logger._log(ERROR, msg, args, exc_info=exc_info, **kwargs)
+
+
+def warning(msg: Any, *args, **kwargs):
+    """Log a message with severity 'WARNING' without blocking the event loop.
+
+    Parameters
+    ----------
+    msg : Any
+        log message
+    """
+    if _logger.isEnabledFor(WARNING):
+        _logger._log(WARNING, msg, args, **kwargs)
+
+
+def info(msg: Any, *args, **kwargs):
+    """Log a message with severity 'INFO' without blocking the event loop.
+
+    Parameters
+    ----------
+    msg : Any
+        log message
+    """
+    if _logger.isEnabledFor(INFO):
+        _logger._log(INFO, msg, args, **kwargs)
+
+
+def debug(msg: Any, *args, **kwargs):
+    """Log a message with severity 'DEBUG' without blocking the event loop.
+
+    Parameters
+    ----------
+    msg : Any
+        log message
+    """
+    if _logger.isEnabledFor(DEBUG):
+        _logger._log(DEBUG, msg, args, **kwargs)
+
+
+def log(level: int, msg: Any, *args, **kwargs):
+    """Log 'msg % args' with the integer severity 'level' without blocking the event loop.
+
+    Parameters
+    ----------
+    level : int
+        log level
+    msg : Any
+        log message
+    """
+    if _logger.isEnabledFor(level):
+        _logger._log(level, msg, args, **kwargs)
+
+
+async def flush() -> None:
+    """Wait until the logged records are written."""
+    await _sink.flush()
+
+
+async def shutdown() -> None:
+    """Write the logged records and stop the worker thread."""
+    await _sink.shutdown()
+
+
+class _LazyLogger(object):
+    """Stands in for the asyncio vlogging logger until a module function is called."""
+
+    def __getattr__(self, name: str) -> Any:
+        global _logger
+        _logger = getLogger(vlogging.DEFAUT_LOGGER)
+        return getattr(_logger, name)
+
+
+_logger = _LazyLogger()
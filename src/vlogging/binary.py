@@ -0,0 +1,298 @@
+"""
+Compact binary encoding of log records.
+
+A file starts with MAGIC and holds a sequence of entries. A string entry
+defines an id for a logger name, format string, path name or function
+name, and is written only the first time the string is used. A record
+entry holds a struct-packed header with the creation time, level, string
+ids and line number, followed by the raw message arguments:
+
+    string entry  "S" id:u32 length:u32 utf-8 bytes
+    record entry  "R" created:f64 levelno:u16 logger:u32 msg:u32 pathname:u32
+                  funcName:u32 lineno:u32 flags:u8 nargs:u16 args...
+                  [exc_text] [stack_info]
+
+Use ``python -m vlogging.decode`` to render a file as text.
+"""
+import logging
+import struct
+from collections.abc import Mapping
+from typing import Any
+
+from vlogging.loggers import Lazy
+
+MAGIC = b"VLOG\x01"
+STRING = b"S"
+RECORD = b"R"
+STRING_HEADER = struct.Struct("<cII")
+RECORD_HEADER = struct.Struct("<cdHIIIIIBH")
+LENGTH = struct.Struct("<I")
+INT = struct.Struct("<q")
+FLOAT = struct.Struct("<d")
+FLAG_EXC_TEXT = 0x01
+FLAG_STACK_INFO = 0x02
+FLAG_MAPPING = 0x04
+TEMPORARY_ID = 0
+DEFAULT_MAX_STRINGS = 65536
+
+
+class Text(str):
+    """A decoded argument which was neither a string nor a number.
+
+    It holds the str() text of the original object and renders it for
+    both %s and %r.
+    """
+
+    def __repr__(self) -> str:
+        return str.__str__(self)
+
+
+class Encoder(object):
+    """Encodes log records and remembers which strings were written."""
+
+    def __init__(self, maxStrings: int = DEFAULT_MAX_STRINGS):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        maxStrings : int, optional
+            maximum number of interned strings; message strings beyond it
+            are written before every record, by default DEFAULT_MAX_STRINGS
+        """
+        self.maxStrings = maxStrings
+        self.strings = {}
+
+    def reset(self) -> None:
+        """Forget the written strings, for example when a new file is started."""
+        self.strings = {}
+
+    def intern(self, parts: list, text: str, bounded: bool = False) -> int:
+        """Return the id of a string, adding its string entry to parts if needed.
+
+        Parameters
+        ----------
+        parts : list
+            encoded parts of the current entry
+        text : str
+            string
+        bounded : bool, optional
+            whether the string is only interned while there is room, by default False
+
+        Returns
+        -------
+        int
+            string id
+        """
+        stringId = self.strings.get(text)
+        if stringId is None:
+            data = text.encode("utf-8", "surrogateescape")
+            if bounded and len(self.strings) >= self.maxStrings:
+                stringId = TEMPORARY_ID
+            else:
+                stringId = self.strings[text] = len(self.strings) + 1
+            parts.append(STRING_HEADER.pack(STRING, stringId, len(data)))
+            parts.append(data)
+        return stringId
+
+    def encode(self, record: logging.LogRecord, excText: str = None) -> bytes:
+        """Encode a log record.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        excText : str, optional
+            formatted exception information, by default None
+
+        Returns
+        -------
+        bytes
+            encoded entries
+        """
+        parts = []
+        msg = record.msg if isinstance(record.msg, str) else str(record.msg)
+        loggerId = self.intern(parts, record.name)
+        msgId = self.intern(parts, msg, bounded=True)
+        pathId = self.intern(parts, record.pathname or "")
+        funcId = self.intern(parts, record.funcName or "")
+        args = record.args or ()
+        flags = 0
+        if isinstance(args, Mapping):
+            flags |= FLAG_MAPPING
+            args = [item for pair in args.items() for item in pair]
+        if excText:
+            flags |= FLAG_EXC_TEXT
+        if record.stack_info:
+            flags |= FLAG_STACK_INFO
+        parts.append(RECORD_HEADER.pack(RECORD, record.created, record.levelno, loggerId,
+                                        msgId, pathId, funcId, record.lineno or 0,
+                                        flags, len(args)))
+        for arg in args:
+            encodeValue(parts, arg)
+        if excText:
+            encodeString(parts, excText)
+        if record.stack_info:
+            encodeString(parts, record.stack_info)
+        return b"".join(parts)
+
+
+def encodeString(parts: list, text: str) -> None:
+    """Add a length-prefixed UTF-8 string to parts."""
+    data = text.encode("utf-8", "surrogateescape")
+    parts.append(LENGTH.pack(len(data)))
+    parts.append(data)
+
+
+def encodeValue(parts: list, value: Any) -> None:
+    """Add a tagged message argument to parts.
+
+    None, booleans, integers, floats, strings and bytes keep their
+    type. Lazy arguments are stored as their value. Other integral and
+    real numbers, such as IntEnum members and numpy scalars, are stored as
+    int and float. Other objects are stored as their str() text.
+    """
+    valueType = type(value)
+    if valueType is Lazy:
+        value = value.value
+        valueType = type(value)
+    if valueType is str:
+        parts.append(b"s")
+        encodeString(parts, value)
+    elif valueType is int and -2 ** 63 <= value < 2 ** 63:
+        parts.append(b"i")
+        parts.append(INT.pack(value))
+    elif valueType is int:
+        parts.append(b"I")
+        encodeString(parts, str(value))
+    elif valueType is float:
+        parts.append(b"f")
+        parts.append(FLOAT.pack(value))
+    elif value is None:
+        parts.append(b"N")
+    elif value is True:
+        parts.append(b"T")
+    elif value is False:
+        parts.append(b"F")
+    elif valueType is bytes:
+        parts.append(b"b")
+        parts.append(LENGTH.pack(len(value)))
+        parts.append(value)
+    else:
+        # Imported here, so that importing vlogging does not import numbers.
+        import numbers
+
+        if isinstance(value, bool):
+            parts.append(b"T" if value else b"F")
+        elif isinstance(value, numbers.Integral):
+            encodeValue(parts, int(value))
+        elif isinstance(value, numbers.Real):
+            encodeValue(parts, float(value))
+        else:
+            parts.append(b"o")
+            encodeString(parts, str(value))
+
+
+class Decoder(object):
+    """Decodes the entries of a binary log stream into log records."""
+
+    def __init__(self, stream):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        stream : binary file
+            stream positioned at the start of the file
+        """
+        self.stream = stream
+        self.strings = {}
+        if self._read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a vlogging binary log file")
+
+    def _read(self, size: int) -> bytes:
+        data = self.stream.read(size)
+        while data is not None and len(data) < size:
+            more = self.stream.read(size - len(data))
+            if not more:
+                break
+            data += more
+        if data is None or len(data) < size:
+            raise EOFError
+        return data
+
+    def _readString(self) -> str:
+        length, = LENGTH.unpack(self._read(LENGTH.size))
+        return self._read(length).decode("utf-8", "surrogateescape")
+
+    def _readValue(self) -> Any:
+        tag = self._read(1)
+        if tag == b"s":
+            return self._readString()
+        if tag == b"i":
+            return INT.unpack(self._read(INT.size))[0]
+        if tag == b"I":
+            return int(self._readString())
+        if tag == b"f":
+            return FLOAT.unpack(self._read(FLOAT.size))[0]
+        if tag == b"N":
+            return None
+        if tag == b"T":
+            return True
+        if tag == b"F":
+            return False
+        if tag == b"b":
+            length, = LENGTH.unpack(self._read(LENGTH.size))
+            return self._read(length)
+        if tag == b"o":
+            return Text(self._readString())
+        raise ValueError(f"Unknown argument tag: {tag!r}")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> logging.LogRecord:
+        """Return the next record, or stop at the end of the stream."""
+        while True:
+            try:
+                kind = self._read(1)
+                if kind == STRING:
+                    rest = self._read(STRING_HEADER.size - 1)
+                    _, stringId, length = STRING_HEADER.unpack(kind + rest)
+                    self.strings[stringId] = self._read(length).decode("utf-8", "surrogateescape")
+                elif kind == RECORD:
+                    return self._readRecord(kind + self._read(RECORD_HEADER.size - 1))
+                elif kind == MAGIC[:1]:
+                    # Another handler started appending to the file.
+                    if self._read(len(MAGIC) - 1) != MAGIC[1:]:
+                        raise ValueError("Corrupt vlogging binary log file")
+                    self.strings = {}
+                else:
+                    raise ValueError(f"Unknown entry type: {kind!r}")
+            except EOFError:
+                raise StopIteration
+
+    def _readRecord(self, header: bytes) -> logging.LogRecord:
+        (_, created, levelno, loggerId, msgId, pathId, funcId, lineno,
+         flags, nargs) = RECORD_HEADER.unpack(header)
+        args = tuple(self._readValue() for _ in range(nargs))
+        if flags & FLAG_MAPPING:
+            args = dict(zip(args[0::2], args[1::2]))
+        excText = self._readString() if flags & FLAG_EXC_TEXT else None
+        stackInfo = self._readString() if flags & FLAG_STACK_INFO else None
+        pathname = self.strings.get(pathId, "")
+        record = logging.makeLogRecord({
+            "name": self.strings.get(loggerId, ""),
+            "msg": self.strings.get(msgId, ""),
+            "args": args or None,
+            "levelno": levelno,
+            "levelname": logging.getLevelName(levelno),
+            "pathname": pathname,
+            "lineno": lineno,
+            "funcName": self.strings.get(funcId, ""),
+            "created": created,
+            "msecs": int((created - int(created)) * 1000) + 0.0,
+            "exc_text": excText,
+            "stack_info": stackInfo,
+        })
+        record.filename = pathname.replace("\\", "/").rsplit("/", 1)[-1]
+        record.module = record.filename.rsplit(".", 1)[0]
+        return record
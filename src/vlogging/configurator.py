@@ -0,0 +1,69 @@
+import logging
+import logging.config
+
+
+class Configurator(logging.config.DictConfigurator):
+    """
+    Configure logging using a dictionary.
+
+    In addition to the standard schema, handlers may refer to other handlers
+    by id with a ``targets`` list. The ids are replaced with the configured
+    handler objects before the handler is created. Formatters created from
+    a ``class`` receive the keys which are not part of the standard schema
+    as keyword arguments.
+    """
+
+    FORMATTER_KEYS = ("class", "format", "datefmt", "style", "validate", "defaults")
+
+    def configure_formatter(self, config: dict) -> logging.Formatter:
+        """Configure a formatter from a dictionary.
+
+        Parameters
+        ----------
+        config : dict
+            formatter config
+
+        Returns
+        -------
+        logging.Formatter
+            formatter
+        """
+        options = {}
+        if "()" not in config and config.get("class"):
+            options = {key: config[key] for key in config
+                       if key not in self.FORMATTER_KEYS and logging.config.valid_ident(key)}
+        if not options:
+            return super().configure_formatter(config)
+        for key in ("validate", "defaults"):
+            if key in config:
+                options[key] = config[key]
+        formatterClass = self.resolve(config["class"])
+        return formatterClass(config.get("format", None), config.get("datefmt", None),
+                              config.get("style", "%"), **options)
+
+    def configure_handler(self, config: dict) -> logging.Handler:
+        """Configure a handler from a dictionary.
+
+        Parameters
+        ----------
+        config : dict
+            handler config
+
+        Returns
+        -------
+        logging.Handler
+            handler
+        """
+        if "targets" in config:
+            targets = []
+            for name in config["targets"]:
+                try:
+                    target = self.config["handlers"][name]
+                    if not isinstance(target, logging.Handler):
+                        raise TypeError("target not configured yet")
+                    targets.append(target)
+                except Exception as e:
+                    raise ValueError(f"Unable to set target handler {name!r}") from e
+            config = dict(config)
+            config["targets"] = targets
+        return super().configure_handler(config)
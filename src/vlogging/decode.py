@@ -0,0 +1,94 @@
+"""
+Render binary vlogging files as text.
+
+    python -m vlogging.decode [--format simple|basic|FORMAT] [--datefmt DATEFMT]
+                              [--style %|{|$] FILE [FILE ...]
+
+Use "-" to read from standard input. Records are decoded and written one
+at a time, so large files and pipes are streamed.
+"""
+import argparse
+import sys
+
+from vlogging import binary
+from vlogging.formatters import (
+    SIMPLE_FORMAT,
+    BASIC_FORMAT,
+    Formatter,
+)
+
+FORMATS = {
+    "simple": SIMPLE_FORMAT,
+    "basic": BASIC_FORMAT,
+}
+
+
+def decode(stream, output, formatter: Formatter) -> int:
+    """Render the records of a binary log stream.
+
+    Parameters
+    ----------
+    stream : binary file
+        binary log stream
+    output : text file
+        output stream
+    formatter : Formatter
+        formatter used to render the records
+
+    Returns
+    -------
+    int
+        number of rendered records
+    """
+    count = 0
+    for record in binary.Decoder(stream):
+        try:
+            text = formatter.format(record)
+        except Exception:
+            record.args, record.msg = None, f"{record.msg} {record.args!r}"
+            text = formatter.format(record)
+        output.write(text + "\n")
+        count += 1
+    return count
+
+
+def main(argv: list = None) -> int:
+    """Run the decoder command line.
+
+    Parameters
+    ----------
+    argv : list, optional
+        command line arguments, by default sys.argv[1:]
+
+    Returns
+    -------
+    int
+        exit status
+    """
+    parser = argparse.ArgumentParser(prog="python -m vlogging.decode",
+                                     description="Render binary vlogging files as text.")
+    parser.add_argument("files", nargs="+", metavar="FILE",
+                        help="binary log file, '-' for standard input")
+    parser.add_argument("-f", "--format", default="simple",
+                        help="'simple', 'basic' or a format string (default: simple)")
+    parser.add_argument("--datefmt", default=None, help="date format string")
+    parser.add_argument("--style", default="%", choices=["%", "{", "$"],
+                        help="format string style (default: %%)")
+    args = parser.parse_args(argv)
+
+    formatter = Formatter(FORMATS.get(args.format, args.format), args.datefmt, args.style)
+    for filename in args.files:
+        try:
+            if filename == "-":
+                decode(sys.stdin.buffer, sys.stdout, formatter)
+            else:
+                with open(filename, "rb") as stream:
+                    decode(stream, sys.stdout, formatter)
+        except (OSError, ValueError) as e:
+            print(f"{filename}: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import logging
+import threading
+from collections import OrderedDict
+
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 100
+DEFAULT_MAX_SITES = 1024
+SUMMARY_INTERVAL = 1.0
+SUMMARY_FORMAT = "suppressed %d similar messages: %s"
+_SUMMARY = object()
+
+
+def getRateLimitFilterConfig(rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+            sampling: dict = None, maxSites: int = DEFAULT_MAX_SITES) -> dict:
+    """Create and return a rate limit filter config.
+
+    Parameters
+    ----------
+    rate : float, optional
+        records per second allowed for each call site, by default DEFAULT_RATE
+    burst : int, optional
+        records a call site may log at once before it is limited, by default DEFAULT_BURST
+    sampling : dict, optional
+        probability of keeping a record for each level name, by default None
+    maxSites : int, optional
+        maximum number of call sites tracked, by default DEFAULT_MAX_SITES
+
+    Returns
+    -------
+    dict
+        rate limit filter config.
+    """
+    config = {
+        "()": f"{RateLimitFilter.__module__}.{RateLimitFilter.__name__}",
+        "rate": rate,
+        "burst": burst,
+        "maxSites": maxSites,
+    }
+    if sampling is not None:
+        config["sampling"] = sampling
+    return config
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Filter that limits how often each call site may log.
+
+    Every call site, identified by the path name and line number of the
+    record, has a token bucket that refills at rate tokens per second up to
+    burst tokens, measured by the creation time of the records. A record is
+    dropped when its bucket is empty. The dropped records of a call site are
+    reported by a summary record, "suppressed N similar messages: <msg>",
+    with the name, level and location of the last dropped record and a
+    ``suppressed`` attribute. It is passed to the logger of the record if
+    the filter is attached to that logger, otherwise to the handlers of the
+    logger and its ancestors the filter is attached to. It is passed
+    before the next record the call site is allowed to log, when the call
+    site was quiet long enough to log again, checked at most every
+    SUMMARY_INTERVAL seconds, when the call site is forgotten, and by
+    reportSuppressed. The records themselves are never changed.
+
+    Records may also be sampled per level before they reach the bucket,
+    for example ``{"DEBUG": 0.01}`` keeps one debug record in a hundred.
+
+    At most maxSites call sites are tracked; the least recently used one is
+    forgotten first.
+    """
+
+    fields = frozenset(("name", "levelno", "msg", "pathname", "lineno", "funcName", "created"))
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                    sampling: dict = None, maxSites: int = DEFAULT_MAX_SITES, name: str = ""):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        rate : float, optional
+            records per second allowed for each call site, by default DEFAULT_RATE
+        burst : int, optional
+            records a call site may log at once before it is limited, by default DEFAULT_BURST
+        sampling : dict, optional
+            probability of keeping a record for each level, by default None
+        maxSites : int, optional
+            maximum number of call sites tracked, by default DEFAULT_MAX_SITES
+        name : str, optional
+            logger name the filter is restricted to, by default ""
+        """
+        super().__init__(name)
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.sampling = {}
+        for level, probability in (sampling or {}).items():
+            if isinstance(level, str):
+                level = logging.getLevelName(level)
+            self.sampling[level] = float(probability)
+        self._random = None
+        if self.sampling:
+            # Imported here, so that importing vlogging does not import random.
+            import random
+
+            self._random = random.random
+        self.maxSites = maxSites
+        self.sites = OrderedDict()
+        self.dropped = 0
+        self.sampled = 0
+        self.lock = threading.Lock()
+        self._lastSummary = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Determine if the record is logged.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        bool
+            whether the record is logged
+        """
+        if self.nlen and not super().filter(record):
+            return False
+        if record.__dict__.get("_rateLimitSummary") is _SUMMARY:
+            # A summary record of a rate limit filter.
+            return True
+        probability = self.sampling.get(record.levelno)
+        if probability is not None and self._random() >= probability:
+            self.sampled += 1
+            return False
+
+        key = (record.pathname, record.lineno)
+        now = record.created
+        summaries = []
+        lock = self.lock
+        lock.acquire()
+        try:
+            site = self.sites.get(key)
+            if site is None:
+                # tokens, last refill, suppressed records, last suppressed record
+                site = self.sites[key] = [self.burst, now, 0, None]
+                if len(self.sites) > self.maxSites:
+                    evictedKey, evicted = self.sites.popitem(last=False)
+                    if evicted[2]:
+                        summaries.append(self._summarize(evictedKey, evicted))
+            else:
+                self.sites.move_to_end(key)
+                if now > site[1]:
+                    tokens = site[0] + (now - site[1]) * self.rate
+                    site[0] = tokens if tokens < self.burst else self.burst
+                    site[1] = now
+            if site[0] < 1.0:
+                site[2] += 1
+                site[3] = (record.name, record.levelno, record.funcName, record.msg)
+                self.dropped += 1
+                allowed = False
+            else:
+                site[0] -= 1.0
+                if site[2]:
+                    summaries.append(self._summarize(key, site))
+                allowed = True
+            if now - self._lastSummary >= SUMMARY_INTERVAL:
+                self._lastSummary = now
+                for otherKey, other in self.sites.items():
+                    if (other[2] and otherKey != key
+                            and other[0] + (now - other[1]) * self.rate >= 1.0):
+                        summaries.append(self._summarize(otherKey, other))
+        finally:
+            lock.release()
+
+        if summaries:
+            self._emitSummaries(summaries)
+        return allowed
+
+    def _summarize(self, key: tuple, site: list) -> logging.LogRecord:
+        """Create the summary record of a call site and reset its count."""
+        name, levelno, funcName, msg = site[3]
+        summary = logging.LogRecord(name, levelno, key[0], key[1], SUMMARY_FORMAT,
+                                    (site[2], msg), None, funcName)
+        summary.suppressed = site[2]
+        summary._rateLimitSummary = _SUMMARY
+        site[2] = 0
+        site[3] = None
+        return summary
+
+    def _emitSummaries(self, summaries: list) -> None:
+        """Pass summary records to the logger or handlers the filter is attached to."""
+        for summary in summaries:
+            logger = logging.getLogger(summary.name)
+            if self in logger.filters:
+                logger.handle(summary)
+                continue
+            while logger:
+                for handler in logger.handlers:
+                    if self in handler.filters and summary.levelno >= handler.level:
+                        handler.handle(summary)
+                logger = logger.parent if logger.propagate else None
+
+    def reportSuppressed(self) -> None:
+        """Log the summary records of all call sites with suppressed records."""
+        with self.lock:
+            summaries = [self._summarize(key, site) for key, site in self.sites.items()
+                         if site[2]]
+        self._emitSummaries(summaries)
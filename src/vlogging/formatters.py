@@ -1,9 +1,29 @@
+import builtins
+import json
+import json.encoder
 import logging
+import math
+import operator
+import re
+import string
+import threading
+import time
+import traceback
+from collections import OrderedDict
 from datetime import datetime
+from typing import Any
 
 SIMPLE_FORMAT = "%(asctime)s %(levelname)-8s %(message)s"
 BASIC_FORMAT = "%(asctime)s %(levelname)-8s %(filename)s:%(lineno)d: %(message)s"
 DATE_FMT_MICROSECONDS = "%Y-%m-%d %H:%M:%S.%f"
+DATE_FMT_RFC3339_UTC = "rfc3339-utc"
+DATE_FMT_EPOCH = "epoch"
+JSON_FIELDS = ("asctime", "levelname", "name", "message")
+DEFAULT_TRACEBACK_CACHE_SIZE = 256
+
+_CAUSE_MESSAGE = "\nThe above exception was the direct cause of the following exception:\n\n"
+_CONTEXT_MESSAGE = "\nDuring handling of the above exception, another exception occurred:\n\n"
+_EXCEPTION_GROUPS = getattr(builtins, "BaseExceptionGroup", ())
 
 def getFormatConfig(format: str, datefmt: str = None, style: str = "%",
             className: str = "vlogging.formatters.Formatter",  **kwargs) -> dict:
@@ -54,6 +74,272 @@ def getMicrosecondsFormatConfig(format: str = BASIC_FORMAT, style: str = "%") ->
     return getFormatConfig(format, DATE_FMT_MICROSECONDS, style)
 
 
+def splitTimestamp(created: float) -> tuple:
+    """Split a timestamp into whole seconds and microseconds.
+
+    The microseconds are rounded the same way as datetime.fromtimestamp,
+    including the rollover into the next second.
+
+    Parameters
+    ----------
+    created : float
+        time.time() value
+
+    Returns
+    -------
+    tuple
+        seconds and microseconds.
+    """
+    frac, seconds = math.modf(created)
+    microseconds = round(frac * 1e6)
+    if microseconds >= 1000000:
+        seconds += 1
+        microseconds -= 1000000
+    elif microseconds < 0:
+        seconds -= 1
+        microseconds += 1000000
+    return int(seconds), microseconds
+
+
+def _microsecondsLayout(datefmt: str) -> str:
+    """Return how the %f directive is used in the date format string.
+
+    Returns "none" when the format has no %f, "suffix" when the only %f is
+    at the end of the format, and "other" otherwise.
+    """
+    found = []
+    i = 0
+    while i < len(datefmt) - 1:
+        if datefmt[i] == "%":
+            if datefmt[i + 1] == "f":
+                found.append(i)
+            i += 2
+        else:
+            i += 1
+    if not found:
+        return "none"
+    if len(found) == 1 and found[0] == len(datefmt) - 2:
+        return "suffix"
+    return "other"
+
+
+_PERCENT_PATTERN = re.compile(
+    r"%(?:(?P<escaped>%)|\((?P<field>\w+)\)(?P<spec>[#0+ -]*\d*(?:\.\d+)?[diouxefgcrsa]))", re.I)
+_FIELD_PATTERN = re.compile(r"\w+")
+
+
+def _parsePercentFormat(fmt: str) -> tuple:
+    template = []
+    fields = []
+    pos = 0
+    for match in _PERCENT_PATTERN.finditer(fmt):
+        literal = fmt[pos:match.start()]
+        if "%" in literal:
+            return None
+        template.append(literal)
+        if match.group("escaped"):
+            template.append("%%")
+        else:
+            fields.append(match.group("field"))
+            template.append("%" + match.group("spec"))
+        pos = match.end()
+    literal = fmt[pos:]
+    if "%" in literal:
+        return None
+    template.append(literal)
+    return "".join(template), fields
+
+
+def _parseBraceFormat(fmt: str) -> tuple:
+    template = []
+    fields = []
+    try:
+        parsed = list(string.Formatter().parse(fmt))
+    except ValueError:
+        return None
+    for literal, field, spec, conversion in parsed:
+        template.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if not _FIELD_PATTERN.fullmatch(field) or "{" in (spec or ""):
+            return None
+        replacement = str(len(fields))
+        if conversion:
+            replacement += "!" + conversion
+        if spec:
+            replacement += ":" + spec
+        template.append("{" + replacement + "}")
+        fields.append(field)
+    return "".join(template), fields
+
+
+def _parseTemplateFormat(fmt: str) -> tuple:
+    template = []
+    fields = []
+    pos = 0
+    for match in string.Template.pattern.finditer(fmt):
+        if match.group("invalid") is not None:
+            return None
+        template.append(fmt[pos:match.start()].replace("%", "%%"))
+        field = match.group("named") or match.group("braced")
+        if field is None:
+            template.append("$")
+        else:
+            template.append("%s")
+            fields.append(field)
+        pos = match.end()
+    template.append(fmt[pos:].replace("%", "%%"))
+    return "".join(template), fields
+
+
+def parseFormat(fmt: str, style: str = "%") -> tuple:
+    """Split a format string into a positional template and its field names.
+
+    Parameters
+    ----------
+    fmt : str
+        The format string to parse.
+    style : str, optional
+        The style of the format string ('%', '{' or '$'), by default "%"
+
+    Returns
+    -------
+    tuple
+        positional template and the list of field names in order, or None
+        if the format string can not be parsed.
+    """
+    if style == "%":
+        return _parsePercentFormat(fmt)
+    if style == "{":
+        return _parseBraceFormat(fmt)
+    if style == "$":
+        return _parseTemplateFormat(fmt)
+    return None
+
+
+def compileFormat(fmt: str, style: str = "%") -> tuple:
+    """Compile a format string into a render function.
+
+    The render function reads only the record attributes referenced by the
+    format string and interpolates them positionally.
+
+    Parameters
+    ----------
+    fmt : str
+        The format string to compile.
+    style : str, optional
+        The style of the format string ('%', '{' or '$'), by default "%"
+
+    Returns
+    -------
+    tuple
+        render function and the referenced field names, or (None, None) if
+        the format string cannot be compiled.
+    """
+    parsed = parseFormat(fmt, style)
+    if parsed is None:
+        return None, None
+    template, fields = parsed
+
+    if not fields:
+        text = template % () if style != "{" else template.format()
+        render = lambda record: text
+    elif len(fields) == 1:
+        getter = operator.attrgetter(fields[0])
+        if style == "{":
+            render = lambda record: template.format(getter(record))
+        else:
+            render = lambda record: template % (getter(record),)
+    else:
+        getter = operator.attrgetter(*fields)
+        if style == "{":
+            render = lambda record: template.format(*getter(record))
+        else:
+            render = lambda record: template % getter(record)
+    return render, frozenset(fields)
+
+
+def getExceptionChain(ei: tuple) -> list:
+    """Return the exceptions printed for an exception, the oldest first.
+
+    The chain follows ``__cause__`` and ``__context__`` the same way as
+    traceback.print_exception.
+
+    Parameters
+    ----------
+    ei : tuple
+        exception type, value and traceback as returned by sys.exc_info()
+
+    Returns
+    -------
+    list
+        exception type, value, traceback and the message printed before the
+        exception for every exception of the chain, or None if the chain
+        contains an exception group.
+    """
+    excType, value, tb = ei
+    chain = []
+    seen = set()
+    while True:
+        if isinstance(value, _EXCEPTION_GROUPS):
+            return None
+        seen.add(id(value))
+        cause = value.__cause__
+        context = value.__context__
+        if cause is not None and id(cause) not in seen:
+            chain.append((excType, value, tb, _CAUSE_MESSAGE))
+            value = cause
+        elif context is not None and not value.__suppress_context__ and id(context) not in seen:
+            chain.append((excType, value, tb, _CONTEXT_MESSAGE))
+            value = context
+        else:
+            chain.append((excType, value, tb, None))
+            break
+        excType, tb = type(value), value.__traceback__
+    chain.reverse()
+    return chain
+
+
+def getTracebackKey(tb) -> tuple:
+    """Return the code object, line and instruction of every frame of a traceback."""
+    key = []
+    while tb is not None:
+        key.append((tb.tb_frame.f_code, tb.tb_lineno, tb.tb_lasti))
+        tb = tb.tb_next
+    return tuple(key)
+
+
+_STYLES = {
+    logging.PercentStyle: "%",
+    logging.StrFormatStyle: "{",
+    logging.StringTemplateStyle: "$",
+}
+
+
+def getFormatterFields(formatter: logging.Formatter) -> frozenset:
+    """Return the record attributes used by a formatter.
+
+    Parameters
+    ----------
+    formatter : logging.Formatter
+        formatter, None for the default formatter of a handler
+
+    Returns
+    -------
+    frozenset
+        field names, or None if the formatter may use any attribute.
+    """
+    if formatter is None:
+        formatter = logging._defaultFormatter
+    if isinstance(formatter, Formatter):
+        return formatter.fields
+    if type(formatter) is logging.Formatter:
+        style = _STYLES.get(type(formatter._style))
+        if style is not None and not getattr(formatter._style, "_defaults", None):
+            return compileFormat(formatter._style._fmt, style)[1]
+    return None
+
+
 class Formatter(logging.Formatter):
     """
     Formatter instances are used to convert a LogRecord to text.
@@ -83,13 +369,151 @@ class Formatter(logging.Formatter):
     %(processName)s     Process name (if available)
     %(message)s         The result of record.getMessage(), computed just as
                         the record is emitted
+
+    The frames of formatted tracebacks are cached, keyed by the exception
+    types and the code, line and instruction of every frame, so an exception
+    raised again at the same place only has its message formatted. With
+    compactTracebacks, a traceback is printed in full once, numbered, and
+    then only referred to as "same traceback as #N" while it is cached.
     """
 
+    def __init__(self, fmt: str = None, datefmt: str = None, style: str = "%",
+                    *args, tracebackCacheSize: int = DEFAULT_TRACEBACK_CACHE_SIZE,
+                    compactTracebacks: bool = False, **kwargs):
+        """Initialize the formatter and compile its format string.
+
+        Parameters
+        ----------
+        fmt : str, optional
+            The format string to use, by default None
+        datefmt : str, optional
+            The date format string to use, by default None
+        style : str, optional
+            The style parameter to use, by default "%"
+        tracebackCacheSize : int, optional
+            The number of cached tracebacks, 0 disables the cache, by default
+            DEFAULT_TRACEBACK_CACHE_SIZE
+        compactTracebacks : bool, optional
+            Refer to tracebacks printed before by their number, by default False
+        """
+        super().__init__(fmt, datefmt, style, *args, **kwargs)
+        self._render, self.fields = None, None
+        if not getattr(self._style, "_defaults", None):
+            self._render, self.fields = compileFormat(self._style._fmt, style)
+        self._usesTime = self._style.usesTime()
+        if compactTracebacks and tracebackCacheSize < 1:
+            raise ValueError("compactTracebacks requires a traceback cache")
+        self.tracebackCacheSize = tracebackCacheSize
+        self.compactTracebacks = compactTracebacks
+        self._tracebacks = OrderedDict()
+        self._tracebackCount = 0
+        self._tracebackLock = threading.Lock()
+
+    def usesTime(self) -> bool:
+        """Check if the format uses the creation time of the record.
+
+        Returns
+        -------
+        bool
+            True if the format uses the creation time.
+        """
+        return self._usesTime
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        """Format the record with the compiled format string.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        str
+            formatted text
+        """
+        if self._render is None:
+            return super().formatMessage(record)
+        try:
+            return self._render(record)
+        except AttributeError as e:
+            raise ValueError("Formatting field not found in record: %s" % e)
+
+
+    def formatException(self, ei: tuple) -> str:
+        """Format an exception with its cached traceback.
+
+        Parameters
+        ----------
+        ei : tuple
+            exception type, value and traceback as returned by sys.exc_info()
+
+        Returns
+        -------
+        str
+            formatted text, the same as logging.Formatter.formatException
+            unless compactTracebacks is set
+        """
+        if self.tracebackCacheSize < 1 or ei[1] is None:
+            return super().formatException(ei)
+        chain = getExceptionChain(ei)
+        if chain is None:
+            return super().formatException(ei)
+        key = tuple((excType, getTracebackKey(tb)) for excType, _, tb, _ in chain)
+        lock = self._tracebackLock
+        lock.acquire()
+        try:
+            entry = self._tracebacks.get(key)
+            if entry is not None:
+                self._tracebacks.move_to_end(key)
+        finally:
+            lock.release()
+
+        if entry is not None and self.compactTracebacks:
+            excType, value = chain[-1][:2]
+            lines = [f"Traceback: same traceback as #{entry[0]}\n"]
+            lines.extend(traceback.format_exception_only(excType, value))
+            return self._stripNewline("".join(lines))
+        if entry is None:
+            stacks = ["".join(traceback.TracebackException(excType, value, tb).stack.format())
+                      for excType, value, tb, _ in chain]
+            lock.acquire()
+            try:
+                self._tracebackCount += 1
+                entry = self._tracebacks[key] = (self._tracebackCount, stacks)
+                if len(self._tracebacks) > self.tracebackCacheSize:
+                    self._tracebacks.popitem(last=False)
+            finally:
+                lock.release()
+
+        tracebackId, stacks = entry
+        header = "Traceback (most recent call last):\n"
+        if self.compactTracebacks:
+            header = f"Traceback #{tracebackId} (most recent call last):\n"
+        lines = []
+        for (excType, value, _, message), stack in zip(chain, stacks):
+            if message is not None:
+                lines.append(message)
+            if stack:
+                lines.append(header)
+                lines.append(stack)
+            lines.extend(traceback.format_exception_only(excType, value))
+        return self._stripNewline("".join(lines))
+
+    def _stripNewline(self, text: str) -> str:
+        return text[:-1] if text[-1:] == "\n" else text
+
+    _timeCache = (None, None, None)
 
     def formatTime(self, record: logging.LogRecord, datefmt: str=None) -> str:
         """
         Return the creation time of the specified LogRecord as formatted text.
 
+        The text of the current second is cached, so only the milliseconds
+        or microseconds are rendered for each record. Use
+        DATE_FMT_RFC3339_UTC or DATE_FMT_EPOCH as datefmt for UTC RFC 3339
+        text or the raw epoch seconds.
+
         Parameters
         ----------
         record : logging.LogRecord
@@ -102,9 +526,163 @@ class Formatter(logging.Formatter):
         str
             formatted text
         """
+        if datefmt == DATE_FMT_EPOCH:
+            return "%.6f" % record.created
+        seconds, microseconds = splitTimestamp(record.created)
+        cacheSeconds, cacheDatefmt, cache = self._timeCache
+        if cacheSeconds != seconds or cacheDatefmt != datefmt:
+            cache = self._renderSecond(seconds, datefmt)
+            self._timeCache = (seconds, datefmt, cache)
+        prefix, layout = cache
+        if layout == "milliseconds":
+            return "%s.%03d" % (prefix, microseconds // 1000)
+        if layout == "rfc3339":
+            return "%s.%03dZ" % (prefix, microseconds // 1000)
+        if layout == "suffix":
+            return "%s%06d" % (prefix, microseconds)
+        if layout == "none":
+            return prefix
         dt = datetime.fromtimestamp(record.created)
+        return dt.strftime(datefmt)
+
+    def _renderSecond(self, seconds: int, datefmt: str) -> tuple:
+        """Render the part of the time text that only depends on the second.
+
+        Parameters
+        ----------
+        seconds : int
+            whole seconds since the epoch
+        datefmt : str
+            datetime format
+
+        Returns
+        -------
+        tuple
+            rendered prefix and the layout of the remaining suffix.
+        """
+        if datefmt == DATE_FMT_RFC3339_UTC:
+            return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)), "rfc3339"
+        dt = datetime.fromtimestamp(seconds)
         if datefmt is None:
-            time = dt.isoformat(sep=" ", timespec="milliseconds")
-        else:
-            time = dt.strftime(datefmt)
-        return time
+            return dt.isoformat(sep=" ", timespec="seconds"), "milliseconds"
+        layout = _microsecondsLayout(datefmt)
+        if layout == "suffix":
+            return dt.strftime(datefmt[:-2]), layout
+        if layout == "none":
+            return dt.strftime(datefmt), layout
+        return None, layout
+
+
+class JsonFormatter(Formatter):
+    """
+    Formatter which renders a LogRecord as one JSON object per line.
+
+    The keys and the static fields are encoded once when the formatter is
+    created, only the values of each record are escaped. The emitted record
+    attributes are taken from the format string, for example SIMPLE_FORMAT
+    emits asctime, levelname and message, or from the fields argument.
+
+    Exception and stack information are added as "exc_info" and
+    "stack_info" when present.
+    """
+
+    def __init__(self, fmt: str = None, datefmt: str = None, style: str = "%",
+                    *args, fields: list = None, extras: list = None,
+                    static: dict = None, ensureAscii: bool = True, **kwargs):
+        """Initialize the formatter and encode the constant parts.
+
+        Parameters
+        ----------
+        fmt : str, optional
+            The format string whose fields are emitted, by default None
+        datefmt : str, optional
+            The date format string to use, by default None
+        style : str, optional
+            The style parameter to use, by default "%"
+        fields : list, optional
+            The record attributes to emit, by default the fields of fmt or
+            JSON_FIELDS
+        extras : list, optional
+            Keys passed with ``extra`` to emit when present, by default None
+        static : dict, optional
+            Constant fields added to every record, by default None
+        ensureAscii : bool, optional
+            Escape non-ASCII characters, by default True
+        """
+        super().__init__(fmt, datefmt, style, *args, **kwargs)
+        if fields is None:
+            parsed = parseFormat(fmt, style) if fmt is not None else None
+            fields = parsed[1] if parsed is not None else JSON_FIELDS
+        self.jsonFields = list(dict.fromkeys(fields))
+        self.extras = list(extras or [])
+        self.ensureAscii = ensureAscii
+        self._encodeString = (json.encoder.encode_basestring_ascii if ensureAscii
+                              else json.encoder.encode_basestring)
+        self._keys = [self._encodeKey(field) for field in self.jsonFields]
+        self._extraKeys = [self._encodeKey(key) for key in self.extras]
+        self._static = ", ".join(self._encodeKey(key) + self.encodeValue(value)
+                                 for key, value in (static or {}).items())
+        self.fields = frozenset(self.jsonFields) | frozenset(self.extras)
+        self._usesTime = "asctime" in self.fields
+
+    def _encodeKey(self, key: str) -> str:
+        return self._encodeString(str(key)) + ": "
+
+    def encodeValue(self, value: Any) -> str:
+        """Encode a value as JSON.
+
+        Parameters
+        ----------
+        value : Any
+            value, other types than the JSON types are encoded with str()
+
+        Returns
+        -------
+        str
+            JSON text
+        """
+        valueType = type(value)
+        if valueType is str:
+            return self._encodeString(value)
+        if valueType is int:
+            return int.__repr__(value)
+        if value is None:
+            return "null"
+        if value is True:
+            return "true"
+        if value is False:
+            return "false"
+        return json.dumps(value, ensure_ascii=self.ensureAscii, default=str)
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format the record as a JSON object.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        str
+            JSON text
+        """
+        record.message = record.getMessage()
+        if self._usesTime:
+            record.asctime = self.formatTime(record, self.datefmt)
+        encode = self.encodeValue
+        items = [key + encode(getattr(record, field, None))
+                 for key, field in zip(self._keys, self.jsonFields)]
+        values = record.__dict__
+        for key, extra in zip(self._extraKeys, self.extras):
+            if extra in values:
+                items.append(key + encode(values[extra]))
+        if self._static:
+            items.append(self._static)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            items.append('"exc_info": ' + encode(record.exc_text))
+        if record.stack_info:
+            items.append('"stack_info": ' + encode(self.formatStack(record.stack_info)))
+        return "{" + ", ".join(items) + "}"
@@ -1,4 +1,45 @@
+import atexit
+import collections
+import errno
+import glob
+import heapq
+import itertools
 import logging
+import marshal
+import mmap
+import operator
+import os
+import queue
+import re
+import select
+import struct
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from vlogging import binary, formatters, loggers
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_NEWEST = "drop-newest"
+OVERFLOW_DROP_OLDEST = "drop-oldest"
+DEFAULT_QUEUE_SIZE = 10000
+FSYNC_NEVER = "never"
+FSYNC_BATCH = "batch"
+BUFFERED_THREAD = "thread"
+DEFAULT_MMAP_CHUNK_SIZE = 16 * 1024 * 1024
+ATOMIC_APPEND_SIZE = 4096
+DEFAULT_RECORDER_CAPACITY = 1000
+DEFAULT_MAX_PENDING = 1024 * 1024
+PIPE_BUF = getattr(select, "PIPE_BUF", 512)
+DEFAULT_AGGREGATOR_BUFFER = 10000
+DEFAULT_AGGREGATOR_BATCH = 500
 
 
 def getHandlerConfig(className: str, level: str = None, formatter: str = None,
@@ -58,8 +99,73 @@ def getConsleHandlerConfig(level: str = None, formatter: str = None,
     )
 
 
+def getRawConsoleHandlerConfig(level: str = None, formatter: str = None,
+            stream: str = "ext://sys.stderr", nonBlocking: bool = False,
+            maxPending: int = DEFAULT_MAX_PENDING) -> dict:
+    """Create and return a raw console handler config.
+
+    Parameters
+    ----------
+    level : str, optional
+        The level of the handler, by default None
+    formatter : str, optional
+        The id of the formatter for this handler, by default None
+    stream : str, optional
+        The stream whose file descriptor the handler writes to, by default "ext://sys.stderr"
+    nonBlocking : bool, optional
+        Write on a background thread and never block the caller, by default False
+    maxPending : int, optional
+        The maximum number of bytes waiting to be written in non-blocking
+        mode, by default DEFAULT_MAX_PENDING
+
+    Returns
+    -------
+    dict
+        raw console handler config.
+    """
+    return getHandlerConfig(
+        f"{RawConsoleHandler.__module__}.{RawConsoleHandler.__name__}",
+        level,
+        formatter,
+        stream=stream,
+        nonBlocking=nonBlocking,
+        maxPending=maxPending,
+    )
+
+
+def getAggregatorHandlerConfig(path: str, level: str = None,
+            maxBuffered: int = DEFAULT_AGGREGATOR_BUFFER,
+            batchSize: int = DEFAULT_AGGREGATOR_BATCH) -> dict:
+    """Create and return an aggregator handler config.
+
+    Parameters
+    ----------
+    path : str
+        path of the Unix domain socket of the aggregator
+    level : str, optional
+        The level of the handler, by default None
+    maxBuffered : int, optional
+        The maximum number of records waiting to be sent, by default DEFAULT_AGGREGATOR_BUFFER
+    batchSize : int, optional
+        The maximum number of records sent in one batch, by default DEFAULT_AGGREGATOR_BATCH
+
+    Returns
+    -------
+    dict
+        aggregator handler config.
+    """
+    return getHandlerConfig(
+        f"{AggregatorHandler.__module__}.{AggregatorHandler.__name__}",
+        level,
+        path=path,
+        maxBuffered=maxBuffered,
+        batchSize=batchSize,
+    )
+
+
 def getFileHandlerConfig(filename: str, mode: str = "a", encoding: str = None,
-            level: str = None, formatter: str = None, **kwargs) -> dict:
+            level: str = None, formatter: str = None, buffered=False,
+            **kwargs) -> dict:
     """Create and return a file handler config.
 
     Parameters
@@ -74,12 +180,192 @@ def getFileHandlerConfig(filename: str, mode: str = "a", encoding: str = None,
         The level of the handler, by default None
     formatter : str, optional
         The id of the formatter for this handler, by default None
+    buffered : bool or str, optional
+        True to use a BufferedFileHandler, which writes records in batches,
+        or "thread" to use a ThreadBufferedFileHandler, which buffers the
+        records of every thread separately, by default False
+
+    Other keyword arguments are passed to the handler, for example the
+    bufferSize, bufferRecords, flushInterval, fsync and flushLevel
+    arguments of BufferedFileHandler.
 
     Returns
     -------
     dict
         file handler config.
     """
+    if buffered == BUFFERED_THREAD:
+        handlerClass = ThreadBufferedFileHandler
+    elif buffered:
+        handlerClass = BufferedFileHandler
+    else:
+        handlerClass = FileHandler
+    config = {
+        "filename": filename,
+        "mode" : mode,
+    }
+    if encoding is not None:
+        config["encoding"] = encoding
+    config.update(kwargs)
+    return getHandlerConfig(
+        f"{handlerClass.__module__}.{handlerClass.__name__}",
+        level,
+        formatter,
+        filters=None,
+        **config
+    )
+
+
+def getMmapFileHandlerConfig(filename: str, mode: str = "a", encoding: str = None,
+            level: str = None, formatter: str = None,
+            chunkSize: int = DEFAULT_MMAP_CHUNK_SIZE) -> dict:
+    """Create and return a memory-mapped file handler config.
+
+    Parameters
+    ----------
+    filename : str
+        log file name
+    mode : str, optional
+        log file open mode, "a" or "w", by default "a"
+    encoding : str, optional
+        log file encoding, by default None
+    level : str, optional
+        The level of the handler, by default None
+    formatter : str, optional
+        The id of the formatter for this handler, by default None
+    chunkSize : int, optional
+        The number of bytes the file is extended by, by default DEFAULT_MMAP_CHUNK_SIZE
+
+    Returns
+    -------
+    dict
+        memory-mapped file handler config.
+    """
+    config = {
+        "filename": filename,
+        "mode" : mode,
+        "chunkSize": chunkSize,
+    }
+    if encoding is not None:
+        config["encoding"] = encoding
+    return getHandlerConfig(
+        f"{MmapFileHandler.__module__}.{MmapFileHandler.__name__}",
+        level,
+        formatter,
+        filters=None,
+        **config
+    )
+
+
+def getRotatingFileHandlerConfig(filename: str, mode: str = "a", encoding: str = None,
+            level: str = None, formatter: str = None, maxBytes: int = 0,
+            interval: float = 0, backupCount: int = 0, compress: bool = True) -> dict:
+    """Create and return a rotating file handler config.
+
+    Parameters
+    ----------
+    filename : str
+        log file name
+    mode : str, optional
+        log file open mode, by default "a"
+    encoding : str, optional
+        log file encoding, by default None
+    level : str, optional
+        The level of the handler, by default None
+    formatter : str, optional
+        The id of the formatter for this handler, by default None
+    maxBytes : int, optional
+        Rotate when the file would grow beyond this size, 0 to disable, by default 0
+    interval : float, optional
+        Rotate every interval seconds, 0 to disable, by default 0
+    backupCount : int, optional
+        The number of rotated files to keep, 0 to keep all, by default 0
+    compress : bool, optional
+        Compress rotated files with gzip, by default True
+
+    Returns
+    -------
+    dict
+        rotating file handler config.
+    """
+    config = {
+        "filename": filename,
+        "mode" : mode,
+        "maxBytes": maxBytes,
+        "interval": interval,
+        "backupCount": backupCount,
+        "compress": compress,
+    }
+    if encoding is not None:
+        config["encoding"] = encoding
+    return getHandlerConfig(
+        f"{RotatingFileHandler.__module__}.{RotatingFileHandler.__name__}",
+        level,
+        formatter,
+        filters=None,
+        **config
+    )
+
+
+def getAppendFileHandlerConfig(filename: str, mode: str = "a", encoding: str = None,
+            level: str = None, formatter: str = None) -> dict:
+    """Create and return a config of a file handler that many processes can share.
+
+    Parameters
+    ----------
+    filename : str
+        log file name
+    mode : str, optional
+        log file open mode, by default "a"
+    encoding : str, optional
+        log file encoding, by default None
+    level : str, optional
+        The level of the handler, by default None
+    formatter : str, optional
+        The id of the formatter for this handler, by default None
+
+    Returns
+    -------
+    dict
+        append file handler config.
+    """
+    config = {
+        "filename": filename,
+        "mode" : mode,
+    }
+    if encoding is not None:
+        config["encoding"] = encoding
+    return getHandlerConfig(
+        f"{AppendFileHandler.__module__}.{AppendFileHandler.__name__}",
+        level,
+        formatter,
+        filters=None,
+        **config
+    )
+
+
+def getShardedFileHandlerConfig(filename: str, mode: str = "a", encoding: str = None,
+            level: str = None, formatter: str = None) -> dict:
+    """Create and return a config of a file handler that writes one file per process.
+
+    Parameters
+    ----------
+    filename : str
+        log file name, the process id is appended to it
+    mode : str, optional
+        log file open mode, by default "a"
+    encoding : str, optional
+        log file encoding, by default None
+    level : str, optional
+        The level of the handler, by default None
+    formatter : str, optional
+        The id of the formatter for this handler, by default None
+
+    Returns
+    -------
+    dict
+        sharded file handler config.
+    """
     config = {
         "filename": filename,
         "mode" : mode,
@@ -87,7 +373,7 @@ def getFileHandlerConfig(filename: str, mode: str = "a", encoding: str = None,
     if encoding is not None:
         config["encoding"] = encoding
     return getHandlerConfig(
-        f"{FileHandler.__module__}.{FileHandler.__name__}",
+        f"{ShardedFileHandler.__module__}.{ShardedFileHandler.__name__}",
         level,
         formatter,
         filters=None,
@@ -95,6 +381,104 @@ def getFileHandlerConfig(filename: str, mode: str = "a", encoding: str = None,
     )
 
 
+def getBinaryFileHandlerConfig(filename: str, mode: str = "a", level: str = None,
+            flushLevel: str = "ERROR") -> dict:
+    """Create and return a binary file handler config.
+
+    Parameters
+    ----------
+    filename : str
+        log file name
+    mode : str, optional
+        log file open mode, "a" or "w", by default "a"
+    level : str, optional
+        The level of the handler, by default None
+    flushLevel : str, optional
+        Records at or above this level are written immediately, by default "ERROR"
+
+    Returns
+    -------
+    dict
+        binary file handler config.
+    """
+    return getHandlerConfig(
+        f"{BinaryFileHandler.__module__}.{BinaryFileHandler.__name__}",
+        level,
+        None,
+        filters=None,
+        filename=filename,
+        mode=mode,
+        flushLevel=flushLevel,
+    )
+
+
+def getQueueHandlerConfig(targets: list, maxsize: int = DEFAULT_QUEUE_SIZE,
+            overflow: str = OVERFLOW_BLOCK, level: str = None, filters: list = None) -> dict:
+    """Create and return a queue handler config.
+
+    Parameters
+    ----------
+    targets : list
+        A list of ids of the handlers that write the queued records.
+    maxsize : int, optional
+        The maximum number of queued records, by default DEFAULT_QUEUE_SIZE
+    overflow : str, optional
+        What to do when the queue is full, "block", "drop-newest" or
+        "drop-oldest", by default "block"
+    level : str, optional
+        The level of the handler, by default None
+    filters : list, optional
+        A list of ids of the filters for this handler, by default None
+
+    Returns
+    -------
+    dict
+        queue handler config.
+    """
+    return getHandlerConfig(
+        f"{QueueHandler.__module__}.{QueueHandler.__name__}",
+        level,
+        None,
+        filters,
+        targets=targets,
+        maxsize=maxsize,
+        overflow=overflow,
+    )
+
+
+def getFlightRecorderHandlerConfig(targets: list, capacity: int = DEFAULT_RECORDER_CAPACITY,
+            triggerLevel: str = "ERROR", level: str = None, filters: list = None) -> dict:
+    """Create and return a flight recorder handler config.
+
+    Parameters
+    ----------
+    targets : list
+        A list of ids of the handlers that write the recorded records.
+    capacity : int, optional
+        The number of records kept, by default DEFAULT_RECORDER_CAPACITY
+    triggerLevel : str, optional
+        Records at or above this level write out the kept records, by default "ERROR"
+    level : str, optional
+        The level of the handler, by default None
+    filters : list, optional
+        A list of ids of the filters for this handler, by default None
+
+    Returns
+    -------
+    dict
+        flight recorder handler config.
+    """
+    return getHandlerConfig(
+        f"{FlightRecorderHandler.__module__}.{FlightRecorderHandler.__name__}",
+        level,
+        None,
+        filters,
+        targets=targets,
+        capacity=capacity,
+        triggerLevel=triggerLevel,
+    )
+
+
 class ConsoleHandler(logging.StreamHandler):
     def __init__(self, stream=None):
         """
@@ -110,6 +494,199 @@ class ConsoleHandler(logging.StreamHandler):
         super().__init__(stream=stream)
 
 
+class RawConsoleHandler(logging.Handler):
+    terminator = "\n"
+
+    def __init__(self, stream=None, encoding: str = None, nonBlocking: bool = False,
+                    maxPending: int = DEFAULT_MAX_PENDING):
+        """
+        A console handler which encodes each record once and writes it to the
+        file descriptor of the stream, bypassing the text and buffer layers
+        of the stream and their flush after every record.
+
+        Records are written in batches of up to PIPE_BUF bytes, cut at
+        record boundaries, so records of other processes writing to the same
+        pipe are not interleaved with them. In blocking mode the record is
+        written before emit returns; the records of threads logging while
+        another thread writes are added to a pending buffer and written
+        together in the next batch. In non-blocking mode the record is added
+        to the pending buffer and a background thread writes it.
+        When the pending buffer would exceed maxPending bytes, because the
+        reader of the pipe is slow, the record is dropped and counted in
+        dropped. Like ConsoleHandler, the handler does not close the stream.
+
+        Parameters
+        ----------
+        stream : file object or int, optional
+            output stream or file descriptor, by default sys.stderr
+        encoding : str, optional
+            encoding of the records, by default the encoding of the stream or UTF-8
+        nonBlocking : bool, optional
+            write on a background thread and never block the caller, by default False
+        maxPending : int, optional
+            maximum number of bytes waiting to be written in non-blocking
+            mode, by default DEFAULT_MAX_PENDING
+        """
+        super().__init__()
+        if stream is None:
+            stream = sys.stderr
+        self.stream = stream
+        if isinstance(stream, int):
+            self.fd = stream
+        else:
+            # Text written through the stream before must come first.
+            stream.flush()
+            self.fd = stream.fileno()
+        self.encoding = encoding or getattr(stream, "encoding", None) or "utf-8"
+        self.nonBlocking = nonBlocking
+        self.maxPending = maxPending
+        self.pending = []
+        self.pendingSize = 0
+        self.dropped = 0
+        self._writeLock = threading.Lock()
+        self._ready = None
+        self._stopped = None
+        self._thread = None
+        if nonBlocking:
+            self.start()
+        _backgroundHandlers.add(self)
+
+    @property
+    def fields(self) -> frozenset:
+        """The record attributes used by the formatter."""
+        return formatters.getFormatterFields(self.formatter)
+
+    def start(self) -> None:
+        """Start the thread which writes the pending records."""
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._writePeriodically,
+                                        args=(self._ready, self._stopped),
+                                        name="vlogging-console", daemon=True)
+        self._thread.start()
+
+    def _writePeriodically(self, ready: threading.Event, stopped: threading.Event) -> None:
+        while not stopped.is_set():
+            ready.wait()
+            ready.clear()
+            try:
+                self._writePending()
+            except Exception:
+                if logging.raiseExceptions:
+                    traceback.print_exc()
+
+    def _resetAfterFork(self) -> None:
+        """Drop the records of the parent process and the locks its threads held."""
+        self.pending = []
+        self.pendingSize = 0
+        self._writeLock = threading.Lock()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter and emit the record without holding the handler lock while writing.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        bool
+            whether the record passed the filters
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Add the record to the pending records and write them in blocking mode.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            data = (self.format(record) + self.terminator).encode(self.encoding, "backslashreplace")
+            self.acquire()
+            try:
+                if self.nonBlocking and self.pendingSize + len(data) > self.maxPending:
+                    self.dropped += 1
+                    return
+                self.pending.append(data)
+                self.pendingSize += len(data)
+            finally:
+                self.release()
+            if self.nonBlocking:
+                self._ready.set()
+            else:
+                # Writes the pending records unless another thread did meanwhile.
+                self._writePending()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _writePending(self) -> None:
+        """Write the pending records in batches of up to PIPE_BUF bytes."""
+        with self._writeLock:
+            self.acquire()
+            try:
+                records, self.pending = self.pending, []
+            finally:
+                self.release()
+            try:
+                batch = []
+                batchSize = 0
+                for data in records:
+                    if batch and batchSize + len(data) > PIPE_BUF:
+                        self._write(b"".join(batch))
+                        batch = []
+                        batchSize = 0
+                    batch.append(data)
+                    batchSize += len(data)
+                if batch:
+                    self._write(b"".join(batch))
+            finally:
+                self.acquire()
+                try:
+                    self.pendingSize -= sum(map(len, records))
+                finally:
+                    self.release()
+
+    def _write(self, data: bytes) -> None:
+        """Write all data, waiting for the descriptor when it is non-blocking."""
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(self.fd, view):]
+            except BlockingIOError:
+                select.select([], [self.fd], [], 1.0)
+
+    def flush(self) -> None:
+        """Write the pending records."""
+        if self.pending:
+            self._writePending()
+
+    def close(self) -> None:
+        """Stop the writer thread and write the pending records."""
+        stopped, thread = self._stopped, self._thread
+        self._stopped = self._thread = None
+        if stopped is not None:
+            stopped.set()
+            self._ready.set()
+            if thread is not threading.current_thread():
+                thread.join()
+        self.flush()
+        super().close()
+
+
+_ASCII = "".join(map(chr, range(128)))
+
+
 class FileHandler(logging.FileHandler):
     def __init__(self, filename: str, mode: str = "a", encoding: str = None,
                     delay: bool = False):
@@ -127,3 +704,1684 @@ class FileHandler(logging.FileHandler):
             log file open delay, by default False
         """
         super().__init__(filename, mode=mode, encoding=encoding, delay=delay)
+        self._sizeEncoding = None
+        self._asciiSize = False
+
+    def encodedSize(self, text: str) -> int:
+        """Return the number of bytes text takes in the log file.
+
+        Parameters
+        ----------
+        text : str
+            text written to the log file
+
+        Returns
+        -------
+        int
+            encoded length of the text
+        """
+        encoding = self._sizeEncoding
+        if encoding is None:
+            encoding = self.encoding
+            if encoding is None or encoding == "locale":
+                # Imported here, so that importing vlogging does not import locale.
+                import locale
+
+                encoding = locale.getpreferredencoding(False)
+            # ASCII text takes one byte per character in most encodings, so
+            # it is only encoded for the others.
+            self._asciiSize = len(_ASCII.encode(encoding)) == len(_ASCII)
+            self._sizeEncoding = encoding
+        if self._asciiSize and text.isascii():
+            return len(text)
+        return len(text.encode(encoding, getattr(self, "errors", None) or "strict"))
+
+
+class BinaryFileHandler(logging.Handler):
+    fields = frozenset(("name", "msg", "args", "levelno", "pathname", "lineno",
+                        "funcName", "created", "exc_info", "stack_info"))
+
+    def __init__(self, filename: str, mode: str = "a", flushLevel=logging.ERROR,
+                    maxStrings: int = binary.DEFAULT_MAX_STRINGS):
+        """
+        A handler class which writes records in the compact binary format of
+        vlogging.binary instead of formatting them. Logger names and format
+        strings are written once per file, message arguments are written
+        raw. Render the file with ``python -m vlogging.decode``.
+
+        Records are buffered and written when the buffer is full, when a
+        record at or above flushLevel arrives, and when the handler is
+        flushed or closed. The buffer is also written before the process
+        forks; a forked child writes to "<filename>.<pid>" with string ids
+        of its own.
+
+        Parameters
+        ----------
+        filename : str
+            log file name
+        mode : str, optional
+            log file open mode, "a" or "w", by default "a"
+        flushLevel : int or str, optional
+            records at or above this level are written immediately, None to
+            disable, by default logging.ERROR
+        maxStrings : int, optional
+            maximum number of interned format strings, by default binary.DEFAULT_MAX_STRINGS
+        """
+        super().__init__()
+        if mode not in ("a", "w"):
+            raise ValueError(f"Unsupported mode: {mode!r}")
+        if isinstance(flushLevel, str):
+            flushLevel = logging.getLevelName(flushLevel)
+        self.shardFilename = self.baseFilename = os.path.abspath(filename)
+        self.mode = mode
+        self.flushLevel = flushLevel
+        self.maxStrings = maxStrings
+        self.pid = os.getpid()
+        self._open(mode)
+        _backgroundHandlers.add(self)
+
+    def _open(self, mode: str) -> None:
+        """Open the log file with a new encoder and write the file header."""
+        self.encoder = binary.Encoder(self.maxStrings)
+        self.stream = open(self.baseFilename, mode + "b")
+        self.stream.write(binary.MAGIC)
+
+    def _resetAfterFork(self) -> None:
+        """Close the file inherited from the parent, written before the fork."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Encode the record and write it to the buffer.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            excText = None
+            if record.exc_info:
+                formatter = self.formatter or logging._defaultFormatter
+                excText = record.exc_text or formatter.formatException(record.exc_info)
+            elif record.exc_text:
+                excText = record.exc_text
+            pid = os.getpid()
+            if pid != self.pid:
+                self.pid = pid
+                self.baseFilename = f"{self.shardFilename}.{pid}"
+                self._open("a")
+            self.stream.write(self.encoder.encode(record, excText))
+            if self.flushLevel is not None and record.levelno >= self.flushLevel:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Write the buffered records to the file."""
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """Write the buffered records and close the file."""
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+def getTargetFields(targets: list) -> frozenset:
+    """Return the record attributes used by target handlers.
+
+    Parameters
+    ----------
+    targets : list
+        target handlers
+
+    Returns
+    -------
+    frozenset
+        field names, or None if any attribute may be used
+    """
+    fields = frozenset()
+    for target in targets:
+        targetFields = loggers.getHandlerFields(target)
+        if targetFields is None:
+            return None
+        fields |= targetFields
+    return fields
+
+
+_STOP = object()
+_backgroundHandlers = weakref.WeakSet()
+
+
+class QueueHandler(logging.Handler):
+    def __init__(self, targets: list = None, maxsize: int = DEFAULT_QUEUE_SIZE,
+                    overflow: str = OVERFLOW_BLOCK):
+        """
+        A handler class which puts records on a bounded queue. A background
+        thread takes them off the queue and passes them to the target handlers.
+
+        Parameters
+        ----------
+        targets : list, optional
+            handlers that write the queued records, by default None
+        maxsize : int, optional
+            maximum number of queued records, by default DEFAULT_QUEUE_SIZE
+        overflow : str, optional
+            What to do when the queue is full. "block" waits for free space,
+            "drop-newest" drops the new record and "drop-oldest" drops the
+            oldest queued record, by default "block"
+        """
+        super().__init__()
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST):
+            raise ValueError(f"Unknown overflow policy: {overflow!r}")
+        self.targets = list(targets or [])
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.queue = None
+        self._thread = None
+        self.start()
+        _backgroundHandlers.add(self)
+
+    @property
+    def fields(self) -> frozenset:
+        """The record attributes used by the target handlers."""
+        return getTargetFields(self.targets)
+
+    def start(self) -> None:
+        """Start the background thread with an empty queue."""
+        self.queue = queue.Queue(self.maxsize)
+        self._thread = threading.Thread(target=self._drain, args=(self.queue,),
+                                        name="vlogging-queue", daemon=True)
+        self._thread.start()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter the record and put it on the queue without taking the handler lock.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        bool
+            whether the record passed the filters
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return a copy of the record which can be handled on another thread.
+
+        Like logging.handlers.QueueHandler, the arguments are merged into
+        the message, so they can not change while queued, and the exception
+        is rendered into exc_text with the formatter of this handler, so
+        the queued copy does not keep the traceback and its frames alive.
+        The record of the caller is left unchanged.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        logging.LogRecord
+            the prepared record
+        """
+        prepared = record.__class__.__new__(record.__class__)
+        prepared.__dict__.update(record.__dict__)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                formatter = self.formatter or logging._defaultFormatter
+                prepared.exc_text = formatter.formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Put the record on the queue.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put the record on the queue, applying the overflow policy.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        if self.overflow == OVERFLOW_BLOCK:
+            self.queue.put(record)
+        elif self.overflow == OVERFLOW_DROP_NEWEST:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(record)
+                    return
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.queue.task_done()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def _drain(self, records: queue.Queue) -> None:
+        while True:
+            record = records.get()
+            try:
+                if record is _STOP:
+                    return
+                for target in self.targets:
+                    if record.levelno >= target.level:
+                        target.handle(record)
+            except Exception:
+                self.handleError(record)
+            finally:
+                records.task_done()
+
+    def flush(self) -> None:
+        """Wait until the queued records are written and flush the targets."""
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            records = self.queue
+            with records.all_tasks_done:
+                while records.unfinished_tasks and thread.is_alive():
+                    records.all_tasks_done.wait(0.1)
+        for target in self.targets:
+            target.flush()
+
+    def close(self) -> None:
+        """Write the queued records and stop the background thread."""
+        thread = self._thread
+        self._thread = None
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            self.queue.put(_STOP)
+            thread.join()
+        super().close()
+
+
+RECORDER_FIELDS = ("name", "msg", "args", "levelno", "pathname", "lineno", "funcName",
+                   "created", "exc_text", "stack_info", "thread", "threadName",
+                   "process", "processName")
+if hasattr(logging, "logAsyncioTasks"):
+    RECORDER_FIELDS += ("taskName",)
+
+
+class FlightRecorderHandler(logging.Handler):
+    def __init__(self, targets: list = None, capacity: int = DEFAULT_RECORDER_CAPACITY,
+                    triggerLevel=logging.ERROR):
+        """
+        A handler class which keeps the last records in memory and passes
+        them to the target handlers only when a record at or above
+        triggerLevel arrives, so DEBUG detail around an error is kept
+        without writing every DEBUG record.
+
+        A record is kept as a tuple of the RECORDER_FIELDS attributes in a
+        deque of fixed length; keeping it is one attribute fetch and one
+        append. On 64-bit CPython an entry costs about 170 bytes for the
+        tuple and 8 bytes for its deque slot, plus the message arguments it
+        references. The arguments are not copied, so a mutable argument is
+        rendered as it is when the records are written. Other record
+        attributes, such as values passed with ``extra``, are not kept.
+
+        Parameters
+        ----------
+        targets : list, optional
+            handlers that write the recorded records, by default None
+        capacity : int, optional
+            number of records kept, by default DEFAULT_RECORDER_CAPACITY
+        triggerLevel : int or str, optional
+            records at or above this level write out the kept records, by
+            default logging.ERROR
+        """
+        super().__init__()
+        if isinstance(triggerLevel, str):
+            triggerLevel = logging.getLevelName(triggerLevel)
+        self.targets = list(targets or [])
+        self.capacity = capacity
+        self.triggerLevel = triggerLevel
+        self.buffer = collections.deque(maxlen=capacity)
+        self._pack = operator.attrgetter(*RECORDER_FIELDS)
+
+    @property
+    def fields(self) -> frozenset:
+        """The record attributes used by the target handlers."""
+        return getTargetFields(self.targets)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter the record and keep or write it.
+
+        Records below triggerLevel are kept without taking the handler lock.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        bool
+            whether the record passed the filters
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            if record.levelno < self.triggerLevel:
+                self.emit(record)
+            else:
+                self.acquire()
+                try:
+                    self.dump()
+                    self.write(record)
+                finally:
+                    self.release()
+        return rv
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Keep the record in the buffer.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            if record.exc_info and not record.exc_text:
+                formatter = self.formatter or logging._defaultFormatter
+                record.exc_text = formatter.formatException(record.exc_info)
+            self.buffer.append(self._pack(record))
+        except Exception:
+            self.handleError(record)
+
+    def write(self, record: logging.LogRecord) -> None:
+        """Pass a record to the target handlers.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            for target in self.targets:
+                if record.levelno >= target.level:
+                    target.handle(record)
+        except Exception:
+            self.handleError(record)
+
+    def dump(self) -> int:
+        """Write the kept records to the target handlers and empty the buffer.
+
+        Returns
+        -------
+        int
+            number of written records
+        """
+        count = 0
+        buffer = self.buffer
+        while buffer:
+            try:
+                item = buffer.popleft()
+            except IndexError:
+                break
+            record = logging.makeLogRecord(dict(zip(RECORDER_FIELDS, item)))
+            record.levelname = logging.getLevelName(record.levelno)
+            record.filename = os.path.basename(record.pathname)
+            record.module = os.path.splitext(record.filename)[0]
+            record.msecs = int((record.created - int(record.created)) * 1000) + 0.0
+            record.relativeCreated = (record.created - logging._startTime) * 1000
+            self.write(record)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """Flush the target handlers."""
+        for target in self.targets:
+            target.flush()
+
+
+AGGREGATOR_FIELDS = ("name", "levelno", "levelname", "pathname", "filename", "module",
+                     "lineno", "funcName", "created", "msecs", "relativeCreated",
+                     "exc_text", "stack_info", "thread", "threadName", "process",
+                     "processName")
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def packBatch(records: list) -> bytes:
+    """Return a length-prefixed frame of packed records.
+
+    Parameters
+    ----------
+    records : list
+        message and AGGREGATOR_FIELDS values of each record
+
+    Returns
+    -------
+    bytes
+        frame
+    """
+    payload = marshal.dumps(records)
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+def unpackRecord(values: tuple) -> logging.LogRecord:
+    """Rebuild a record packed by AggregatorHandler.
+
+    Parameters
+    ----------
+    values : tuple
+        message and AGGREGATOR_FIELDS values
+
+    Returns
+    -------
+    logging.LogRecord
+        log record with the formatted message and no arguments
+    """
+    record = logging.makeLogRecord(dict(zip(AGGREGATOR_FIELDS, values[1:])))
+    record.msg = values[0]
+    return record
+
+
+class AggregatorHandler(logging.Handler):
+    def __init__(self, path: str, maxBuffered: int = DEFAULT_AGGREGATOR_BUFFER,
+                    batchSize: int = DEFAULT_AGGREGATOR_BATCH, flushInterval: float = 0.05,
+                    reconnectInterval: float = 1.0):
+        """
+        A handler class which sends records to a vlogging aggregator over a
+        Unix domain socket, see vlogging.aggregator.
+
+        A record is reduced to its formatted message and the
+        AGGREGATOR_FIELDS attributes and buffered; a background thread sends
+        the buffered records in batches, each one a length-prefixed marshal
+        frame. When the aggregator can not be reached, the records stay
+        buffered and the thread connects again every reconnectInterval
+        seconds. Records which do not fit in the buffer are dropped and
+        counted in dropped.
+
+        Parameters
+        ----------
+        path : str
+            path of the Unix domain socket of the aggregator
+        maxBuffered : int, optional
+            maximum number of records waiting to be sent, by default DEFAULT_AGGREGATOR_BUFFER
+        batchSize : int, optional
+            maximum number of records sent in one batch, by default DEFAULT_AGGREGATOR_BATCH
+        flushInterval : float, optional
+            maximum seconds a record waits before it is sent, by default 0.05
+        reconnectInterval : float, optional
+            seconds between two connection attempts, by default 1.0
+        """
+        super().__init__()
+        self.path = path
+        self.maxBuffered = maxBuffered
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+        self.reconnectInterval = reconnectInterval
+        self.buffer = collections.deque()
+        self.dropped = 0
+        self.sock = None
+        self._pack = operator.attrgetter(*AGGREGATOR_FIELDS)
+        self._nextConnect = 0.0
+        self._sendLock = None
+        self._ready = None
+        self._stopped = None
+        self._thread = None
+        self._exitRegistered = False
+        self.start()
+        _backgroundHandlers.add(self)
+
+    def start(self) -> None:
+        """Start the thread which sends the buffered records."""
+        if self.sock is not None:
+            # A forked child must not write to the connection of its parent,
+            # which also sends the records buffered before the fork.
+            self.sock.close()
+            self.sock = None
+            self.buffer.clear()
+        self._exitRegistered = False
+        self._sendLock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sendPeriodically,
+                                        args=(self._ready, self._stopped),
+                                        name="vlogging-aggregator-client", daemon=True)
+        self._thread.start()
+
+    def _sendPeriodically(self, ready: threading.Event, stopped: threading.Event) -> None:
+        while not stopped.is_set():
+            ready.wait(self.flushInterval)
+            ready.clear()
+            self.send()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter and buffer the record without taking the handler lock.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        bool
+            whether the record passed the filters
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Add the record to the buffer.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            if not self._exitRegistered:
+                self._registerExit()
+            if len(self.buffer) >= self.maxBuffered:
+                self.dropped += 1
+                return
+            if record.exc_info and not record.exc_text:
+                formatter = self.formatter or logging._defaultFormatter
+                record.exc_text = formatter.formatException(record.exc_info)
+            self.buffer.append((record.getMessage(),) + self._pack(record))
+            if len(self.buffer) >= self.batchSize:
+                self._ready.set()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _registerExit(self) -> None:
+        """Send the buffered records when a multiprocessing child exits.
+
+        multiprocessing children end with os._exit, which skips atexit, but
+        run the finalizers registered after they started.
+        """
+        self._exitRegistered = True
+        util = sys.modules.get("multiprocessing.util")
+        if util is not None:
+            util.Finalize(None, self.flush, exitpriority=10)
+
+    def send(self) -> None:
+        """Send the buffered records, connecting to the aggregator if needed."""
+        buffer = self.buffer
+        with self._sendLock:
+            while buffer:
+                if self.sock is None and not self._connect():
+                    return
+                batch = []
+                while buffer and len(batch) < self.batchSize:
+                    batch.append(buffer.popleft())
+                try:
+                    self.sock.sendall(packBatch(batch))
+                except OSError:
+                    self.sock.close()
+                    self.sock = None
+                    buffer.extendleft(reversed(batch))
+                    return
+
+    def _connect(self) -> bool:
+        """Connect to the aggregator unless the last attempt was too recent."""
+        now = time.monotonic()
+        if now < self._nextConnect:
+            return False
+        # Imported here, so that importing vlogging does not import socket.
+        import socket
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            self._nextConnect = now + self.reconnectInterval
+            return False
+        self.sock = sock
+        return True
+
+    def flush(self) -> None:
+        """Send the buffered records now."""
+        self._nextConnect = 0.0
+        self.send()
+
+    def close(self) -> None:
+        """Stop the sender thread, send the buffered records and disconnect."""
+        stopped, thread = self._stopped, self._thread
+        self._stopped = self._thread = None
+        if stopped is not None:
+            stopped.set()
+            self._ready.set()
+            if thread is not threading.current_thread():
+                thread.join()
+        self.flush()
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        super().close()
+
+
+class BufferedFileHandler(FileHandler):
+    def __init__(self, filename: str, mode: str = "a", encoding: str = None,
+                    delay: bool = False, bufferSize: int = 65536,
+                    bufferRecords: int = 1000, flushInterval: float = 1.0,
+                    fsync=FSYNC_NEVER, flushLevel=logging.ERROR):
+        """
+        A file handler which collects formatted records and writes them in
+        one batch.
+
+        A batch is written when the buffered text reaches bufferSize
+        bytes in the file encoding, when bufferRecords records are buffered, when
+        flushInterval seconds have passed since the last batch, or when a
+        record at or above flushLevel arrives.
+
+        Parameters
+        ----------
+        filename : str
+            log file name
+        mode : str, optional
+            log file open mode, by default "a"
+        encoding : str, optional
+            log file encoding, by default None
+        delay : bool, optional
+            log file open delay, by default False
+        bufferSize : int, optional
+            buffered bytes that trigger a batch write, by default 65536
+        bufferRecords : int, optional
+            buffered records that trigger a batch write, by default 1000
+        flushInterval : float, optional
+            maximum seconds a record stays buffered, 0 to only write when
+            another limit is reached, by default 1.0
+        fsync : str or int, optional
+            "never", "batch" to fsync after every batch, or the number of
+            milliseconds written records may stay unsynced; unless it is
+            "never", the file is also synced when closed, by default "never"
+        flushLevel : int or str, optional
+            records at or above this level are written immediately, None to
+            disable, by default logging.ERROR
+        """
+        super().__init__(filename, mode=mode, encoding=encoding, delay=delay)
+        if isinstance(flushLevel, str):
+            flushLevel = logging.getLevelName(flushLevel)
+        if fsync not in (FSYNC_NEVER, FSYNC_BATCH) and not isinstance(fsync, int):
+            raise ValueError(f"Unknown fsync policy: {fsync!r}")
+        self.bufferSize = bufferSize
+        self.bufferRecords = bufferRecords
+        self.flushInterval = flushInterval
+        self.fsync = fsync
+        self.flushLevel = flushLevel
+        self.buffer = []
+        self.bufferedSize = 0
+        self._lastFlush = self._lastSync = time.monotonic()
+        self._unsynced = False
+        self._stopped = None
+        self._thread = None
+        self.start()
+        _backgroundHandlers.add(self)
+
+    def start(self) -> None:
+        """Start the thread which writes the buffer every flushInterval seconds
+        and calls fsync on written records the fsync interval left unsynced."""
+        intervals = [self.flushInterval]
+        if self.fsync not in (FSYNC_NEVER, FSYNC_BATCH):
+            intervals.append(self.fsync / 1000)
+        intervals = [interval for interval in intervals if interval and interval > 0]
+        if intervals:
+            self._stopped = threading.Event()
+            self._thread = threading.Thread(target=self._flushPeriodically,
+                                            args=(self._stopped, min(intervals)),
+                                            name="vlogging-flush", daemon=True)
+            self._thread.start()
+
+    def _flushDue(self) -> bool:
+        """Return True if flushInterval seconds have passed since the last batch."""
+        return bool(self.flushInterval and self.flushInterval > 0
+                    and time.monotonic() - self._lastFlush >= self.flushInterval)
+
+    def _flushPeriodically(self, stopped: threading.Event, interval: float) -> None:
+        while not stopped.wait(interval):
+            if self.buffer and self._flushDue():
+                self.flush()
+            self._syncUnsynced()
+
+    def _syncUnsynced(self) -> None:
+        """Call fsync on written records once the fsync interval has passed."""
+        if self._unsynced:
+            self.acquire()
+            try:
+                self.sync()
+            finally:
+                self.release()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Format the record and add it to the buffer.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            msg = self.format(record) + self.terminator
+            self.buffer.append(msg)
+            self.bufferedSize += self.encodedSize(msg)
+            if (self.bufferedSize >= self.bufferSize
+                    or len(self.buffer) >= self.bufferRecords
+                    or (self.flushLevel is not None and record.levelno >= self.flushLevel)
+                    or (self.flushInterval
+                        and time.monotonic() - self._lastFlush >= self.flushInterval)):
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Write the buffered records and apply the fsync policy."""
+        self.acquire()
+        try:
+            if self.buffer:
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write("".join(self.buffer))
+                self.buffer.clear()
+                self.bufferedSize = 0
+                self.stream.flush()
+                self._unsynced = True
+                self.sync()
+            elif self.stream is not None:
+                self.stream.flush()
+            self._lastFlush = time.monotonic()
+        finally:
+            self.release()
+
+    def sync(self, force: bool = False) -> None:
+        """Call fsync on the log file according to the fsync policy.
+
+        Parameters
+        ----------
+        force : bool, optional
+            call fsync even if the fsync interval has not passed or nothing
+            was written since the last call, unless the policy is "never",
+            by default False
+        """
+        if self.fsync == FSYNC_NEVER or self.stream is None:
+            return
+        if not (force or self._unsynced):
+            return
+        now = time.monotonic()
+        if (force or self.fsync == FSYNC_BATCH
+                or (now - self._lastSync) * 1000 >= self.fsync):
+            os.fsync(self.stream.fileno())
+            self._lastSync = now
+            self._unsynced = False
+
+    def close(self) -> None:
+        """Stop the flush thread, write the buffer, call fsync and close the file."""
+        stopped, thread = self._stopped, self._thread
+        self._stopped = self._thread = None
+        if stopped is not None:
+            stopped.set()
+            if thread is not threading.current_thread():
+                thread.join()
+        self.flush()
+        self.acquire()
+        try:
+            self.sync(force=True)
+        finally:
+            self.release()
+        super().close()
+
+
+class ThreadBufferedFileHandler(BufferedFileHandler):
+    def __init__(self, filename: str, mode: str = "a", encoding: str = None,
+                    delay: bool = False, bufferSize: int = 65536,
+                    bufferRecords: int = 1000, flushInterval: float = 1.0,
+                    fsync=FSYNC_NEVER, flushLevel=logging.ERROR):
+        """
+        A buffered file handler which lets every thread format its records
+        into a buffer of its own, without taking the handler lock.
+
+        The flush thread swaps the records out of all thread buffers every
+        flushInterval seconds and writes them in one batch, ordered by their
+        creation time. A thread writes the batch itself when its buffer holds
+        bufferRecords records or bufferSize bytes, or when it logs a
+        record at or above flushLevel. Records of different threads are only
+        ordered within the same batch.
+
+        Parameters
+        ----------
+        filename : str
+            log file name
+        mode : str, optional
+            log file open mode, by default "a"
+        encoding : str, optional
+            log file encoding, by default None
+        delay : bool, optional
+            log file open delay, by default False
+        bufferSize : int, optional
+            bytes buffered by one thread that trigger a batch write, by default 65536
+        bufferRecords : int, optional
+            records buffered by one thread that trigger a batch write, by default 1000
+        flushInterval : float, optional
+            seconds between two batches, 0 to only write when another limit
+            is reached, by default 1.0
+        fsync : str or int, optional
+            "never", "batch" to fsync after every batch, or the number of
+            milliseconds written records may stay unsynced; unless it is
+            "never", the file is also synced when closed, by default "never"
+        flushLevel : int or str, optional
+            records at or above this level are written immediately, None to
+            disable, by default logging.ERROR
+        """
+        self._local = threading.local()
+        self._buffers = []
+        self._buffersLock = threading.Lock()
+        self._sequence = itertools.count()
+        self._flushCount = 0
+        super().__init__(filename, mode=mode, encoding=encoding, delay=delay,
+                         bufferSize=bufferSize, bufferRecords=bufferRecords,
+                         flushInterval=flushInterval, fsync=fsync, flushLevel=flushLevel)
+
+    def _resetAfterFork(self) -> None:
+        """Recreate the lock a thread of the parent process may have held."""
+        self._buffersLock = threading.Lock()
+
+    def _flushPeriodically(self, stopped: threading.Event, interval: float) -> None:
+        while not stopped.wait(interval):
+            if self._flushDue():
+                self.flush()
+            self._syncUnsynced()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter the record and add it to the buffer of the current thread.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        bool
+            whether the record passed the filters
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Format the record into the buffer of the current thread.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            msg = self.format(record) + self.terminator
+            local = self._local
+            buffer = getattr(local, "buffer", None)
+            if buffer is None:
+                buffer = self._addBuffer()
+            buffer.append((record.created, next(self._sequence), msg))
+            if local.flushCount != self._flushCount:
+                # Another thread wrote the buffer since the last record.
+                local.flushCount = self._flushCount
+                local.size = 0
+            local.size += self.encodedSize(msg)
+            if (len(buffer) >= self.bufferRecords
+                    or local.size >= self.bufferSize
+                    or (self.flushLevel is not None and record.levelno >= self.flushLevel)):
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _addBuffer(self) -> list:
+        """Create the buffer of the current thread."""
+        local = self._local
+        buffer = local.buffer = []
+        local.size = 0
+        local.flushCount = self._flushCount
+        with self._buffersLock:
+            self._buffers.append((threading.current_thread(), buffer))
+        return buffer
+
+    def flush(self) -> None:
+        """Write the records of all thread buffers ordered by creation time."""
+        self.acquire()
+        try:
+            self._flushCount += 1
+            records = []
+            for _, buffer in list(self._buffers):
+                # Only the owning thread appends, so the first count records
+                # can be removed while it keeps appending.
+                count = len(buffer)
+                if count:
+                    records.extend(buffer[:count])
+                    del buffer[:count]
+            with self._buffersLock:
+                self._buffers = [(thread, buffer) for thread, buffer in self._buffers
+                                 if buffer or thread.is_alive()]
+            if records:
+                records.sort()
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write("".join([record[2] for record in records]))
+                self.stream.flush()
+                self._unsynced = True
+                self.sync()
+            elif self.stream is not None:
+                self.stream.flush()
+            self._lastFlush = time.monotonic()
+        finally:
+            self.release()
+
+
+class MmapFileHandler(logging.Handler):
+    terminator = "\n"
+
+    def __init__(self, filename: str, mode: str = "a", encoding: str = None,
+                    chunkSize: int = DEFAULT_MMAP_CHUNK_SIZE):
+        """
+        A handler class which copies formatted records into a memory-mapped
+        region of a preallocated log file.
+
+        The file is extended chunkSize bytes at a time and truncated to the
+        written length when the handler is closed. If the process dies
+        before that, the file ends with zero bytes, which are skipped when
+        the file is opened again in append mode.
+
+        The mapping can not be shared with a forked child, so a child
+        drops the inherited mapping without truncating the file and writes
+        its records to a file of its own, named "<filename>.<pid>".
+
+        Parameters
+        ----------
+        filename : str
+            log file name
+        mode : str, optional
+            log file open mode, "a" or "w", by default "a"
+        encoding : str, optional
+            log file encoding, by default None (UTF-8)
+        chunkSize : int, optional
+            number of bytes the file is extended by, by default DEFAULT_MMAP_CHUNK_SIZE
+        """
+        super().__init__()
+        if mode not in ("a", "w"):
+            raise ValueError(f"Unsupported mode: {mode!r}")
+        self.shardFilename = self.baseFilename = os.path.abspath(filename)
+        self.mode = mode
+        self.encoding = encoding or "utf-8"
+        granularity = mmap.ALLOCATIONGRANULARITY
+        self.chunkSize = max(granularity, -(-chunkSize // granularity) * granularity)
+        self.mmap = None
+        self.base = 0
+        self.pid = os.getpid()
+        self._open(mode)
+
+    @property
+    def fields(self) -> frozenset:
+        """The record attributes used by the formatter."""
+        return formatters.getFormatterFields(self.formatter)
+
+    def _open(self, mode: str) -> None:
+        """Open the log file and find the end of the written records."""
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        if mode == "w":
+            flags |= os.O_TRUNC
+        self.fd = os.open(self.baseFilename, flags, 0o644)
+        self.fileSize = os.fstat(self.fd).st_size
+        self.offset = self._findEnd()
+
+    def _detach(self) -> None:
+        """Drop the mapping and the file descriptor inherited from the parent process."""
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _findEnd(self) -> int:
+        """Return the length of the file without trailing preallocated zero bytes."""
+        end = self.fileSize
+        while end > 0:
+            start = max(0, end - 65536)
+            data = os.pread(self.fd, end - start, start) if hasattr(os, "pread") else None
+            if data is None:
+                os.lseek(self.fd, start, os.SEEK_SET)
+                data = os.read(self.fd, end - start)
+            stripped = data.rstrip(b"\0")
+            if stripped:
+                return start + len(stripped)
+            end = start
+        return 0
+
+    def _remap(self, needed: int) -> None:
+        """Map a region starting at the current offset which fits needed bytes."""
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+        base = self.offset - self.offset % mmap.ALLOCATIONGRANULARITY
+        size = self.chunkSize
+        while base + size < self.offset + needed:
+            size += self.chunkSize
+        if self.fileSize < base + size:
+            self._allocate(base + size)
+        self.mmap = mmap.mmap(self.fd, size, offset=base)
+        self.base = base
+
+    def _allocate(self, size: int) -> None:
+        """Extend the file to size bytes.
+
+        The blocks are allocated with posix_fallocate where available, so a
+        full disk raises an error here rather than SIGBUS when the mapped
+        region is written. A file system without support for it falls back
+        to a sparse file.
+        """
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self.fd, self.fileSize, size - self.fileSize)
+                self.fileSize = size
+                return
+            except OSError as e:
+                if e.errno not in (errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+        os.ftruncate(self.fd, size)
+        self.fileSize = size
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Copy the formatted record into the mapped region.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            data = (self.format(record) + self.terminator).encode(self.encoding)
+            pid = os.getpid()
+            if pid != self.pid:
+                self._detach()
+                self.pid = pid
+                self.baseFilename = f"{self.shardFilename}.{pid}"
+                self._open("a")
+            end = self.offset + len(data)
+            if self.mmap is None or end > self.base + len(self.mmap):
+                self._remap(len(data))
+            pos = self.offset - self.base
+            self.mmap[pos:pos + len(data)] = data
+            self.offset = end
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Write the mapped region back to the file."""
+        self.acquire()
+        try:
+            if self.mmap is not None:
+                self.mmap.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """Unmap the file, truncate it to the written length and close it.
+
+        A forked child which did not write a record only drops the mapping
+        of its parent, which still writes to the file.
+        """
+        self.acquire()
+        try:
+            if self.pid == os.getpid() and self.fd is not None:
+                if self.mmap is not None:
+                    self.mmap.close()
+                    self.mmap = None
+                os.ftruncate(self.fd, self.offset)
+            self._detach()
+        finally:
+            self.release()
+        super().close()
+
+
+_compressor = None
+_compressorPid = None
+_compressorLock = threading.Lock()
+
+
+def _getCompressor() -> "concurrent.futures.ThreadPoolExecutor":
+    """Return the worker thread that compresses rotated log files."""
+    # Imported on first rotation, which keeps importing vlogging fast.
+    from concurrent.futures import ThreadPoolExecutor
+
+    global _compressor, _compressorPid
+    with _compressorLock:
+        if _compressor is None or _compressorPid != os.getpid():
+            _compressor = ThreadPoolExecutor(max_workers=1,
+                                             thread_name_prefix="vlogging-compress")
+            _compressorPid = os.getpid()
+        return _compressor
+
+
+class RotatingFileHandler(FileHandler):
+    def __init__(self, filename: str, mode: str = "a", encoding: str = None,
+                    delay: bool = False, maxBytes: int = 0, interval: float = 0,
+                    backupCount: int = 0, compress: bool = True):
+        """
+        A file handler which rotates the log file by size and/or time.
+
+        Rotation renames the log file to "<filename>.<YYYYmmdd-HHMMSS>" and
+        opens a new one. Compressing the rotated file and removing old files
+        happen on a worker thread, so the caller never waits for them.
+
+        Parameters
+        ----------
+        filename : str
+            log file name
+        mode : str, optional
+            log file open mode, by default "a"
+        encoding : str, optional
+            log file encoding, by default None
+        delay : bool, optional
+            log file open delay, by default False
+        maxBytes : int, optional
+            rotate when the file would grow beyond this number of bytes,
+            0 to disable, by default 0
+        interval : float, optional
+            rotate every interval seconds, 0 to disable, by default 0
+        backupCount : int, optional
+            number of rotated files to keep, 0 to keep all, by default 0
+        compress : bool, optional
+            compress rotated files with gzip, by default True
+        """
+        super().__init__(filename, mode=mode, encoding=encoding, delay=delay)
+        self.maxBytes = maxBytes
+        self.interval = interval
+        self.backupCount = backupCount
+        self.compress = compress
+        if "w" in mode or not os.path.exists(self.baseFilename):
+            # With delay, the file is only truncated by the first record.
+            self.size = 0
+        else:
+            self.size = os.path.getsize(self.baseFilename)
+        self.rolloverAt = time.time() + interval if interval else None
+        self.pending = []
+        self._lastStamp, self._lastIndex = None, 0
+        dirname, basename = os.path.split(self.baseFilename)
+        self._segmentPattern = re.compile(
+            re.escape(basename) + r"\.(\d{8}-\d{6})(?:\.(\d+))?(\.gz)?$")
+
+    def shouldRollover(self, record: logging.LogRecord, size: int) -> bool:
+        """Check if the log file should be rotated before writing the message.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        size : int
+            encoded size of the formatted message in bytes
+
+        Returns
+        -------
+        bool
+            True if the log file should be rotated.
+        """
+        if self.maxBytes and self.size > 0 and self.size + size > self.maxBytes:
+            return True
+        return self.rolloverAt is not None and record.created >= self.rolloverAt
+
+    def rotationFilename(self) -> str:
+        """Return an unused name for the rotated log file.
+
+        Returns
+        -------
+        str
+            rotated log file name
+        """
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        index = self._lastIndex + 1 if stamp == self._lastStamp else 0
+        while True:
+            candidate = f"{self.baseFilename}.{stamp}" + (f".{index}" if index else "")
+            if not (os.path.exists(candidate) or os.path.exists(candidate + ".gz")):
+                break
+            index += 1
+        self._lastStamp, self._lastIndex = stamp, index
+        return candidate
+
+    def doRollover(self) -> None:
+        """Rename the log file, open a new one and hand the old one to the compressor."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            rotated = self.rotationFilename()
+            os.rename(self.baseFilename, rotated)
+            self.pending = [f for f in self.pending if not f.done()]
+            self.pending.append(_getCompressor().submit(self._finishRotation, rotated))
+        self.size = 0
+        if self.interval:
+            self.rolloverAt = time.time() + self.interval
+
+    def _finishRotation(self, rotated: str) -> None:
+        try:
+            if self.compress:
+                import gzip
+                import shutil
+
+                compressed = rotated + ".gz"
+                with open(rotated, "rb") as src, gzip.open(compressed + ".tmp", "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                os.replace(compressed + ".tmp", compressed)
+                os.remove(rotated)
+            self.removeOldSegments()
+        except Exception:
+            if logging.raiseExceptions:
+                traceback.print_exc(file=sys.stderr)
+
+    def getSegments(self) -> list:
+        """Return the rotated log files, oldest first.
+
+        Returns
+        -------
+        list
+            rotated log file names
+        """
+        dirname, basename = os.path.split(self.baseFilename)
+        segments = []
+        for name in os.listdir(dirname):
+            match = self._segmentPattern.match(name)
+            if match is not None and not name.endswith(".tmp"):
+                key = (match.group(1), int(match.group(2) or 0))
+                segments.append((key, os.path.join(dirname, name)))
+        return [path for key, path in sorted(segments)]
+
+    def removeOldSegments(self) -> None:
+        """Remove the rotated log files beyond backupCount."""
+        if self.backupCount > 0:
+            segments = self.getSegments()
+            for path in segments[:-self.backupCount]:
+                os.remove(path)
+
+    def waitForCompression(self, timeout: float = None) -> None:
+        """Wait until the pending compressions are finished.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            maximum seconds to wait for each file, by default None
+        """
+        for future in list(self.pending):
+            future.result(timeout)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Rotate the log file if needed and write the record.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            msg = self.format(record) + self.terminator
+            size = self.encodedSize(msg)
+            if self.shouldRollover(record, size):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            self.flush()
+            self.size += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class AppendFileHandler(logging.Handler):
+    terminator = "\n"
+
+    def __init__(self, filename: str, mode: str = "a", encoding: str = None,
+                    atomicSize: int = ATOMIC_APPEND_SIZE):
+        """
+        A handler class which appends each record to a file with a single
+        write call, so processes sharing the file never interleave records.
+
+        The file is opened with O_APPEND and records up to atomicSize bytes
+        are written with one unlocked write, so only they are atomic. Larger
+        records are written while holding an exclusive file lock, which only
+        keeps them whole against the large records of other processes: a
+        small record written meanwhile by another process may split them.
+
+        Parameters
+        ----------
+        filename : str
+            log file name
+        mode : str, optional
+            log file open mode, "a" or "w", by default "a"
+        encoding : str, optional
+            log file encoding, by default None (UTF-8)
+        atomicSize : int, optional
+            largest record in bytes written without a lock, by default ATOMIC_APPEND_SIZE
+        """
+        super().__init__()
+        if mode not in ("a", "w"):
+            raise ValueError(f"Unsupported mode: {mode!r}")
+        self.baseFilename = os.path.abspath(filename)
+        self.mode = mode
+        self.encoding = encoding or "utf-8"
+        self.atomicSize = atomicSize
+        self.fd = None
+        self.pid = None
+        self._open(os.O_TRUNC if mode == "w" else 0)
+
+    @property
+    def fields(self) -> frozenset:
+        """The record attributes used by the formatter."""
+        return formatters.getFormatterFields(self.formatter)
+
+    def _open(self, flags: int = 0) -> None:
+        """Open the log file in append mode for the current process."""
+        flags |= os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self.fd = os.open(self.baseFilename, flags, 0o644)
+        self.pid = os.getpid()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter and write the record without taking the handler lock.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+
+        Returns
+        -------
+        bool
+            whether the record passed the filters
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Append the record to the file.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        try:
+            data = (self.format(record) + self.terminator).encode(self.encoding)
+            if self.pid != os.getpid():
+                self._reopen()
+            if len(data) <= self.atomicSize:
+                os.write(self.fd, data)
+            else:
+                self._writeLocked(data)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _reopen(self) -> None:
+        """Open the log file again in a forked child, so it has a file lock of its own."""
+        self.acquire()
+        try:
+            if self.pid != os.getpid():
+                os.close(self.fd)
+                self._open()
+        finally:
+            self.release()
+
+    def _writeLocked(self, data: bytes) -> None:
+        """Write data while holding the handler lock and an exclusive file lock."""
+        self.acquire()
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(self.fd, view):]
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """Close the log file."""
+        self.acquire()
+        try:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+        finally:
+            self.release()
+        super().close()
+
+
+class ShardedFileHandler(FileHandler):
+    def __init__(self, filename: str, mode: str = "a", encoding: str = None,
+                    delay: bool = False):
+        """
+        A file handler which writes to one file per process, named
+        "<filename>.<pid>". A forked child switches to its own file on its
+        first record. Use mergeShardFiles to combine the files.
+
+        Parameters
+        ----------
+        filename : str
+            log file name
+        mode : str, optional
+            log file open mode, by default "a"
+        encoding : str, optional
+            log file encoding, by default None
+        delay : bool, optional
+            log file open delay, by default False
+        """
+        self.shardFilename = os.path.abspath(filename)
+        self.pid = os.getpid()
+        super().__init__(self.getShardFilename(self.pid), mode=mode, encoding=encoding,
+                         delay=delay)
+
+    def getShardFilename(self, pid: int) -> str:
+        """Return the log file name of a process.
+
+        Parameters
+        ----------
+        pid : int
+            process id
+
+        Returns
+        -------
+        str
+            log file name
+        """
+        return f"{self.shardFilename}.{pid}"
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write the record to the file of the current process.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            log record
+        """
+        pid = os.getpid()
+        if pid != self.pid:
+            self.pid = pid
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = self.getShardFilename(pid)
+        super().emit(record)
+
+
+_TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?")
+
+
+def _readShardRecords(filename: str, encoding: str):
+    """Yield (timestamp, text) for each record of a log file.
+
+    Lines which do not start with a timestamp, such as traceback lines,
+    belong to the record before them.
+    """
+    with open(filename, encoding=encoding) as f:
+        key, lines = "", []
+        for line in f:
+            match = _TIMESTAMP_PATTERN.match(line)
+            if match is not None and lines:
+                yield key, "".join(lines)
+                lines = []
+            if match is not None:
+                key = match.group(0)
+            lines.append(line if line.endswith("\n") else line + "\n")
+        if lines:
+            yield key, "".join(lines)
+
+
+def mergeShardFiles(filename: str, output: str = None, encoding: str = None,
+            remove: bool = False) -> str:
+    """Merge the per-process files of a ShardedFileHandler into one file.
+
+    Records are ordered by the timestamp at the start of each record, which
+    works for the default and DATE_FMT_MICROSECONDS time formats.
+
+    Parameters
+    ----------
+    filename : str
+        log file name given to the ShardedFileHandler
+    output : str, optional
+        merged log file name, appended to if it exists, by default filename
+    encoding : str, optional
+        log file encoding, by default None
+    remove : bool, optional
+        remove the per-process files after merging, by default False
+
+    Returns
+    -------
+    str
+        merged log file name
+    """
+    filename = os.path.abspath(filename)
+    shards = sorted(path for path in glob.glob(glob.escape(filename) + ".*")
+                    if path[len(filename) + 1:].isdigit())
+    output = filename if output is None else output
+    streams = [_readShardRecords(path, encoding) for path in shards]
+    with open(output, "a", encoding=encoding) as f:
+        for key, text in heapq.merge(*streams, key=lambda item: item[0]):
+            f.write(text)
+    if remove:
+        for path in shards:
+            os.remove(path)
+    return output
+
+
+def discardHandler(handler: logging.Handler) -> None:
+    """Forget a handler a forked child inherited, without flushing or closing it.
+
+    The parent still owns the file or connection of the handler and writes
+    the records it buffered, so the child stops the background thread of
+    the handler, drops its buffered records and makes its flush and close
+    no-ops, which logging.shutdown calls at exit.
+
+    Parameters
+    ----------
+    handler : logging.Handler
+        handler inherited from the parent process
+    """
+    _backgroundHandlers.discard(handler)
+    if isinstance(handler, RawConsoleHandler):
+        handler.pending = []
+        handler.pendingSize = 0
+    elif isinstance(handler, AggregatorHandler):
+        handler.buffer.clear()
+    elif isinstance(handler, QueueHandler) and handler._thread is not None:
+        handler._thread = None
+        handler.queue.put_nowait(_STOP)
+    stopped = getattr(handler, "_stopped", None)
+    if stopped is not None:
+        handler._stopped = handler._thread = None
+        stopped.set()
+        ready = getattr(handler, "_ready", None)
+        if ready is not None:
+            ready.set()
+    handler.flush = handler.close = loggers.disabledCall
+
+
+def _flushBufferedHandlers() -> None:
+    for handler in list(_backgroundHandlers):
+        if isinstance(handler, (BufferedFileHandler, BinaryFileHandler, RawConsoleHandler,
+                                AggregatorHandler)):
+            handler.flush()
+
+
+def _restartBackgroundHandlers() -> None:
+    for handler in list(_backgroundHandlers):
+        resetAfterFork = getattr(handler, "_resetAfterFork", None)
+        if resetAfterFork is not None:
+            resetAfterFork()
+        if getattr(handler, "_thread", None) is not None:
+            handler.start()
+
+
+def _closeBackgroundHandlers() -> None:
+    for handler in list(_backgroundHandlers):
+        handler.close()
+
+
+atexit.register(_closeBackgroundHandlers)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_flushBufferedHandlers,
+                        after_in_child=_restartBackgroundHandlers)
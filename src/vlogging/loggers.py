@@ -1,4 +1,25 @@
 import logging
+import operator
+import os
+import sys
+import traceback
+
+from vlogging import formatters
+
+CALLER_FIELDS = frozenset(("pathname", "filename", "module", "lineno", "funcName"))
+LEVEL_METHODS = (
+    (logging.DEBUG, ("debug",)),
+    (logging.INFO, ("info",)),
+    (logging.WARNING, ("warning", "warn")),
+    (logging.ERROR, ("error", "exception")),
+    (logging.CRITICAL, ("critical", "fatal")),
+)
+
+RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+_rebindHooks = []
+_fieldSkipping = False
+_UNSET = object()
 
 
 def getLoggerConfig(level: str = None, handlers: list = None,
@@ -33,5 +54,643 @@ def getLoggerConfig(level: str = None, handlers: list = None,
     return config
 
 
+def getFilterFields(filter) -> frozenset:
+    """Return the record attributes used by a filter.
+
+    Parameters
+    ----------
+    filter : logging.Filter or callable
+        filter
+
+    Returns
+    -------
+    frozenset
+        field names, or None if the filter may use any attribute.
+    """
+    if type(filter) is logging.Filter:
+        return frozenset(("name",))
+    return getattr(filter, "fields", None)
+
+
+def getHandlerFields(handler: logging.Handler) -> frozenset:
+    """Return the record attributes used by a handler.
+
+    Handlers may declare the attributes they use with a ``fields`` attribute.
+    Stream based handlers use the attributes of their formatter.
+
+    Parameters
+    ----------
+    handler : logging.Handler
+        handler
+
+    Returns
+    -------
+    frozenset
+        field names, or None if the handler may use any attribute.
+    """
+    fields = getattr(handler, "fields", None)
+    if fields is None:
+        if not isinstance(handler, logging.StreamHandler):
+            return None
+        fields = formatters.getFormatterFields(handler.formatter)
+    for filter in handler.filters:
+        if fields is None:
+            break
+        filterFields = getFilterFields(filter)
+        fields = None if filterFields is None else fields | filterFields
+    return fields
+
+
+def getLoggerFields(logger: logging.Logger) -> frozenset:
+    """Return the record attributes used by the filters and handlers a logger's records reach.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        logger
+
+    Returns
+    -------
+    frozenset
+        field names, or None if any attribute may be used.
+    """
+    fields = set()
+    for filter in logger.filters:
+        filterFields = getFilterFields(filter)
+        if filterFields is None:
+            return None
+        fields |= filterFields
+    found = False
+    current = logger
+    while current is not None:
+        for handler in current.handlers:
+            found = True
+            handlerFields = getHandlerFields(handler)
+            if handlerFields is None:
+                return None
+            fields |= handlerFields
+        if not current.propagate:
+            break
+        current = current.parent
+    if not found and logging.lastResort is not None:
+        handlerFields = getHandlerFields(logging.lastResort)
+        if handlerFields is None:
+            return None
+        fields |= handlerFields
+    return frozenset(fields)
+
+
+def setFieldSkipping(enabled: bool, manager: logging.Manager = None) -> None:
+    """Enable or disable skipping the caller lookup for loggers whose handlers do not use it.
+
+    Skipping is disabled by default and neither basicConfig nor configure
+    enables it, because handlers changed outside vlogging are not noticed;
+    call setFieldSkipping(True) after configuring vlogging. Only the caller
+    lookup is skipped: the thread and process information is still
+    captured, as controlled by logging.logThreads and logging.logProcesses.
+
+    The attributes used by a logger are recomputed when vlogging is
+    configured and when handlers or filters are added to or removed from a
+    vlogging logger. Other changes, such as setting the formatter of a
+    handler or changing the handlers of the root logger, must be followed by
+    a call of updateLoggerFields.
+
+    Parameters
+    ----------
+    enabled : bool
+        whether to skip unused caller lookups
+    manager : logging.Manager, optional
+        logger manager, by default logging.Logger.manager
+    """
+    global _fieldSkipping
+    _fieldSkipping = enabled
+    updateLoggerFields(manager)
+
+
+def updateLoggerFields(manager: logging.Manager = None) -> None:
+    """Recompute the record attributes used by every vlogging logger.
+
+    Parameters
+    ----------
+    manager : logging.Manager, optional
+        logger manager, by default logging.Logger.manager
+    """
+    if manager is None:
+        manager = logging.Logger.manager
+    for logger in list(manager.loggerDict.values()):
+        if isinstance(logger, Logger):
+            logger.updateFields()
+
+
+def findStackCaller(frame, stack_info: bool = False, stacklevel: int = 1) -> tuple:
+    """Find the calling frame outside of the logging package.
+
+    Parameters
+    ----------
+    frame : frame
+        frame to start from
+    stack_info : bool, optional
+        whether to render the stack, by default False
+    stacklevel : int, optional
+        number of frames to skip, by default 1
+
+    Returns
+    -------
+    tuple
+        file name, line number, function name and stack information.
+    """
+    while stacklevel > 1 and frame is not None:
+        frame = frame.f_back
+        while frame is not None and os.path.normcase(frame.f_code.co_filename) == logging._srcfile:
+            frame = frame.f_back
+        stacklevel -= 1
+    while frame is not None and os.path.normcase(frame.f_code.co_filename) == logging._srcfile:
+        frame = frame.f_back
+    if frame is None:
+        return "(unknown file)", 0, "(unknown function)", None
+    sinfo = None
+    if stack_info:
+        sinfo = "Stack (most recent call last):\n" + "".join(traceback.format_stack(frame))
+        if sinfo[-1] == "\n":
+            sinfo = sinfo[:-1]
+    code = frame.f_code
+    return code.co_filename, frame.f_lineno, code.co_name, sinfo
+
+
+def disabledCall(*args, **kwargs) -> None:
+    """Stand-in for the logging methods of disabled levels."""
+
+
+def addRebindHook(hook) -> None:
+    """Register a function called after the loggers were rebound.
+
+    Parameters
+    ----------
+    hook : callable
+        function without arguments
+    """
+    _rebindHooks.append(hook)
+
+
+def rebindLoggers(manager: logging.Manager = None, changed: logging.Logger = None) -> None:
+    """Rebind the level methods of vlogging loggers to their current levels.
+
+    Parameters
+    ----------
+    manager : logging.Manager, optional
+        logger manager, by default logging.Logger.manager
+    changed : logging.Logger, optional
+        logger whose level changed, only it and its descendants are rebound,
+        by default None to rebind every logger
+    """
+    if manager is None:
+        manager = logging.Logger.manager
+    if changed is None or changed is manager.root:
+        for logger in list(manager.loggerDict.values()):
+            if isinstance(logger, Logger):
+                logger.rebind()
+    else:
+        name = changed.name
+        prefix = name + "."
+        for logger in list(manager.loggerDict.values()):
+            if (isinstance(logger, Logger)
+                    and (logger.name.startswith(prefix) or logger.name == name)):
+                logger.rebind()
+    for hook in _rebindHooks:
+        hook()
+
+
+class Manager(logging.Manager):
+    """
+    Manager that rebinds the logger level methods whenever the level cache is
+    cleared, which is what Logger.setLevel and logging.disable do.
+
+    Importing vlogging makes it the class of the global stdlib manager, so
+    the level changes of every logger in the process go through it. Like
+    the stdlib cache clearing, each change visits every logger; setLevel of
+    a vlogging logger rebinds only that logger and its descendants, while
+    logging.disable and setLevel of other loggers rebind all of them.
+    """
+
+    suspended = 0
+
+    def getLogger(self, name: str) -> logging.Logger:
+        """Return a logger, binding the level methods of a new one."""
+        isNew = not isinstance(self.loggerDict.get(name), logging.Logger)
+        logger = super().getLogger(name)
+        if isNew and isinstance(logger, Logger):
+            logger.rebind()
+            if _fieldSkipping:
+                logger.updateFields()
+        return logger
+
+    def _clear_cache(self) -> None:
+        self.clearCache()
+
+    def clearCache(self, changed: logging.Logger = None) -> None:
+        """Clear the level caches and rebind the level methods.
+
+        Parameters
+        ----------
+        changed : logging.Logger, optional
+            logger whose level changed, by default None for any logger
+        """
+        super()._clear_cache()
+        if not self.suspended:
+            rebindLoggers(self, changed)
+
+
+def suspendRebind(manager: logging.Manager = None) -> None:
+    """Stop rebinding on level changes until resumeRebind is called.
+
+    Parameters
+    ----------
+    manager : logging.Manager, optional
+        logger manager, by default logging.Logger.manager
+    """
+    if manager is None:
+        manager = logging.Logger.manager
+    manager.suspended = getattr(manager, "suspended", 0) + 1
+
+
+def resumeRebind(manager: logging.Manager = None) -> None:
+    """Resume rebinding on level changes and rebind all loggers.
+
+    Parameters
+    ----------
+    manager : logging.Manager, optional
+        logger manager, by default logging.Logger.manager
+    """
+    if manager is None:
+        manager = logging.Logger.manager
+    manager.suspended -= 1
+    if not manager.suspended:
+        rebindLoggers(manager)
+
+
 class Logger(logging.Logger):
-    pass
+    """
+    Logger that can skip the caller frame lookup when no handler uses it.
+
+    With setFieldSkipping enabled, each logger computes the record attributes
+    used by its own filters and by the handlers its records reach, and binds
+    findCaller to a placeholder on the instance when none of them uses the
+    caller information. The stdlib globals controlling thread and process
+    information are left alone.
+
+    The level methods of disabled levels are bound to a no-op on the
+    instance, so a disabled call costs a single function call. They are
+    rebound whenever a level changes through the manager.
+    """
+
+    fields = None
+    callerInfo = True
+
+    def updateFields(self) -> None:
+        """Recompute the record attributes used by this logger and bind findCaller."""
+        instance = self.__dict__
+        fields = getLoggerFields(self) if _fieldSkipping else None
+        if fields is None or not CALLER_FIELDS.isdisjoint(fields):
+            instance.pop("findCaller", None)
+            instance.pop("callerInfo", None)
+        else:
+            instance["findCaller"] = self.findNoCaller
+            self.callerInfo = False
+        if fields is None:
+            instance.pop("fields", None)
+        else:
+            self.fields = fields
+
+    def setLevel(self, level) -> None:
+        """Set the logging level of this logger, rebinding it and its descendants."""
+        manager = self.manager
+        if isinstance(manager, Manager):
+            self.level = logging._checkLevel(level)
+            manager.clearCache(self)
+        else:
+            super().setLevel(level)
+
+    def addHandler(self, hdlr: logging.Handler) -> None:
+        """Add the specified handler to this logger."""
+        super().addHandler(hdlr)
+        if _fieldSkipping:
+            updateLoggerFields(self.manager)
+
+    def removeHandler(self, hdlr: logging.Handler) -> None:
+        """Remove the specified handler from this logger."""
+        super().removeHandler(hdlr)
+        if _fieldSkipping:
+            updateLoggerFields(self.manager)
+
+    def addFilter(self, filter) -> None:
+        """Add the specified filter to this logger."""
+        super().addFilter(filter)
+        if _fieldSkipping:
+            self.updateFields()
+
+    def removeFilter(self, filter) -> None:
+        """Remove the specified filter from this logger."""
+        super().removeFilter(filter)
+        if _fieldSkipping:
+            self.updateFields()
+
+    def rebind(self) -> None:
+        """Bind the level methods of disabled levels to a no-op."""
+        level = max(self.getEffectiveLevel(), self.manager.disable + 1)
+        instance = self.__dict__
+        for methodLevel, names in LEVEL_METHODS:
+            if methodLevel < level:
+                for name in names:
+                    instance[name] = disabledCall
+            else:
+                for name in names:
+                    instance.pop(name, None)
+
+    def bind(self, **context) -> "BoundLogger":
+        """Return a logger which adds context attributes to the records of this logger.
+
+        The bound logger is not registered anywhere; it uses the handlers,
+        filters and levels of this logger.
+
+        Returns
+        -------
+        BoundLogger
+            bound logger
+        """
+        return BoundLogger(self, context)
+
+    def findNoCaller(self, stack_info: bool = False, stacklevel: int = 1) -> tuple:
+        """Return placeholder caller information without walking the stack.
+
+        The stack is still walked when stack information is requested.
+
+        Parameters
+        ----------
+        stack_info : bool, optional
+            whether to render the stack, by default False
+        stacklevel : int, optional
+            number of frames to skip, by default 1
+
+        Returns
+        -------
+        tuple
+            file name, line number, function name and stack information.
+        """
+        if stack_info:
+            return findStackCaller(sys._getframe(1), stack_info, stacklevel)
+        return "(unknown file)", 0, "(unknown function)", None
+
+
+class ProxyLogger(object):
+    """
+    Base of the loggers which wrap a logger and create its records themselves.
+
+    It provides the level methods, the caller lookup and the exception
+    information handling. Subclasses set ``logger`` and may override
+    _getExtra, to add attributes to the records, and _handle, to pass the
+    records on differently.
+    """
+
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        """The name of the logger."""
+        return self.logger.name
+
+    def isEnabledFor(self, level: int) -> bool:
+        """Is this logger enabled for level 'level'?
+
+        Parameters
+        ----------
+        level : int
+            log level
+
+        Returns
+        -------
+        bool
+            True if enabled.
+        """
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, msg, *args, **kwargs):
+        """Log 'msg % args' with severity 'DEBUG'.
+
+        Parameters
+        ----------
+        msg : Any
+            log message
+        """
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self._log(logging.DEBUG, msg, args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        """Log 'msg % args' with severity 'INFO'.
+
+        Parameters
+        ----------
+        msg : Any
+            log message
+        """
+        if self.logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, msg, args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        """Log 'msg % args' with severity 'WARNING'.
+
+        Parameters
+        ----------
+        msg : Any
+            log message
+        """
+        if self.logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, msg, args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        """Log 'msg % args' with severity 'ERROR'.
+
+        Parameters
+        ----------
+        msg : Any
+            log message
+        """
+        if self.logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, msg, args, **kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        """Log 'msg % args' with severity 'ERROR', with exception information.
+
+        Parameters
+        ----------
+        msg : Any
+            log message
+        exc_info : bool, optional
+            exception information, by default True
+        """
+        if self.logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, msg, args, exc_info=exc_info, **kwargs)
+
+    def critical(self, msg, *args, **kwargs):
+        """Log 'msg % args' with severity 'CRITICAL'.
+
+        Parameters
+        ----------
+        msg : Any
+            log message
+        """
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            self._log(logging.CRITICAL, msg, args, **kwargs)
+
+    fatal = critical
+
+    def log(self, level: int, msg, *args, **kwargs):
+        """Log 'msg % args' with the integer severity 'level'.
+
+        Parameters
+        ----------
+        level : int
+            log level
+        msg : Any
+            log message
+        """
+        if self.logger.isEnabledFor(level):
+            self._log(level, msg, args, **kwargs)
+
+    def _log(self, level: int, msg, args: tuple, exc_info=None, extra: dict = None,
+                stack_info: bool = False, stacklevel: int = 1) -> None:
+        """Create a record and pass it to _handle."""
+        logger = self.logger
+        if getattr(logger, "callerInfo", True) or stack_info:
+            fn, lno, func, sinfo = findStackCaller(sys._getframe(2), stack_info, stacklevel)
+        else:
+            fn, lno, func, sinfo = "(unknown file)", 0, "(unknown function)", None
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+        self._handle(logger.makeRecord(logger.name, level, fn, lno, msg, args,
+                                       exc_info, func, self._getExtra(extra), sinfo))
+
+    def _getExtra(self, extra: dict) -> dict:
+        """Return the extra attributes of a record."""
+        return extra
+
+    def _handle(self, record: logging.LogRecord) -> None:
+        """Pass a record to the logger."""
+        self.logger.handle(record)
+
+
+class BoundLogger(ProxyLogger):
+    """
+    A logger with context attributes added to each of its records.
+
+    It holds a logger and a context dict and is cheap to create, for
+    example once per request. The context is passed to the records as
+    ``extra``, so it is only copied when a call passes extra as well.
+    """
+
+    __slots__ = ("logger", "context")
+
+    def __init__(self, logger: logging.Logger, context: dict):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            logger which handles the records
+        context : dict
+            attributes added to the records
+        """
+        for key in context:
+            if key in RECORD_ATTRIBUTES:
+                raise KeyError(f"Attempt to overwrite {key!r} in LogRecord")
+        self.logger = logger
+        self.context = context
+
+    def bind(self, **context) -> "BoundLogger":
+        """Return a logger with more context attributes.
+
+        Returns
+        -------
+        BoundLogger
+            bound logger
+        """
+        return BoundLogger(self.logger, {**self.context, **context})
+
+    def _getExtra(self, extra: dict) -> dict:
+        """Return the context attributes, with the extra attributes of the call."""
+        if extra is None:
+            return self.context
+        return {**self.context, **extra}
+
+
+class Lazy(object):
+    """
+    A log argument computed only when the message is rendered.
+
+    The function is called the first time the argument is formatted, which
+    happens after the level and filter checks, and its result is kept, so
+    it is called at most once however many handlers format the record.
+    """
+
+    __slots__ = ("func", "args", "kwargs", "_value")
+
+    def __init__(self, func, *args, **kwargs):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        func : callable
+            function which computes the value
+        """
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self._value = _UNSET
+
+    @property
+    def value(self):
+        """The computed value."""
+        value = self._value
+        if value is _UNSET:
+            value = self._value = self.func(*self.args, **self.kwargs)
+            self.func = self.args = self.kwargs = None
+        return value
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+    def __format__(self, spec: str) -> str:
+        return format(self.value, spec)
+
+    def __int__(self) -> int:
+        return int(self.value)
+
+    def __float__(self) -> float:
+        return float(self.value)
+
+    def __index__(self) -> int:
+        return operator.index(self.value)
+
+
+def lazy(func, *args, **kwargs) -> Lazy:
+    """Return a log argument computed only when the message is rendered.
+
+    ``logger.debug("payload %s", lazy(json.dumps, payload))`` calls
+    json.dumps only if the record is written.
+
+    Parameters
+    ----------
+    func : callable
+        function which computes the value, called with args and kwargs
+
+    Returns
+    -------
+    Lazy
+        lazy argument
+    """
+    return Lazy(func, *args, **kwargs)
@@ -0,0 +1,364 @@
+"""
+Opt-in metrics of the vlogging loggers and handlers.
+
+Once enabled, vlogging loggers count the records they pass to handlers
+per logger and level, and every handler counts its records, the bytes
+of the text it formats, line terminator included, and its errors. The
+bytes are counted in the file encoding by vlogging file handlers and as
+UTF-8 by other handlers. Handlers which do not format records, such as
+BinaryFileHandler, AggregatorHandler, QueueHandler and
+FlightRecorderHandler, report 0 bytes, and the handlers they pass
+records to are not counted. One record in sampleInterval is timed: the
+time spent in the handler, formatting and waiting for the handler lock
+are kept in power-of-two histograms of nanoseconds. Records dropped by
+queue handlers and rate limit filters are reported from their own
+counters.
+
+    vlogging.metrics.enable()
+    ...
+    vlogging.stats()
+    vlogging.resetStats()
+
+Counters are plain integers updated without a lock, so concurrent threads
+may occasionally lose an increment.
+"""
+import logging
+import time
+import weakref
+
+from vlogging import loggers
+
+DEFAULT_SAMPLE_INTERVAL = 100
+
+_enabled = False
+_sampleInterval = DEFAULT_SAMPLE_INTERVAL
+_loggerCounts = {}
+_handlerMetrics = weakref.WeakSet()
+
+
+class Histogram(object):
+    """Power-of-two histogram of durations in nanoseconds."""
+
+    __slots__ = ("buckets", "samples", "total", "max")
+
+    def __init__(self):
+        """Initializes the instance."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the recorded durations."""
+        self.buckets = [0] * 64
+        self.samples = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, duration: int) -> None:
+        """Record a duration.
+
+        Parameters
+        ----------
+        duration : int
+            duration in nanoseconds
+        """
+        self.buckets[min(duration.bit_length(), 63)] += 1
+        self.samples += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def snapshot(self) -> dict:
+        """Return the histogram as a dict.
+
+        Returns
+        -------
+        dict
+            sample count, total, mean and maximum in nanoseconds, and the
+            count of every non-empty bucket keyed by its upper bound
+        """
+        return {
+            "samples": self.samples,
+            "totalNs": self.total,
+            "meanNs": self.total // self.samples if self.samples else 0,
+            "maxNs": self.max,
+            "buckets": {1 << i: count for i, count in enumerate(self.buckets) if count},
+        }
+
+
+class HandlerMetrics(object):
+    """Counters and sampled timings of one handler."""
+
+    def __init__(self, handler: logging.Handler):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        handler : logging.Handler
+            instrumented handler
+        """
+        self.handler = weakref.ref(handler)
+        self.handlerFormat = None
+        self.handlerHandleError = None
+        self.encodedSize = getattr(handler, "encodedSize", None)
+        terminator = getattr(handler, "terminator", "")
+        self.terminatorSize = (self.encodedSize(terminator) if self.encodedSize is not None
+                               else len(terminator.encode("utf-8")))
+        self.emit = Histogram()
+        self.format = Histogram()
+        self.lockWait = Histogram()
+        self.reset()
+
+    def reset(self) -> None:
+        """Set the counters to zero."""
+        self.records = 0
+        self.bytes = 0
+        self.errors = 0
+        self.tick = 0
+        self.formatTick = 0
+        self.emit.reset()
+        self.format.reset()
+        self.lockWait.reset()
+
+    def formatRecord(self, record: logging.LogRecord) -> str:
+        """Format a record with the handler, counting its size in bytes."""
+        self.formatTick += 1
+        if self.formatTick < _sampleInterval:
+            text = self.handlerFormat(record)
+        else:
+            self.formatTick = 0
+            start = time.perf_counter_ns()
+            text = self.handlerFormat(record)
+            self.format.add(time.perf_counter_ns() - start)
+        if self.encodedSize is not None:
+            self.bytes += self.encodedSize(text) + self.terminatorSize
+        else:
+            # ASCII text takes one byte per character, so only other text is encoded.
+            self.bytes += (len(text) if text.isascii()
+                           else len(text.encode("utf-8", "surrogateescape"))) + self.terminatorSize
+        return text
+
+    def handleError(self, record: logging.LogRecord) -> None:
+        """Count an error of the handler and let the handler report it."""
+        self.errors += 1
+        self.handlerHandleError(record)
+
+    def snapshot(self) -> dict:
+        """Return the handler metrics as a dict."""
+        handler = self.handler()
+        return {
+            "class": f"{type(handler).__module__}.{type(handler).__name__}",
+            "records": self.records,
+            "bytes": self.bytes,
+            "errors": self.errors,
+            "dropped": getDropped(handler),
+            "emit": self.emit.snapshot(),
+            "format": self.format.snapshot(),
+            "lockWait": self.lockWait.snapshot(),
+        }
+
+
+def getDropped(handler) -> int:
+    """Return the records dropped by a handler or logger and its filters.
+
+    Parameters
+    ----------
+    handler : logging.Filterer
+        handler or logger
+
+    Returns
+    -------
+    int
+        number of dropped records
+    """
+    dropped = getattr(handler, "dropped", 0) if isinstance(handler, logging.Handler) else 0
+    for filter in handler.filters:
+        dropped += getFilterDropped(filter)
+    return dropped
+
+
+def getFilterDropped(filter) -> int:
+    """Return the records dropped or sampled out by a filter.
+
+    Parameters
+    ----------
+    filter : logging.Filter or callable
+        filter
+
+    Returns
+    -------
+    int
+        number of dropped records
+    """
+    return getattr(filter, "dropped", 0) + getattr(filter, "sampled", 0)
+
+
+def getHandlerMetrics(handler: logging.Handler) -> HandlerMetrics:
+    """Return the metrics of a handler, instrumenting it on first use.
+
+    Parameters
+    ----------
+    handler : logging.Handler
+        handler
+
+    Returns
+    -------
+    HandlerMetrics
+        handler metrics
+    """
+    metrics = handler.__dict__.get("_metrics")
+    if metrics is None:
+        metrics = HandlerMetrics(handler)
+        metrics.handlerFormat = handler.format
+        handler.format = metrics.formatRecord
+        metrics.handlerHandleError = handler.handleError
+        handler.handleError = metrics.handleError
+        handler._metrics = metrics
+        _handlerMetrics.add(metrics)
+    return metrics
+
+
+def sampledHandle(metrics: HandlerMetrics, handler: logging.Handler,
+            record: logging.LogRecord) -> None:
+    """Pass a record to a handler, timing the handler and its lock.
+
+    Parameters
+    ----------
+    metrics : HandlerMetrics
+        metrics of the handler
+    handler : logging.Handler
+        handler
+    record : logging.LogRecord
+        log record
+    """
+    clock = time.perf_counter_ns
+    if type(handler).handle is not logging.Handler.handle:
+        start = clock()
+        handler.handle(record)
+        metrics.emit.add(clock() - start)
+        return
+    # Handler.handle with the lock acquisition timed separately.
+    rv = handler.filter(record)
+    if isinstance(rv, logging.LogRecord):
+        record = rv
+    if rv:
+        start = clock()
+        handler.acquire()
+        acquired = clock()
+        try:
+            handler.emit(record)
+        finally:
+            handler.release()
+        metrics.lockWait.add(acquired - start)
+        metrics.emit.add(clock() - acquired)
+
+
+def callHandlers(self, record: logging.LogRecord) -> None:
+    """Logger.callHandlers counting the record and the handlers it passes."""
+    counts = _loggerCounts.get(self.name)
+    if counts is None:
+        counts = _loggerCounts[self.name] = {}
+    counts[record.levelname] = counts.get(record.levelname, 0) + 1
+    c = self
+    found = 0
+    while c:
+        for hdlr in c.handlers:
+            found += 1
+            if record.levelno >= hdlr.level:
+                metrics = hdlr.__dict__.get("_metrics") or getHandlerMetrics(hdlr)
+                metrics.records += 1
+                metrics.tick += 1
+                if metrics.tick < _sampleInterval:
+                    hdlr.handle(record)
+                else:
+                    metrics.tick = 0
+                    sampledHandle(metrics, hdlr, record)
+        if not c.propagate:
+            c = None
+        else:
+            c = c.parent
+    if found == 0:
+        logging.Logger.callHandlers(self, record)
+
+
+def enable(sampleInterval: int = DEFAULT_SAMPLE_INTERVAL) -> None:
+    """Start collecting metrics.
+
+    Parameters
+    ----------
+    sampleInterval : int, optional
+        time one record in this many per handler, by default DEFAULT_SAMPLE_INTERVAL
+    """
+    global _enabled, _sampleInterval
+    if sampleInterval < 1:
+        raise ValueError("sampleInterval must be at least 1")
+    _sampleInterval = sampleInterval
+    _enabled = True
+    loggers.Logger.callHandlers = callHandlers
+
+
+def disable() -> None:
+    """Stop collecting metrics and remove the handler instrumentation."""
+    global _enabled
+    _enabled = False
+    loggers.Logger.callHandlers = logging.Logger.callHandlers
+    for metrics in list(_handlerMetrics):
+        handler = metrics.handler()
+        if handler is not None:
+            handler.__dict__.pop("format", None)
+            handler.__dict__.pop("handleError", None)
+            handler.__dict__.pop("_metrics", None)
+    _handlerMetrics.clear()
+
+
+def isEnabled() -> bool:
+    """Return whether metrics are collected."""
+    return _enabled
+
+
+def reset() -> None:
+    """Set all counters and histograms to zero."""
+    _loggerCounts.clear()
+    for metrics in list(_handlerMetrics):
+        metrics.reset()
+
+
+def snapshot() -> dict:
+    """Return the current metrics.
+
+    Returns
+    -------
+    dict
+        records per level and per logger, the metrics of every handler keyed
+        by handler name, and the total of dropped records
+    """
+    levels = {}
+    loggerCounts = {}
+    for name, counts in list(_loggerCounts.items()):
+        counts = dict(counts)
+        loggerCounts[name] = counts
+        for level, count in counts.items():
+            levels[level] = levels.get(level, 0) + count
+    handlerStats = {}
+    dropped = 0
+    # A filter shared by several handlers and loggers is counted once.
+    filters = {}
+    for metrics in list(_handlerMetrics):
+        handler = metrics.handler()
+        if handler is None:
+            continue
+        name = handler.get_name() or f"{type(handler).__name__}@{id(handler):x}"
+        handlerStats[name] = metrics.snapshot()
+        dropped += getattr(handler, "dropped", 0)
+        filters.update((id(filter), filter) for filter in handler.filters)
+    for logger in list(logging.Logger.manager.loggerDict.values()) + [logging.getLogger()]:
+        if isinstance(logger, logging.Logger):
+            filters.update((id(filter), filter) for filter in logger.filters)
+    dropped += sum(getFilterDropped(filter) for filter in filters.values())
+    return {
+        "enabled": _enabled,
+        "sampleInterval": _sampleInterval,
+        "records": sum(levels.values()),
+        "levels": levels,
+        "loggers": loggerCounts,
+        "handlers": handlerStats,
+        "dropped": dropped,
+    }
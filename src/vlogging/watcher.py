@@ -0,0 +1,199 @@
+"""
+Reload the vlogging settings when a config file changes.
+
+The file is polled by a background thread, and every change is applied
+with Config.apply, so only the loggers, handlers, formatters and filters
+whose settings changed are touched.
+
+    watcher = vlogging.watchConfig("logging.toml", interval=2.0)
+    ...
+    watcher.stop()
+
+JSON and TOML files hold the same dictionary as Config.configure. INI files
+have one section per item, named after its config key and id, for example::
+
+    [handlers.vlogging_handler]
+    class = logging.StreamHandler
+    level = INFO
+    formatter = vlogging_format
+
+    [loggers.app.db]
+    level = DEBUG
+    handlers = vlogging_handler
+
+Values of ``handlers``, ``filters`` and ``targets`` are comma separated
+lists; other values are read as JSON when possible and as strings otherwise.
+"""
+import configparser
+import json
+import logging
+import os
+import threading
+import traceback
+from typing import Any, Callable
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+DEFAULT_INTERVAL = 1.0
+CONFIG_KEYS = ("formatters", "filters", "handlers", "loggers")
+LIST_OPTIONS = ("handlers", "filters", "targets")
+
+
+def loadConfig(filename: str) -> dict:
+    """Read a config file.
+
+    Parameters
+    ----------
+    filename : str
+        JSON, TOML or INI file name
+
+    Returns
+    -------
+    dict
+        config
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".json":
+        with open(filename, encoding="utf-8") as f:
+            return json.load(f)
+    if extension == ".toml":
+        if tomllib is None:
+            raise ValueError("Reading TOML files requires Python 3.11 or the tomli package")
+        with open(filename, "rb") as f:
+            return tomllib.load(f)
+    if extension in (".ini", ".cfg", ".conf"):
+        return loadIniConfig(filename)
+    raise ValueError(f"Unknown config file type: {filename!r}")
+
+
+def loadIniConfig(filename: str) -> dict:
+    """Read an INI config file.
+
+    Parameters
+    ----------
+    filename : str
+        INI file name
+
+    Returns
+    -------
+    dict
+        config
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str
+    with open(filename, encoding="utf-8") as f:
+        parser.read_file(f)
+    config = {}
+    for section in parser.sections():
+        key, _, name = section.partition(".")
+        if key not in CONFIG_KEYS or not name:
+            raise ValueError(f"Unknown config section: {section!r}")
+        config.setdefault(key, {})[name] = {
+            option: parseIniValue(option, value) for option, value in parser.items(section)
+        }
+    return config
+
+
+def parseIniValue(option: str, value: str) -> Any:
+    """Convert an INI value.
+
+    Parameters
+    ----------
+    option : str
+        option name
+    value : str
+        option value
+
+    Returns
+    -------
+    Any
+        list of ids for list options, the JSON value when the value is
+        valid JSON, and the string otherwise
+    """
+    if option in LIST_OPTIONS:
+        return [item.strip() for item in value.split(",") if item.strip()]
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+class ConfigWatcher(object):
+    """
+    Apply a config file every time it changes.
+
+    A change is noticed when the modification time, size or inode of the
+    file differ from the last check. Errors raised while reading or applying
+    the file in the background thread are printed to sys.stderr when
+    logging.raiseExceptions is set, and the current settings are kept.
+    """
+
+    def __init__(self, filename: str, apply: Callable[[dict], None],
+                    interval: float = DEFAULT_INTERVAL):
+        """Initializes the instance.
+
+        Parameters
+        ----------
+        filename : str
+            config file name
+        apply : Callable[[dict], None]
+            function applying a config
+        interval : float, optional
+            seconds between two checks, by default DEFAULT_INTERVAL
+        """
+        self.filename = os.path.abspath(filename)
+        self.apply = apply
+        self.interval = interval
+        self.stamp = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self) -> bool:
+        """Apply the file if it changed since the last check.
+
+        Returns
+        -------
+        bool
+            whether the file was applied
+        """
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            return False
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stamp == self.stamp:
+            return False
+        # Remembered first, so that a broken file is reported once, not on every check.
+        self.stamp = stamp
+        self.apply(loadConfig(self.filename))
+        return True
+
+    def start(self) -> None:
+        """Apply the file and start watching it."""
+        self.check()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="vlogging-config-watcher",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching the file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                if logging.raiseExceptions:
+                    traceback.print_exc()
@@ -4,6 +4,10 @@
 ## pytest --durations=0 -v
 ##------------------------------------------------------------------------------
 
+import json
+import os
+import subprocess
+import sys
 import pytest
 import vlogging
 from vlogging import (
@@ -28,6 +32,45 @@ def test_vlogging():
         vlogging.exception(e)
 
 
+def runPython(code):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(vlogging.__file__)))
+    result = subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                            capture_output=True, text=True)
+    return result.stdout, result.stderr
+
+
+def test_lazy_import():
+    stdout, stderr = runPython(
+        "import logging, sys, vlogging\n"
+        "print('logging.config' in sys.modules, vlogging._config.configured,\n"
+        "      'vlogging' in logging.Logger.manager.loggerDict)\n"
+        "vlogging.debug('first call')\n"
+        "print('logging.config' in sys.modules, vlogging._config.configured)\n"
+    )
+    assert stdout.split() == ["False", "False", "False", "True", "True"]
+    assert stderr.endswith("DEBUG    first call\n")
+
+
+def test_lazy_import_basicConfig():
+    stdout, stderr = runPython(
+        "import vlogging, sys\n"
+        "vlogging.basicConfig(level='INFO', stream=sys.stdout, format='%(levelname)s %(message)s')\n"
+        "vlogging.debug('hidden')\n"
+        "vlogging.info('shown')\n"
+    )
+    assert stdout == "INFO shown\n"
+    assert stderr == ""
+
+
+def test_lazy_import_basicConfig_level():
+    stdout, stderr = runPython(
+        "import vlogging, sys\n"
+        "vlogging.basicConfig(stream=sys.stdout, format='%(levelname)s %(message)s')\n"
+        "vlogging.debug('shown')\n"
+    )
+    assert stdout == "DEBUG shown\n"
+
+
 def test_basicConfig(log_file):
     vlogging.basicConfig(filename = log_file)
     vlogging.critical("TEST basicConfig critical")
@@ -134,3 +177,88 @@ def test_config_configureDefautConfig(vconfig, key, defaut):
         assert cfg.get(defaut) is not None
     else:
         assert len(cfg.keys()) == 0
+
+
+def test_config_prepare(vconfig, monkeypatch):
+    vconfig.configure()
+    def fail(self):
+        raise AssertionError("the configuration must not be rebuilt")
+    monkeypatch.setattr(vlogging.configurator.Configurator, "configure", fail)
+    name = "test.config.prepare"
+    vconfig.prepare(name)
+    logger = vlogging.logging.getLogger(name)
+    source = vlogging.logging.getLogger(DEFAUT_LOGGER)
+    assert name in vconfig.config["loggers"]
+    assert logger.handlers == source.handlers
+    assert logger.level == source.level
+
+
+def test_config_register_existing(vconfig):
+    vconfig.configure()
+    child = vlogging.logging.getLogger("test.config.register.child")
+    child.getEffectiveLevel()
+    vconfig.register("test.config.register", DEFAUT_LOGGER)
+    parent = vlogging.logging.getLogger("test.config.register")
+    assert parent.handlers == vlogging.logging.getLogger(DEFAUT_LOGGER).handlers
+    assert child.getEffectiveLevel() == parent.level
+
+
+def test_config_apply(vconfig, tmp_path):
+    filename = str(tmp_path / "apply.log")
+    config = {
+        "handlers": {
+            "test_apply_file": vlogging.handlers.getFileHandlerConfig(filename, "a", None, "DEBUG", DEFAUT_FORMAT),
+        },
+        "loggers": {
+            "test.apply": vlogging.loggers.getLoggerConfig("DEBUG", ["test_apply_file"]),
+        },
+    }
+    vconfig.configure(config)
+    logger = vlogging.logging.getLogger("test.apply")
+    fileHandler = logger.handlers[0]
+    consoleHandler = vlogging.logging.getLogger(DEFAUT_LOGGER).handlers[0]
+
+    config["loggers"]["test.apply"]["level"] = "WARNING"
+    config["formatters"] = {DEFAUT_FORMAT: vlogging.formatters.getFormatConfig("%(levelname)s %(message)s")}
+    vconfig.apply(config)
+    assert logger.level == vlogging.WARNING
+    assert logger.handlers == [fileHandler]
+    assert fileHandler.stream is not None
+    assert fileHandler.formatter._fmt == "%(levelname)s %(message)s"
+    assert vlogging.logging.getLogger(DEFAUT_LOGGER).handlers == [consoleHandler]
+
+    config["handlers"]["test_apply_file"]["mode"] = "w"
+    vconfig.apply(config)
+    assert logger.handlers[0] is not fileHandler
+    assert fileHandler.stream is None
+    assert vlogging.logging._handlers.get("test_apply_file") is logger.handlers[0]
+
+    del config["loggers"]["test.apply"]
+    del config["handlers"]["test_apply_file"]
+    newHandler = logger.handlers[0]
+    vconfig.apply(config)
+    assert logger.handlers == []
+    assert logger.level == vlogging.NOTSET
+    assert newHandler.stream is None
+    vconfig.configure({})
+
+
+def test_config_apply_registered(vconfig):
+    vconfig.configure({})
+    logger = vlogging.getLogger("test.apply.registered")
+    vconfig.apply({"loggers": {DEFAUT_LOGGER: vlogging.loggers.getLoggerConfig("ERROR", [DEFAUT_HANDLER])}})
+    assert logger.level == vlogging.ERROR
+    assert logger.handlers == vlogging.logging.getLogger(DEFAUT_LOGGER).handlers
+    vconfig.configure({})
+
+
+def test_watchConfig(tmp_path):
+    filename = tmp_path / "logging.json"
+    config = {"loggers": {"test.watch": {"level": "INFO", "handlers": [DEFAUT_HANDLER]}}}
+    filename.write_text(json.dumps(config))
+    watcher = vlogging.watchConfig(str(filename), interval=60)
+    try:
+        assert vlogging.logging.getLogger("test.watch").level == vlogging.INFO
+    finally:
+        watcher.stop()
+    vlogging._config.configure({})
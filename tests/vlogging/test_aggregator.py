@@ -0,0 +1,139 @@
+##------------------------------------------------------------------------------
+## Usage:
+## pytest -s
+## pytest --durations=0 -v
+##------------------------------------------------------------------------------
+
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import pytest
+import vlogging
+from vlogging import aggregator, handlers
+from vlogging import DEFAUT_FORMAT, DEFAUT_HANDLER
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires Unix domain sockets")
+
+
+def waitFor(condition):
+    for _ in range(500):
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def readFile(filename):
+    with open(filename) as f:
+        return f.read()
+
+
+@pytest.fixture
+def aggregated(tmp_path):
+    filename = str(tmp_path / "aggregated.log")
+    vlogging.getLogger(config={
+        "formatters": {
+            DEFAUT_FORMAT: vlogging.formatters.getFormatConfig("%(process)d %(levelname)s %(message)s"),
+        },
+        "handlers": {
+            DEFAUT_HANDLER: handlers.getFileHandlerConfig(filename, formatter=DEFAUT_FORMAT),
+        },
+    })
+    server = aggregator.start()
+    yield filename
+    aggregator.stop()
+    vlogging.basicConfig()
+
+
+def test_getClientConfig():
+    config = aggregator.getClientConfig(vlogging._config.config, "/tmp/socket")
+    assert list(config["handlers"]) == [aggregator.AGGREGATOR_HANDLER]
+    assert config["handlers"][aggregator.AGGREGATOR_HANDLER]["path"] == "/tmp/socket"
+    for cfg in config["loggers"].values():
+        assert cfg["handlers"] == [aggregator.AGGREGATOR_HANDLER]
+        assert cfg["propagate"] is False
+
+
+def logFromChild(message, name="vlogging.test.aggregator"):
+    vlogging.getLogger(name).info(message)
+
+
+def test_aggregator_fork(aggregated):
+    child = multiprocessing.get_context("fork").Process(target=logFromChild, args=("forked",))
+    child.start()
+    child.join()
+    assert waitFor(lambda: "forked" in readFile(aggregated))
+    assert readFile(aggregated) == f"{child.pid} INFO forked\n"
+
+
+def test_aggregator_subprocess(aggregated):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(vlogging.__file__)))
+    subprocess.run([sys.executable, "-c", "import vlogging; vlogging.warning('spawned')"],
+                   env=env, check=True)
+    assert waitFor(lambda: "spawned" in readFile(aggregated))
+    assert readFile(aggregated).endswith(" WARNING spawned\n")
+
+
+def test_AggregatorHandler_reconnect(tmp_path):
+    path = str(tmp_path / "aggregator.sock")
+    handler = handlers.AggregatorHandler(path, maxBuffered=2, reconnectInterval=0)
+    for i in range(3):
+        handler.handle(logging.makeLogRecord({"name": "test.aggregator.reconnect",
+                                              "msg": "message %d", "args": (i,)}))
+    handler.flush()
+    assert len(handler.buffer) == 2
+    assert handler.dropped == 1
+    server = aggregator.Aggregator(path)
+    received = []
+    server.dispatch = lambda record: received.append(record.getMessage())
+    server.start()
+    try:
+        handler.flush()
+        assert waitFor(lambda: len(received) == 2)
+        assert received == ["message 0", "message 1"]
+    finally:
+        handler.close()
+        server.stop()
+    assert not os.path.exists(path)
+
+
+def test_Aggregator_path(tmp_path):
+    path = str(tmp_path / "aggregator.sock")
+    server = aggregator.Aggregator(path)
+    server.start()
+    try:
+        assert oct(os.stat(path).st_mode & 0o777) == oct(0o600)
+        assert os.listdir(tmp_path) == ["aggregator.sock"]
+    finally:
+        server.stop()
+
+
+def test_aggregator_fork_keeps_parent_handlers(tmp_path):
+    filename = str(tmp_path / "mmap.log")
+    vlogging.getLogger(config={
+        "formatters": {
+            DEFAUT_FORMAT: vlogging.formatters.getFormatConfig("%(message)s"),
+        },
+        "handlers": {
+            DEFAUT_HANDLER: handlers.getMmapFileHandlerConfig(filename, "w",
+                                                              formatter=DEFAUT_FORMAT),
+        },
+    })
+    aggregator.start()
+    try:
+        logger = vlogging.getLogger("test.aggregator.keep")
+        logger.info("before")
+        child = multiprocessing.get_context("fork").Process(target=logFromChild,
+                                                            args=("forked", logger.name))
+        child.start()
+        child.join()
+        parentHandler = vlogging._config.objects["handlers"][DEFAUT_HANDLER]
+        assert waitFor(lambda: parentHandler.offset == len("before\nforked\n"))
+        logger.info("after")
+    finally:
+        aggregator.stop()
+        vlogging.basicConfig()
+    assert readFile(filename) == "before\nforked\nafter\n"
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import threading
+import pytest
+import vlogging
+import vlogging.aio
+from vlogging.formatters import BASIC_FORMAT
+
+
+def readFile(filename):
+    with open(filename) as f:
+        return f.read()
+
+
+@pytest.fixture
+def aioLogFile(tmp_path):
+    filename = str(tmp_path / "aio.log")
+    yield filename
+    vlogging.basicConfig()
+
+
+def test_aio_logger(aioLogFile):
+    vlogging.basicConfig(filename=aioLogFile, format="%(levelname)s %(message)s")
+    logger = vlogging.aio.getLogger("test.aio")
+
+    async def main():
+        for i in range(100):
+            logger.info("message %d", i)
+        logger.debug("debug")
+        await vlogging.aio.flush()
+
+    asyncio.run(main())
+    lines = readFile(aioLogFile).splitlines()
+    assert lines[:100] == [f"INFO message {i}" for i in range(100)]
+    assert lines[100] == "DEBUG debug"
+
+
+def test_aio_functions(aioLogFile):
+    vlogging.basicConfig(filename=aioLogFile, format=BASIC_FORMAT, level="INFO")
+
+    async def main():
+        vlogging.aio.info("info"); lineno = sys._getframe().f_lineno
+        vlogging.aio.debug("debug")
+        try:
+            raise ValueError("failure")
+        except ValueError:
+            vlogging.aio.exception("exception")
+        await vlogging.aio.shutdown()
+        return lineno
+
+    lineno = asyncio.run(main())
+    text = readFile(aioLogFile)
+    assert f"{os.path.basename(__file__)}:{lineno}: info" in text
+    assert "debug" not in text
+    assert "ValueError: failure" in text
+
+
+def test_aio_lazy_filtered(aioLogFile):
+    vlogging.basicConfig(filename=aioLogFile, format="%(message)s")
+    logger = vlogging.aio.getLogger("test.aio.lazy")
+    logger.logger.addFilter(lambda record: record.msg != "%s %s")
+    calls = []
+    arguments = {"key": "before"}
+
+    async def main():
+        logger.info("%s %s", "dropped", vlogging.lazy(calls.append, "dropped"))
+        logger.info("%s", vlogging.lazy(lambda: calls.append("kept") or "kept"))
+        logger.info("%(key)s", arguments)
+        arguments["key"] = "after"
+        await vlogging.aio.flush()
+
+    try:
+        asyncio.run(main())
+    finally:
+        logger.logger.filters.clear()
+    assert calls == ["kept"]
+    assert readFile(aioLogFile) == "kept\nbefore\n"
+
+
+def test_aio_getLogger():
+    assert vlogging.aio.getLogger("test.aio") is vlogging.aio.getLogger("test.aio")
+    assert vlogging.aio.getLogger("test.aio").name == "test.aio"
+
+
+def test_aio_Sink_overflow():
+    logger = logging.getLogger("test.aio.sink")
+    records = [logging.makeLogRecord({"msg": str(i)}) for i in range(5)]
+    for overflow, kept in (("drop-newest", ["0", "1"]), ("drop-oldest", ["3", "4"])):
+        sink = vlogging.aio.Sink(maxsize=2, overflow=overflow)
+        sink._thread = object()  # No worker thread, so the records stay queued.
+        for record in records:
+            sink.submit(logger, record)
+        assert [record.msg for _, record in sink._records] == kept
+        assert sink.dropped == 3
+    with pytest.raises(ValueError):
+        vlogging.aio.Sink(overflow="block")
+
+
+def test_aio_Sink_shutdown_race(aioLogFile):
+    vlogging.basicConfig(filename=aioLogFile, format="%(message)s")
+    logger = vlogging.aio.getLogger("test.aio.race")
+    sink = vlogging.aio._sink
+
+    async def main():
+        logger.info("first")
+        first = sink._thread
+        stopping = asyncio.ensure_future(sink.shutdown())
+        await asyncio.sleep(0)
+        logger.info("second")
+        await asyncio.gather(stopping, sink.shutdown())
+        assert not first.is_alive()
+        await vlogging.aio.shutdown()
+
+    asyncio.run(main())
+    assert readFile(aioLogFile) == "first\nsecond\n"
+    assert sum(thread.name == "vlogging-aio" for thread in threading.enumerate()) == 0
+
+
+def test_aio_import_does_not_configure():
+    code = "import vlogging, vlogging.aio; print(vlogging._config.configured)"
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(vlogging.__file__)))
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,136 @@
+import enum
+import io
+import logging
+import os
+import sys
+import pytest
+import vlogging
+from vlogging import binary, decode, handlers
+
+
+def makeRecord(msg, args=(), level=logging.INFO, name="vlogger"):
+    return logging.LogRecord(name, level, "/path/module.py", 10, msg, args, None, "func")
+
+
+def roundTrip(*records, encoder=None):
+    encoder = encoder or binary.Encoder()
+    data = binary.MAGIC + b"".join(encoder.encode(record) for record in records)
+    return list(binary.Decoder(io.BytesIO(data)))
+
+
+@pytest.mark.parametrize("msg, args", [
+    ("plain", ()),
+    ("%s %d %.2f %r %s %s", ("text", 42, 1.5, None, True, b"raw")),
+    ("%(key)s=%(value)d", ({"key": "a", "value": 1},)),
+    ("%s", (object,)),
+    ("%d", (2 ** 70,)),
+    ("%d %s", (vlogging.lazy(int, "7"), vlogging.lazy(str, 1))),
+])
+def test_roundTrip(msg, args):
+    record = makeRecord(msg, args)
+    decoded, = roundTrip(record)
+    assert decoded.getMessage() == record.getMessage()
+    assert decoded.name == record.name
+    assert decoded.levelname == record.levelname
+    assert decoded.created == record.created
+    assert decoded.msecs == record.msecs
+    assert (decoded.pathname, decoded.filename, decoded.module) == \
+        (record.pathname, record.filename, record.module)
+    assert (decoded.lineno, decoded.funcName) == (record.lineno, record.funcName)
+
+
+class Color(enum.IntEnum):
+    RED = 1
+
+
+class Meters(float):
+    pass
+
+
+def test_encodeValue_numbers():
+    record = makeRecord("%d %d %.1f %d",
+                        (Color.RED, True, Meters(2.5), vlogging.lazy(lambda: Color.RED)))
+    decoded, = roundTrip(record)
+    assert decoded.getMessage() == "1 1 2.5 1"
+    assert [type(arg) for arg in decoded.args] == [int, bool, float, int]
+
+
+def test_encodeValue_lazy():
+    parts = []
+    binary.encodeValue(parts, vlogging.lazy(int, "7"))
+    assert parts[0] == b"i"
+
+
+def test_roundTrip_excText():
+    record = makeRecord("failed")
+    record.stack_info = "Stack (most recent call last):"
+    data = binary.MAGIC + binary.Encoder().encode(record, "Traceback: error")
+    decoded, = binary.Decoder(io.BytesIO(data))
+    assert decoded.exc_text == "Traceback: error"
+    assert decoded.stack_info == record.stack_info
+
+
+def test_Encoder_strings():
+    encoder = binary.Encoder()
+    first = encoder.encode(makeRecord("message %s", ("a",)))
+    second = encoder.encode(makeRecord("message %s", ("b",)))
+    assert b"message %s" in first
+    assert b"message %s" not in second
+    assert len(second) < len(first)
+
+
+def test_Encoder_maxStrings():
+    encoder = binary.Encoder(maxStrings=3)
+    records = [makeRecord(f"message {i}") for i in range(5)]
+    decoded = roundTrip(*records, encoder=encoder)
+    assert [record.msg for record in decoded] == [f"message {i}" for i in range(5)]
+    assert "message 0" in encoder.strings
+    assert "message 4" not in encoder.strings
+
+
+def test_Decoder_appended():
+    data = binary.MAGIC + binary.Encoder().encode(makeRecord("first", name="one"))
+    data += binary.MAGIC + binary.Encoder().encode(makeRecord("second", name="two"))
+    decoded = list(binary.Decoder(io.BytesIO(data)))
+    assert [(record.name, record.msg) for record in decoded] == [("one", "first"), ("two", "second")]
+
+
+def test_Decoder_truncated():
+    data = binary.MAGIC + binary.Encoder().encode(makeRecord("first"))
+    data += binary.Encoder().encode(makeRecord("second"))[:-2]
+    assert [record.msg for record in binary.Decoder(io.BytesIO(data))] == ["first"]
+
+
+def test_Decoder_invalid():
+    with pytest.raises(ValueError):
+        binary.Decoder(io.BytesIO(b"text log\n"))
+
+
+def test_decode_main(tmp_path, capsys):
+    filename = tmp_path / "vlogging.vlog"
+    filename.write_bytes(binary.MAGIC + binary.Encoder().encode(makeRecord("value %d", (7,))))
+    assert decode.main([str(filename), "--format", "{levelname}:{name}:{message}", "--style", "{"]) == 0
+    assert capsys.readouterr().out == "INFO:vlogger:value 7\n"
+    assert decode.main([str(tmp_path / "missing.vlog")]) == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_BinaryFileHandler_fork(tmp_path):
+    filename = str(tmp_path / "vlogging.vlog")
+    handler = handlers.BinaryFileHandler(filename, "w", flushLevel=None)
+    handler.handle(makeRecord("parent before %d", (1,)))
+    pid = os.fork()
+    if pid == 0:
+        handler.handle(makeRecord("child %d", (2,)))
+        handler.close()
+        os._exit(0)
+    os.waitpid(pid, 0)
+    handler.handle(makeRecord("parent after %d", (3,)))
+    handler.close()
+    with open(filename, "rb") as f:
+        data = f.read()
+    assert data.count(binary.MAGIC) == 1
+    assert [record.getMessage() for record in binary.Decoder(io.BytesIO(data))] == \
+        ["parent before 1", "parent after 3"]
+    with open(f"{filename}.{pid}", "rb") as f:
+        assert [record.getMessage() for record in binary.Decoder(f)] == ["child 2"]
@@ -0,0 +1,131 @@
+import logging
+import pytest
+import vlogging
+from vlogging import filters, loggers
+
+
+def makeRecord(msg="message", level=logging.WARNING, lineno=1, created=100.0):
+    record = logging.LogRecord("vlogger", level, "path", lineno, msg, None, None)
+    record.created = created
+    return record
+
+
+def test_getRateLimitFilterConfig():
+    config = filters.getRateLimitFilterConfig(5, 10, {"DEBUG": 0.5})
+    assert config.get("()") == "vlogging.filters.RateLimitFilter"
+    assert config.get("rate") == 5
+    assert config.get("burst") == 10
+    assert config.get("sampling") == {"DEBUG": 0.5}
+
+
+class Collector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def collector():
+    logger = logging.getLogger("vlogger")
+    handler = Collector()
+    logger.addHandler(handler)
+    yield handler
+    logger.removeHandler(handler)
+
+
+def limit(collector, **kwargs):
+    filter = filters.RateLimitFilter(**kwargs)
+    collector.addFilter(filter)
+    return filter, collector.records
+
+
+def test_RateLimitFilter(collector):
+    filter, summaries = limit(collector, rate=1, burst=3)
+    assert [filter.filter(makeRecord("%d%%", lineno=1)) for _ in range(5)] == [True] * 3 + [False] * 2
+    assert filter.filter(makeRecord(lineno=2))
+    assert summaries == []
+    record = makeRecord(created=101.0)
+    assert filter.filter(record)
+    assert "suppressed" not in record.__dict__
+    assert record.getMessage() == "message"
+    assert [summary.suppressed for summary in summaries] == [2]
+    assert summaries[0].getMessage() == "suppressed 2 similar messages: %d%%"
+    assert summaries[0].lineno == 1
+    assert filter.filter(summaries[0])
+    assert not filter.filter(makeRecord(created=101.0))
+    assert not filter.filter(makeRecord(created=99.0))
+    assert filter.dropped == 4
+
+
+def test_RateLimitFilter_quiet_site(collector):
+    filter, summaries = limit(collector, rate=1, burst=1)
+    assert filter.filter(makeRecord(lineno=1))
+    assert not filter.filter(makeRecord(lineno=1))
+    assert filter.filter(makeRecord(lineno=2, created=100.5))
+    assert summaries == []
+    assert filter.filter(makeRecord(lineno=2, created=102.0))
+    assert [(summary.lineno, summary.suppressed) for summary in summaries] == [(1, 1)]
+    assert not filter.filter(makeRecord(lineno=2, created=102.0))
+    filter.reportSuppressed()
+    assert [(summary.lineno, summary.suppressed) for summary in summaries[1:]] == [(2, 1)]
+
+
+def test_RateLimitFilter_attached(collector):
+    other = Collector()
+    logger = logging.getLogger("vlogger")
+    logger.addHandler(other)
+    try:
+        filter, summaries = limit(collector, rate=1, burst=1)
+        record = makeRecord()
+        record.suppressed = 5
+        for record in (makeRecord(), record, makeRecord(created=101.0)):
+            logger.handle(record)
+    finally:
+        logger.removeHandler(other)
+    assert [record.getMessage() for record in summaries] == \
+        ["message", "suppressed 1 similar messages: message", "message"]
+    assert [record.msg for record in other.records] == ["message"] * 3
+
+
+def test_RateLimitFilter_logger_summary(collector):
+    logger = logging.getLogger("vlogger")
+    filter = filters.RateLimitFilter(rate=1, burst=1)
+    logger.addFilter(filter)
+    try:
+        for created in (100.0, 100.0, 101.0):
+            logger.handle(makeRecord(created=created))
+    finally:
+        logger.removeFilter(filter)
+    assert [record.getMessage() for record in collector.records] == \
+        ["message", "suppressed 1 similar messages: message", "message"]
+
+
+def test_RateLimitFilter_sampling():
+    filter = filters.RateLimitFilter(sampling={"DEBUG": 0.0, "INFO": 1.0})
+    assert not filter.filter(makeRecord(level=logging.DEBUG))
+    assert filter.filter(makeRecord(level=logging.INFO))
+    assert filter.sampled == 1
+
+
+def test_RateLimitFilter_maxSites(collector):
+    filter, summaries = limit(collector, burst=1, maxSites=2)
+    for lineno in (1, 2, 2, 1, 3):
+        filter.filter(makeRecord(lineno=lineno))
+    assert list(filter.sites) == [("path", 1), ("path", 3)]
+    assert [(summary.lineno, summary.suppressed) for summary in summaries] == [(2, 1)]
+
+
+def test_RateLimitFilter_config():
+    logger = vlogging.getLogger("test.filters", config={
+        "filters": {"limit": filters.getRateLimitFilterConfig(1, 1)},
+        "loggers": {"test.filters": loggers.getLoggerConfig("DEBUG", [], filters=["limit"])},
+    })
+    try:
+        assert isinstance(logger.filters[0], filters.RateLimitFilter)
+        assert logger.callerInfo
+    finally:
+        logger.filters.clear()
+        vlogging.basicConfig()
@@ -1,9 +1,13 @@
+import json
+import logging
+import sys
 import pytest
+import vlogging
 from logging import LogRecord
 from datetime import datetime
 
-from vlogging import INFO
-from vlogging import formatters
+from vlogging import INFO, DEFAUT_FORMAT, DEFAUT_HANDLER
+from vlogging import formatters, handlers
 from vlogging.formatters import (
     SIMPLE_FORMAT,
     BASIC_FORMAT,
@@ -73,3 +77,207 @@ def test_formatTime_strftime(formatter, logRecord, datefmt):
     expected = dt.strftime(datefmt)
     print(formatTime, logRecord.created)
     assert formatTime == expected
+
+
+@pytest.mark.parametrize("created", [
+    1676010271.358123,
+    1676010271.9999996,
+    1676010271.0000004,
+    1676010271.0005,
+    1676010271.9995,
+    0.5,
+])
+@pytest.mark.parametrize("datefmt", [None, DATE_FMT_MICROSECONDS, "%H:%M:%S", "%f %H"])
+def test_formatTime_cached(formatter, logRecord, created, datefmt):
+    for value in (created, created + 0.25, created):
+        logRecord.created = value
+        dt = datetime.fromtimestamp(value)
+        if datefmt is None:
+            expected = dt.isoformat(sep=" ", timespec="milliseconds")
+        else:
+            expected = dt.strftime(datefmt)
+        assert formatter.formatTime(logRecord, datefmt) == expected
+
+
+@pytest.fixture
+def dstTimezone(monkeypatch):
+    time = pytest.importorskip("time")
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_formatTime_dst(formatter, logRecord, dstTimezone):
+    # 2023-11-05 01:xx happens twice in America/New_York.
+    start = 1699160400.0
+    for offset in range(0, 4 * 3600, 1799):
+        logRecord.created = start + offset + 0.123456
+        dt = datetime.fromtimestamp(logRecord.created)
+        assert formatter.formatTime(logRecord) == dt.isoformat(sep=" ", timespec="milliseconds")
+        assert formatter.formatTime(logRecord, DATE_FMT_MICROSECONDS) == dt.strftime(DATE_FMT_MICROSECONDS)
+
+
+def test_formatTime_rfc3339(formatter, logRecord):
+    logRecord.created = 1676010271.358923
+    assert formatter.formatTime(logRecord, formatters.DATE_FMT_RFC3339_UTC) == "2023-02-10T06:24:31.358Z"
+
+
+def test_formatTime_epoch(formatter, logRecord):
+    logRecord.created = 1676010271.358923
+    assert formatter.formatTime(logRecord, formatters.DATE_FMT_EPOCH) == "1676010271.358923"
+
+
+@pytest.fixture
+def messageRecord():
+    return LogRecord("vlogger", INFO, "path", 1, "Message %s", ("args",), exc_info=None)
+
+
+@pytest.mark.parametrize("format, style", [
+    (SIMPLE_FORMAT, "%"),
+    (BASIC_FORMAT, "%"),
+    ("%(levelno)05d %(created).3f %% %(name)r", "%"),
+    ("%(message)s", "%"),
+    ("{asctime} {levelname:<8} {filename}:{lineno}: {message}", "{"),
+    ("{levelno:>5d} {name!r} {{literal}}", "{"),
+    ("${asctime} ${levelname} $message $$ 100%", "$"),
+])
+def test_compileFormat(messageRecord, format, style):
+    render, fields = formatters.compileFormat(format, style)
+    assert render is not None
+    messageRecord.asctime = "2023-02-10 15:24:31.358"
+    messageRecord.message = messageRecord.getMessage()
+    expected = logging.Formatter(format, style=style).formatMessage(messageRecord)
+    assert render(messageRecord) == expected
+    assert "message" in fields or "message" not in format
+
+
+@pytest.mark.parametrize("format, style", [
+    ("%(message)s %d", "%"),
+    ("{message.upper}", "{"),
+    ("{message:{width}}", "{"),
+])
+def test_compileFormat_fallback(format, style):
+    assert formatters.compileFormat(format, style) == (None, None)
+
+
+@pytest.mark.parametrize("format, style", [
+    (SIMPLE_FORMAT, "%"),
+    (BASIC_FORMAT, "%"),
+    ("{asctime} {levelname:<8} {message}", "{"),
+    ("$asctime $levelname $message", "$"),
+])
+def test_Formatter_format(messageRecord, format, style):
+    expected = logging.Formatter(format, style=style)
+    expected.formatTime = Formatter().formatTime
+    assert Formatter(format, style=style).format(messageRecord) == expected.format(messageRecord)
+
+
+def test_Formatter_missing_field(messageRecord):
+    with pytest.raises(ValueError):
+        Formatter("%(missing)s").format(messageRecord)
+
+
+def test_JsonFormatter(messageRecord):
+    formatter = formatters.JsonFormatter(BASIC_FORMAT, extras=["requestId", "missing"],
+                                         static={"service": "api", "version": 2})
+    messageRecord.requestId = "req-あ\"1\""
+    expected = {
+        "asctime": formatter.formatTime(messageRecord),
+        "levelname": "INFO",
+        "filename": "path",
+        "lineno": 1,
+        "message": "Message args",
+        "requestId": "req-あ\"1\"",
+        "service": "api",
+        "version": 2,
+    }
+    assert formatter.format(messageRecord) == json.dumps(expected)
+
+
+def test_JsonFormatter_fields(messageRecord):
+    formatter = formatters.JsonFormatter(fields=["name", "levelno", "created", "args"],
+                                         ensureAscii=False)
+    assert json.loads(formatter.format(messageRecord)) == {
+        "name": "vlogger", "levelno": INFO, "created": messageRecord.created, "args": ["args"]}
+    assert formatter.usesTime() is False
+    assert formatters.JsonFormatter().jsonFields == list(formatters.JSON_FIELDS)
+
+
+def test_JsonFormatter_exception(messageRecord):
+    formatter = formatters.JsonFormatter(SIMPLE_FORMAT)
+    try:
+        raise ValueError("failure")
+    except ValueError:
+        messageRecord.exc_info = sys.exc_info()
+    data = json.loads(formatter.format(messageRecord))
+    assert data["exc_info"].endswith("ValueError: failure")
+
+
+def test_JsonFormatter_config(tmp_path):
+    filename = str(tmp_path / "json.log")
+    vlogging.getLogger(config={
+        "formatters": {
+            DEFAUT_FORMAT: formatters.getFormatConfig(
+                SIMPLE_FORMAT, className="vlogging.formatters.JsonFormatter",
+                extras=["requestId"], static={"service": "api"}),
+        },
+        "handlers": {
+            DEFAUT_HANDLER: handlers.getFileHandlerConfig(filename, formatter=DEFAUT_FORMAT),
+        },
+    })
+    vlogging.info("message", extra={"requestId": 7})
+    vlogging.basicConfig()
+    with open(filename) as f:
+        data = json.loads(f.read())
+    assert data["message"] == "message"
+    assert data["requestId"] == 7
+    assert data["service"] == "api"
+
+
+def raiseChained(message):
+    try:
+        int("x")
+    except ValueError as e:
+        try:
+            raise KeyError(message) from e
+        except KeyError:
+            raise RuntimeError(message)
+
+
+def catch(function, *args):
+    try:
+        function(*args)
+    except Exception:
+        return sys.exc_info()
+
+
+def test_Formatter_formatException_cached():
+    formatter = Formatter()
+    expected = logging.Formatter().formatException(catch(raiseChained, "first"))
+    assert formatter.formatException(catch(raiseChained, "first")) == expected
+    text = formatter.formatException(catch(raiseChained, "second"))
+    assert text == expected.replace("first", "second")
+    assert len(formatter._tracebacks) == 1
+    assert Formatter(tracebackCacheSize=0).formatException(catch(raiseChained, "first")) == expected
+
+
+def test_Formatter_formatException_lru():
+    formatter = Formatter(tracebackCacheSize=1)
+    formatter.formatException(catch(raiseChained, "first"))
+    formatter.formatException(catch(int, "x"))
+    assert len(formatter._tracebacks) == 1
+
+
+def test_Formatter_formatException_compact():
+    formatter = Formatter(compactTracebacks=True)
+    first = formatter.formatException(catch(raiseChained, "first"))
+    assert first.startswith("Traceback #1 (most recent call last):")
+    assert first.endswith("RuntimeError: first")
+    second = formatter.formatException(catch(raiseChained, "second"))
+    assert second == "Traceback: same traceback as #1\nRuntimeError: second"
+    with pytest.raises(ValueError):
+        Formatter(tracebackCacheSize=0, compactTracebacks=True)
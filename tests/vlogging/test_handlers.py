@@ -1,7 +1,14 @@
+import gzip
+import logging
+import os
 import sys
+import threading
+import time
 import pytest
-from vlogging import handlers
+import vlogging
+from vlogging import binary, handlers
 from vlogging import DEFAUT_FORMAT
+from vlogging.formatters import DATE_FMT_MICROSECONDS, Formatter
 
 @pytest.mark.parametrize("className, level, formatter, filters", [
     ("vlogging.handlers.ConsoleHandler", "DEBUG", DEFAUT_FORMAT, []),
@@ -50,6 +57,89 @@ def test_ConsoleHandler(stream):
         assert handler.stream == stream
 
 
+def test_getRawConsoleHandlerConfig():
+    config = handlers.getRawConsoleHandlerConfig("INFO", DEFAUT_FORMAT, nonBlocking=True)
+    assert config["class"] == "vlogging.handlers.RawConsoleHandler"
+    assert config["stream"] == "ext://sys.stderr"
+    assert config["nonBlocking"] is True
+
+
+def test_RawConsoleHandler():
+    read, write = os.pipe()
+    handler = handlers.RawConsoleHandler(write)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.handle(logging.makeLogRecord({"msg": "h\u00e9llo"}))
+    handler.close()
+    os.close(write)
+    assert os.read(read, 100) == "h\u00e9llo\n".encode("utf-8")
+    os.close(read)
+
+
+def test_RawConsoleHandler_nonBlocking():
+    read, write = os.pipe()
+    handler = handlers.RawConsoleHandler(write, nonBlocking=True, maxPending=10000)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    count = 2000
+    for i in range(count):
+        handler.handle(logging.makeLogRecord({"msg": "x" * 99}))
+    assert handler.dropped > 0
+    chunks = []
+    def readAll():
+        while True:
+            chunk = os.read(read, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    reader = threading.Thread(target=readAll)
+    reader.start()
+    handler.close()
+    os.close(write)
+    reader.join()
+    os.close(read)
+    lines = b"".join(chunks).split(b"\n")
+    assert lines.pop() == b""
+    assert len(lines) == count - handler.dropped
+    assert set(lines) == {b"x" * 99}
+    assert handler.pendingSize == 0
+
+
+def test_RawConsoleHandler_blocking_batches():
+    read, write = os.pipe()
+    handler = handlers.RawConsoleHandler(write)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    writes = []
+    handler._write = writes.append
+    handler._writeLock.acquire()
+    threads = [threading.Thread(target=handler.handle,
+                                args=(logging.makeLogRecord({"msg": str(i)}),))
+               for i in range(3)]
+    for thread in threads:
+        thread.start()
+    while len(handler.pending) < 3:
+        time.sleep(0.001)
+    handler._writeLock.release()
+    for thread in threads:
+        thread.join()
+    handler.close()
+    os.close(write)
+    os.close(read)
+    assert len(writes) == 1
+    assert sorted(writes[0].split()) == [b"0", b"1", b"2"]
+
+
+def test_RawConsoleHandler_resetAfterFork():
+    read, write = os.pipe()
+    handler = handlers.RawConsoleHandler(write)
+    handler.pending.append(b"written by the parent\n")
+    handler._writeLock.acquire()
+    handler._resetAfterFork()
+    assert handler.pending == [] and handler.pendingSize == 0
+    assert not handler._writeLock.locked()
+    handler.close()
+    os.close(write)
+    os.close(read)
+
+
 @pytest.mark.parametrize("mode", ["a", "a+"])
 @pytest.mark.parametrize("encoding", [None, "utf-8"])
 @pytest.mark.parametrize("delay", [True, False])
@@ -57,3 +147,523 @@ def test_FileHandler(log_file, mode, encoding, delay):
     print(log_file)
     handler = handlers.FileHandler(log_file, mode, encoding, delay)
     assert handler.baseFilename == log_file
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, block=None):
+        super().__init__()
+        self.records = []
+        self.block = block
+
+    def emit(self, record):
+        if self.block is not None:
+            self.block.wait()
+        self.records.append(record.getMessage())
+
+
+def makeRecord(msg, *args):
+    return logging.LogRecord("vlogger", logging.INFO, "path", 1, msg, args, None)
+
+
+def test_getQueueHandlerConfig():
+    config = handlers.getQueueHandlerConfig(["target"], 10, handlers.OVERFLOW_DROP_OLDEST)
+    assert config.get("class") == "vlogging.handlers.QueueHandler"
+    assert config.get("targets") == ["target"]
+    assert config.get("maxsize") == 10
+    assert config.get("overflow") == handlers.OVERFLOW_DROP_OLDEST
+
+
+def test_QueueHandler():
+    target = ListHandler()
+    handler = handlers.QueueHandler([target])
+    for i in range(100):
+        handler.handle(makeRecord("message %d", i))
+    handler.flush()
+    assert target.records == [f"message {i}" for i in range(100)]
+    handler.close()
+
+
+def test_handle_replacement_record(tmp_path):
+    # Filters may return a replacement record since Python 3.12.
+    target = ListHandler()
+    filename = str(tmp_path / "append.log")
+    for handler in (handlers.QueueHandler([target]), handlers.AppendFileHandler(filename, "w")):
+        handler.filter = lambda record: makeRecord("replaced")
+        assert handler.handle(makeRecord("original"))
+        handler.close()
+    assert target.records == ["replaced"]
+    assert readFile(filename) == "replaced\n"
+
+
+def test_QueueHandler_prepare():
+    handler = handlers.QueueHandler([])
+    try:
+        raise ValueError("failed")
+    except ValueError:
+        record = makeRecord("message %d", 1)
+        record.exc_info = sys.exc_info()
+    prepared = handler.prepare(record)
+    handler.close()
+    assert prepared is not record
+    assert (prepared.msg, prepared.args, prepared.exc_info) == ("message 1", None, None)
+    assert prepared.exc_text.endswith("ValueError: failed")
+    assert (record.msg, record.args) == ("message %d", (1,))
+    assert record.exc_info[0] is ValueError and record.exc_text is None
+
+
+@pytest.mark.parametrize("overflow, expected", [
+    (handlers.OVERFLOW_DROP_NEWEST, ["message 0", "message 1", "message 2"]),
+    (handlers.OVERFLOW_DROP_OLDEST, ["message 0", "message 3", "message 4"]),
+])
+def test_QueueHandler_overflow(overflow, expected):
+    block = threading.Event()
+    target = ListHandler(block)
+    handler = handlers.QueueHandler([target], maxsize=2, overflow=overflow)
+    handler.handle(makeRecord("message 0"))
+    while handler.queue.qsize():
+        time.sleep(0.001)
+    for i in range(1, 5):
+        handler.handle(makeRecord("message %d", i))
+    block.set()
+    handler.close()
+    assert target.records == expected
+    assert handler.dropped == 2
+
+
+def test_QueueHandler_unknown_overflow():
+    with pytest.raises(ValueError):
+        handlers.QueueHandler([], overflow="unknown")
+
+
+def test_getFlightRecorderHandlerConfig():
+    config = handlers.getFlightRecorderHandlerConfig(["target"], 10, "WARNING")
+    assert config.get("class") == "vlogging.handlers.FlightRecorderHandler"
+    assert config.get("targets") == ["target"]
+    assert config.get("capacity") == 10
+    assert config.get("triggerLevel") == "WARNING"
+
+
+def test_FlightRecorderHandler():
+    target = ListHandler()
+    handler = handlers.FlightRecorderHandler([target], capacity=3, triggerLevel="ERROR")
+    for i in range(5):
+        handler.handle(makeRecord("message %d", i))
+    assert target.records == []
+    record = makeRecord("failed")
+    record.levelno = logging.ERROR
+    handler.handle(record)
+    assert target.records == ["message 2", "message 3", "message 4", "failed"]
+    assert len(handler.buffer) == 0
+    handler.handle(makeRecord("message 5"))
+    assert handler.dump() == 1
+    assert target.records[-1] == "message 5"
+
+
+def test_FlightRecorderHandler_record():
+    records = []
+    target = logging.Handler()
+    target.emit = records.append
+    target.setLevel(logging.INFO)
+    handler = handlers.FlightRecorderHandler([target])
+    logger = logging.Logger("test.handlers.recorder", logging.DEBUG)
+    logger.addHandler(handler)
+    logger.debug("skipped by target level")
+    try:
+        raise ValueError("failed")
+    except ValueError:
+        logger.info("kept", exc_info=True)
+    logger.error("trigger")
+    kept, trigger = records
+    assert kept.getMessage() == "kept"
+    assert kept.levelname == "INFO"
+    assert kept.filename == "test_handlers.py"
+    assert kept.funcName == "test_FlightRecorderHandler_record"
+    assert "ValueError: failed" in kept.exc_text
+    assert trigger.getMessage() == "trigger"
+
+
+def test_basicConfig_async(tmp_path):
+    filename = str(tmp_path / "async.log")
+    vlogging.basicConfig(filename=filename, async_=True, format="%(message)s")
+    vlogging.info("async message")
+    handler = logging.getLogger(vlogging.DEFAUT_LOGGER).handlers[0]
+    assert isinstance(handler, handlers.QueueHandler)
+    handler.flush()
+    with open(filename) as f:
+        assert f.read() == "async message\n"
+    vlogging.basicConfig()
+
+
+def test_getFileHandlerConfig_buffered(log_file):
+    config = handlers.getFileHandlerConfig(log_file, buffered=True, bufferRecords=10,
+                                           fsync=handlers.FSYNC_BATCH)
+    assert config.get("class") == "vlogging.handlers.BufferedFileHandler"
+    assert config.get("bufferRecords") == 10
+    assert config.get("fsync") == handlers.FSYNC_BATCH
+
+
+def readFile(filename):
+    with open(filename) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("fsync", [handlers.FSYNC_NEVER, handlers.FSYNC_BATCH, 10])
+def test_BufferedFileHandler(tmp_path, fsync):
+    filename = str(tmp_path / "buffered.log")
+    handler = handlers.BufferedFileHandler(filename, bufferRecords=3, flushInterval=0,
+                                           fsync=fsync)
+    handler.handle(makeRecord("message 1"))
+    handler.handle(makeRecord("message 2"))
+    assert readFile(filename) == ""
+    handler.handle(makeRecord("message 3"))
+    assert readFile(filename) == "message 1\nmessage 2\nmessage 3\n"
+    handler.handle(makeRecord("message 4"))
+    handler.close()
+    assert readFile(filename).endswith("message 4\n")
+
+
+@pytest.mark.parametrize("handlerClass", [handlers.BufferedFileHandler,
+                                          handlers.ThreadBufferedFileHandler])
+def test_BufferedFileHandler_fsync_interval(tmp_path, monkeypatch, handlerClass):
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+    filename = str(tmp_path / "buffered.log")
+    handler = handlerClass(filename, bufferRecords=1, flushInterval=0, fsync=60000)
+    handler.handle(makeRecord("message"))
+    assert readFile(filename) == "message\n"
+    assert synced == []
+    handler.close()
+    assert len(synced) == 1
+    handler = handlerClass(filename, bufferRecords=1, flushInterval=0, fsync=10)
+    handler._lastSync = time.monotonic()
+    handler.handle(makeRecord("message"))
+    for _ in range(500):
+        if len(synced) == 2:
+            break
+        time.sleep(0.01)
+    assert len(synced) == 2
+    handler.close()
+
+
+def test_BufferedFileHandler_flushLevel(tmp_path):
+    filename = str(tmp_path / "buffered.log")
+    handler = handlers.BufferedFileHandler(filename, flushInterval=0, flushLevel="ERROR")
+    handler.handle(makeRecord("message"))
+    record = makeRecord("error")
+    record.levelno = logging.ERROR
+    handler.handle(record)
+    assert readFile(filename) == "message\nerror\n"
+    handler.close()
+
+
+def test_BufferedFileHandler_bufferSize(tmp_path):
+    filename = str(tmp_path / "buffered.log")
+    handler = handlers.BufferedFileHandler(filename, encoding="utf-8", bufferSize=12,
+                                           flushInterval=0)
+    assert handler.encodedSize("\u00fc\u00fc") == 4
+    handler.handle(makeRecord("message"))
+    assert readFile(filename) == ""
+    handler.handle(makeRecord("\u00fc\u00fc"))
+    assert readFile(filename) == "message\n\u00fc\u00fc\n"
+    handler.close()
+
+
+def test_BufferedFileHandler_flushInterval(tmp_path):
+    filename = str(tmp_path / "buffered.log")
+    handler = handlers.BufferedFileHandler(filename, flushInterval=0.01)
+    handler.handle(makeRecord("message"))
+    for _ in range(500):
+        if readFile(filename):
+            break
+        time.sleep(0.01)
+    assert readFile(filename) == "message\n"
+    handler.close()
+
+
+def test_discardHandler(tmp_path):
+    filename = str(tmp_path / "buffered.log")
+    handler = handlers.BufferedFileHandler(filename, flushInterval=60)
+    thread = handler._thread
+    handler.handle(makeRecord("buffered by the parent"))
+    handlers.discardHandler(handler)
+    thread.join(1)
+    assert not thread.is_alive()
+    assert handler not in handlers._backgroundHandlers
+    handler.flush()
+    handler.close()
+    assert readFile(filename) == ""
+    handler.stream.close()
+
+
+def test_ThreadBufferedFileHandler(tmp_path):
+    filename = str(tmp_path / "threads.log")
+    config = handlers.getFileHandlerConfig(filename, buffered=handlers.BUFFERED_THREAD)
+    assert config.get("class") == "vlogging.handlers.ThreadBufferedFileHandler"
+    handler = handlers.ThreadBufferedFileHandler(filename, flushInterval=0)
+    def write(name):
+        for i in range(100):
+            record = makeRecord("%s %03d", name, i)
+            record.created = i + ord(name) / 1000
+            handler.handle(record)
+    threads = [threading.Thread(target=write, args=(name,)) for name in "abcd"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert readFile(filename) == ""
+    handler.flush()
+    assert handler._buffers == []
+    expected = "".join(f"{name} {i:03d}\n" for i in range(100) for name in "abcd")
+    assert readFile(filename) == expected
+    handler.close()
+
+
+def test_ThreadBufferedFileHandler_bufferRecords(tmp_path):
+    filename = str(tmp_path / "threads.log")
+    handler = handlers.ThreadBufferedFileHandler(filename, bufferRecords=2, flushInterval=0)
+    handler.handle(makeRecord("message 1"))
+    assert readFile(filename) == ""
+    handler.handle(makeRecord("message 2"))
+    assert readFile(filename) == "message 1\nmessage 2\n"
+    handler.handle(makeRecord("message 3"))
+    handler.close()
+    assert readFile(filename).endswith("message 3\n")
+
+
+def test_ThreadBufferedFileHandler_bufferSize(tmp_path):
+    filename = str(tmp_path / "threads.log")
+    handler = handlers.ThreadBufferedFileHandler(filename, bufferSize=20, flushInterval=0)
+    handler.handle(makeRecord("message 1"))
+    assert readFile(filename) == ""
+    handler.handle(makeRecord("message 2"))
+    assert readFile(filename) == "message 1\nmessage 2\n"
+    handler.handle(makeRecord("message 3"))
+    assert readFile(filename) == "message 1\nmessage 2\n"
+    handler.close()
+
+
+def test_ThreadBufferedFileHandler_resetAfterFork(tmp_path):
+    filename = str(tmp_path / "threads.log")
+    handler = handlers.ThreadBufferedFileHandler(filename, flushInterval=0)
+    assert handler._thread is None and handler in handlers._backgroundHandlers
+    # As if another thread was adding its buffer when the process forked.
+    handler._buffersLock.acquire()
+    handler._resetAfterFork()
+    handler.handle(makeRecord("message"))
+    handler.close()
+    assert readFile(filename) == "message\n"
+
+
+def test_getMmapFileHandlerConfig(log_file):
+    config = handlers.getMmapFileHandlerConfig(log_file, "w", "utf-8", chunkSize=4096)
+    assert config.get("class") == "vlogging.handlers.MmapFileHandler"
+    assert config.get("filename") == log_file
+    assert config.get("mode") == "w"
+    assert config.get("encoding") == "utf-8"
+    assert config.get("chunkSize") == 4096
+
+
+def test_MmapFileHandler(tmp_path):
+    filename = str(tmp_path / "mmap.log")
+    handler = handlers.MmapFileHandler(filename, "w", chunkSize=1)
+    lines = [f"message {i} " + "x" * (i % 200) for i in range(2000)]
+    for line in lines:
+        handler.handle(makeRecord(line))
+    handler.close()
+    assert readFile(filename) == "".join(line + "\n" for line in lines)
+
+    handler = handlers.MmapFileHandler(filename, "a")
+    handler.handle(makeRecord("appended"))
+    handler.flush()
+    handler.mmap.close()
+    handler.mmap = None
+    os.close(handler.fd)
+    handler.fd = None
+    # The file still has the preallocated zero bytes, as after a crash.
+    handler = handlers.MmapFileHandler(filename, "a")
+    handler.handle(makeRecord("after crash"))
+    handler.close()
+    assert readFile(filename).endswith("message 1999 " + "x" * 199 + "\nappended\nafter crash\n")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_MmapFileHandler_fork(tmp_path):
+    filename = str(tmp_path / "mmap.log")
+    handler = handlers.MmapFileHandler(filename, "w")
+    handler.handle(makeRecord("before fork"))
+    pids = []
+    for write in (False, True):
+        pid = os.fork()
+        if pid == 0:
+            if write:
+                handler.handle(makeRecord("child"))
+            handler.close()
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    handler.handle(makeRecord("after fork"))
+    handler.close()
+    assert readFile(filename) == "before fork\nafter fork\n"
+    assert readFile(f"{filename}.{pids[1]}") == "child\n"
+    assert not os.path.exists(f"{filename}.{pids[0]}")
+
+
+def test_getRotatingFileHandlerConfig(log_file):
+    config = handlers.getRotatingFileHandlerConfig(log_file, maxBytes=100, backupCount=3)
+    assert config.get("class") == "vlogging.handlers.RotatingFileHandler"
+    assert config.get("maxBytes") == 100
+    assert config.get("backupCount") == 3
+    assert config.get("compress") is True
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_RotatingFileHandler(tmp_path, compress):
+    filename = str(tmp_path / "rotating.log")
+    handler = handlers.RotatingFileHandler(filename, maxBytes=100, backupCount=3,
+                                           compress=compress)
+    for i in range(50):
+        handler.handle(makeRecord("message %02d", i))
+    handler.waitForCompression()
+    handler.close()
+    segments = handler.getSegments()
+    assert len(segments) == 3
+    assert all(path.endswith(".gz") == compress for path in segments)
+    opener = gzip.open if compress else open
+    with opener(segments[-1], "rt") as f:
+        lines = f.read().splitlines()
+    assert readFile(filename).splitlines()[0] == "message %02d" % (int(lines[-1][-2:]) + 1)
+
+
+def test_RotatingFileHandler_maxBytes(tmp_path):
+    filename = str(tmp_path / "rotating.log")
+    handler = handlers.RotatingFileHandler(filename, encoding="utf-8", maxBytes=12,
+                                           compress=False)
+    handler.handle(makeRecord("\u00fc\u00fc\u00fc"))
+    handler.handle(makeRecord("\u00fc\u00fc\u00fc"))
+    handler.waitForCompression()
+    handler.close()
+    assert len(handler.getSegments()) == 1
+    assert os.path.getsize(filename) == handler.size == 7
+
+
+def test_RotatingFileHandler_mode_w(tmp_path):
+    filename = str(tmp_path / "rotating.log")
+    with open(filename, "w") as f:
+        f.write("x" * 1000)
+    handler = handlers.RotatingFileHandler(filename, "w", delay=True, maxBytes=100)
+    assert handler.size == 0
+    handler.handle(makeRecord("message"))
+    handler.close()
+    assert handler.getSegments() == []
+    assert readFile(filename) == "message\n"
+
+
+def test_RotatingFileHandler_interval(tmp_path):
+    filename = str(tmp_path / "rotating.log")
+    handler = handlers.RotatingFileHandler(filename, interval=60)
+    handler.handle(makeRecord("before"))
+    record = makeRecord("after")
+    record.created += 120
+    handler.handle(record)
+    handler.waitForCompression()
+    handler.close()
+    assert readFile(filename) == "after\n"
+    with gzip.open(handler.getSegments()[0], "rt") as f:
+        assert f.read() == "before\n"
+
+
+@pytest.mark.parametrize("getConfig, className", [
+    (handlers.getAppendFileHandlerConfig, "vlogging.handlers.AppendFileHandler"),
+    (handlers.getShardedFileHandlerConfig, "vlogging.handlers.ShardedFileHandler"),
+])
+def test_getMultiprocessFileHandlerConfig(log_file, getConfig, className):
+    config = getConfig(log_file, "a", "utf-8")
+    assert config.get("class") == className
+    assert config.get("filename") == log_file
+    assert config.get("encoding") == "utf-8"
+
+
+def writeRecords(handler, name, count, size):
+    for i in range(count):
+        handler.handle(makeRecord("%s %04d %s", name, i, "x" * size))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+@pytest.mark.parametrize("size", [10, 10000])
+def test_AppendFileHandler(tmp_path, size):
+    filename = str(tmp_path / "append.log")
+    handler = handlers.AppendFileHandler(filename, "w")
+    pids = []
+    for name in ("a", "b", "c", "d"):
+        pid = os.fork()
+        if pid == 0:
+            writeRecords(handler, name, 200, size)
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    handler.close()
+    lines = readFile(filename).splitlines()
+    assert len(lines) == 800
+    assert all(len(line) == 7 + size for line in lines)
+
+
+def test_AppendFileHandler_reopen(tmp_path, monkeypatch):
+    filename = str(tmp_path / "append.log")
+    handler = handlers.AppendFileHandler(filename, "w")
+    closed = []
+    close = os.close
+    monkeypatch.setattr(os, "close", lambda fd: (closed.append(fd), close(fd)))
+    handler.pid = -1  # As if the process had forked.
+    threads = [threading.Thread(target=writeRecords, args=(handler, name, 50, 10))
+               for name in "abcd"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    handler.close()
+    assert len(closed) == 2
+    assert len(readFile(filename).splitlines()) == 200
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_ShardedFileHandler(tmp_path):
+    filename = str(tmp_path / "shard.log")
+    handler = handlers.ShardedFileHandler(filename)
+    handler.setFormatter(Formatter("%(asctime)s %(message)s", DATE_FMT_MICROSECONDS))
+    pids = []
+    for name in ("a", "b", "c"):
+        pid = os.fork()
+        if pid == 0:
+            writeRecords(handler, name, 100, 1)
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    handler.close()
+    assert all(os.path.exists(handler.getShardFilename(pid)) for pid in pids)
+    merged = handlers.mergeShardFiles(filename, remove=True)
+    lines = readFile(merged).splitlines()
+    assert len(lines) == 300
+    assert lines == sorted(lines, key=lambda line: line[:26])
+    assert not any(os.path.exists(handler.getShardFilename(pid)) for pid in pids)
+
+
+def test_BinaryFileHandler(tmp_path):
+    filename = str(tmp_path / "vlogging.vlog")
+    for mode in ("w", "a"):
+        handler = handlers.BinaryFileHandler(filename, mode)
+        handler.handle(makeRecord("value %d", 1))
+        try:
+            raise ValueError("failed")
+        except ValueError:
+            record = makeRecord("error")
+            record.levelno = logging.ERROR
+            record.exc_info = sys.exc_info()
+        handler.handle(record)
+        handler.close()
+    with open(filename, "rb") as stream:
+        records = list(binary.Decoder(stream))
+    assert [record.getMessage() for record in records] == ["value 1", "error"] * 2
+    assert "ValueError: failed" in records[1].exc_text
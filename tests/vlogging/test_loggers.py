@@ -1,6 +1,11 @@
+import logging
+import os
+import sys
 import pytest
+import vlogging
 from vlogging import loggers
-from vlogging import DEFAUT_HANDLER
+from vlogging import DEFAUT_HANDLER, DEFAUT_LOGGER
+from vlogging.formatters import SIMPLE_FORMAT, BASIC_FORMAT
 
 @pytest.mark.parametrize("level, handlers, propagate, filters", [
     ("DEBUG", [DEFAUT_HANDLER], None, None),
@@ -13,3 +18,236 @@ def test_getLoggerConfig(level, handlers, propagate, filters):
     assert config.get("handlers", None) == handlers
     assert config.get("propagate", None) == propagate
     assert config.get("filters", None) == filters
+
+
+@pytest.fixture
+def records():
+    records = []
+    class Collector(logging.StreamHandler):
+        def emit(self, record):
+            records.append(record)
+    collector = Collector()
+    loggers.setFieldSkipping(True)
+    yield records, collector
+    loggers.setFieldSkipping(False)
+    vlogging.basicConfig()
+
+
+def configure(collector, format):
+    vlogging.basicConfig(format=format)
+    logger = vlogging.getLogger("test.loggers.fields")
+    handler = logging.getLogger(DEFAUT_LOGGER).handlers[0]
+    collector.setFormatter(handler.formatter)
+    logger.handlers[:] = [collector]
+    logger.propagate = False
+    # pytest attaches its own capture handlers to the root logger.
+    root = logging.getLogger()
+    saved, root.handlers = root.handlers, []
+    try:
+        loggers.updateLoggerFields()
+    finally:
+        root.handlers = saved
+    return logger
+
+
+def test_Logger_simple_format_skips_caller(records):
+    records, collector = records
+    logger = configure(collector, SIMPLE_FORMAT)
+    logger.info("message")
+    assert logger.fields == frozenset(("asctime", "levelname", "message"))
+    assert records[-1].lineno == 0
+    assert records[-1].threadName is not None
+    assert logging.logThreads
+
+
+def test_Logger_handler_added_after_configure(records):
+    records, collector = records
+    logger = configure(collector, SIMPLE_FORMAT)
+    second = logging.StreamHandler(open(os.devnull, "w"))
+    second.setFormatter(logging.Formatter(BASIC_FORMAT))
+    logger.addHandler(second)
+    try:
+        logger.info("message"); lineno = sys._getframe().f_lineno
+    finally:
+        logger.removeHandler(second)
+        second.stream.close()
+    assert records[-1].lineno == lineno
+    assert records[-1].filename == os.path.basename(__file__)
+    logger.info("message")
+    assert records[-1].lineno == 0
+
+
+def test_Logger_fields_per_logger(records):
+    records, collector = records
+    logger = configure(collector, SIMPLE_FORMAT)
+    other = logging.getLogger("test.loggers.other")
+    root = logging.getLogger()
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(logging.Formatter(BASIC_FORMAT))
+    saved, root.handlers = root.handlers, [handler]
+    try:
+        loggers.updateLoggerFields()
+        assert other.callerInfo
+        assert "findCaller" not in other.__dict__
+        assert not logger.callerInfo
+    finally:
+        root.handlers = saved
+        handler.stream.close()
+
+
+def test_Logger_fields_disabled_by_default():
+    vlogging.basicConfig(format=SIMPLE_FORMAT)
+    try:
+        logger = vlogging.getLogger("test.loggers.default")
+        assert "findCaller" not in logger.__dict__
+        assert logger.callerInfo
+    finally:
+        vlogging.basicConfig()
+
+
+def test_Logger_basic_format_finds_caller(records):
+    records, collector = records
+    logger = configure(collector, BASIC_FORMAT)
+    logger.info("message"); lineno = sys._getframe().f_lineno
+    assert records[-1].lineno == lineno
+    assert records[-1].filename == os.path.basename(__file__)
+
+
+def test_Logger_stack_info_without_caller(records):
+    records, collector = records
+    logger = configure(collector, SIMPLE_FORMAT)
+    logger.info("message", stack_info=True)
+    assert records[-1].stack_info.startswith("Stack (most recent call last):")
+    assert __file__ in records[-1].stack_info
+
+
+@pytest.mark.parametrize("filter, expected", [
+    (logging.Filter("name"), frozenset(("name",))),
+    (lambda record: True, None),
+])
+def test_getFilterFields(filter, expected):
+    assert loggers.getFilterFields(filter) == expected
+
+
+def test_Logger_rebind():
+    parent = logging.getLogger("test.loggers.rebind")
+    child = logging.getLogger("test.loggers.rebind.child")
+    parent.setLevel(logging.WARNING)
+    assert child.debug is loggers.disabledCall
+    assert child.info is loggers.disabledCall
+    assert "warning" not in child.__dict__
+    assert logging.getLogger("test.loggers.rebind.new").debug is loggers.disabledCall
+    parent.setLevel(logging.DEBUG)
+    assert "debug" not in child.__dict__
+    logging.disable(logging.ERROR)
+    try:
+        assert child.error is loggers.disabledCall
+        assert child.exception is loggers.disabledCall
+        assert "critical" not in child.__dict__
+    finally:
+        logging.disable(logging.NOTSET)
+    assert "error" not in child.__dict__
+
+
+def test_Logger_rebind_subtree(monkeypatch):
+    parent = logging.getLogger("test.loggers.subtree")
+    child = logging.getLogger("test.loggers.subtree.child")
+    logging.getLogger("test.loggers.subtreeOther")
+    rebound = []
+    rebind = loggers.Logger.rebind
+    monkeypatch.setattr(loggers.Logger, "rebind",
+                        lambda self: (rebound.append(self.name), rebind(self)))
+    parent.setLevel(logging.WARNING)
+    assert sorted(rebound) == [parent.name, child.name]
+    assert child.info is loggers.disabledCall
+    parent.setLevel(logging.DEBUG)
+    assert "info" not in child.__dict__
+    parent.setLevel(logging.NOTSET)
+
+
+def test_module_functions_rebind():
+    info = vlogging.info
+    try:
+        vlogging.basicConfig(level="ERROR")
+        assert vlogging.info is loggers.disabledCall
+        assert vlogging.warning is loggers.disabledCall
+        assert vlogging.error is not loggers.disabledCall
+        logging.getLogger(DEFAUT_LOGGER).setLevel(logging.DEBUG)
+        assert vlogging.info is info
+    finally:
+        vlogging.basicConfig()
+    assert vlogging.info is info
+
+
+def test_Logger_bind(records):
+    records, collector = records
+    logger = configure(collector, BASIC_FORMAT)
+    loggerCount = len(logging.Logger.manager.loggerDict)
+    configCount = len(vlogging._config.config["loggers"])
+    bound = logger.bind(requestId="r1").bind(tenant="t1")
+    bound.info("message %s", "arg"); lineno = sys._getframe().f_lineno
+    bound.debug("with extra", extra={"user": "u1"})
+    assert bound.name == logger.name
+    assert len(logging.Logger.manager.loggerDict) == loggerCount
+    assert len(vlogging._config.config["loggers"]) == configCount
+    first, second = records[-2:]
+    assert first.getMessage() == "message arg"
+    assert (first.requestId, first.tenant) == ("r1", "t1")
+    assert first.lineno == lineno
+    assert first.funcName == "test_Logger_bind"
+    assert second.user == "u1" and second.requestId == "r1"
+    assert bound.context == {"requestId": "r1", "tenant": "t1"}
+
+
+def test_Logger_bind_level(records):
+    records, collector = records
+    logger = configure(collector, SIMPLE_FORMAT)
+    bound = logger.bind(requestId="r1")
+    logger.setLevel(logging.WARNING)
+    try:
+        bound.info("hidden")
+        bound.warning("shown")
+    finally:
+        logger.setLevel(logging.DEBUG)
+    assert [record.getMessage() for record in records] == ["shown"]
+    assert records[-1].lineno == 0
+
+
+def test_Logger_bind_reserved():
+    with pytest.raises(KeyError):
+        vlogging.getLogger("test.loggers.bind").bind(message="reserved")
+
+
+def test_lazy(records):
+    records, collector = records
+    logger = configure(collector, SIMPLE_FORMAT)
+    second = logging.StreamHandler(open(os.devnull, "w"))
+    second.setFormatter(collector.formatter)
+    logger.addHandler(second)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    try:
+        logger.setLevel(logging.INFO)
+        logging.getLogger(DEFAUT_LOGGER).setLevel(logging.INFO)
+        logger.debug("skipped %s", vlogging.lazy(compute, "debug"))
+        vlogging.debug("skipped %s", vlogging.lazy(compute, "module"))
+        logger.info("%s %d %.1f %r", vlogging.lazy(compute, "info"), vlogging.lazy(int, "7"),
+                    vlogging.lazy(float, 2), vlogging.lazy(str, "text"))
+    finally:
+        logger.setLevel(logging.DEBUG)
+        logging.getLogger(DEFAUT_LOGGER).setLevel(logging.DEBUG)
+        logger.removeHandler(second)
+        second.stream.close()
+    assert calls == ["info"]
+    assert records[-1].getMessage() == "info 7 2.0 'text'"
+
+
+def test_lazy_format():
+    value = vlogging.lazy(lambda: 3.14159)
+    assert f"{value:.2f}" == "3.14"
+    assert "{}".format(vlogging.lazy(list, "ab")) == "['a', 'b']"
+    assert value.func is None
@@ -0,0 +1,103 @@
+import io
+import logging
+import pytest
+import vlogging
+from vlogging import filters, handlers, loggers, metrics
+
+
+@pytest.fixture
+def logger():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.set_name("test_metrics")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = vlogging.getLogger("test.metrics")
+    handlers, propagate = logger.handlers[:], logger.propagate
+    logger.handlers[:] = [handler]
+    logger.propagate = False
+    metrics.enable(sampleInterval=1)
+    metrics.reset()
+    yield logger
+    metrics.disable()
+    metrics.reset()
+    logger.handlers[:] = handlers
+    logger.propagate = propagate
+
+
+def test_stats(logger):
+    logger.info("message")
+    logger.warning("warnung \u00fc")
+    stats = vlogging.stats()
+    assert stats["enabled"]
+    assert stats["records"] == 2
+    assert stats["levels"] == {"INFO": 1, "WARNING": 1}
+    assert stats["loggers"]["test.metrics"] == {"INFO": 1, "WARNING": 1}
+    handler = stats["handlers"]["test_metrics"]
+    assert handler["class"] == "logging.StreamHandler"
+    assert handler["records"] == 2
+    assert handler["bytes"] == len("message\nwarnung \u00fc\n".encode())
+    for timing in ("emit", "format", "lockWait"):
+        assert handler[timing]["samples"] == 2
+        assert sum(handler[timing]["buckets"].values()) == 2
+    vlogging.resetStats()
+    stats = vlogging.stats()
+    assert stats["records"] == 0
+    assert stats["handlers"]["test_metrics"]["emit"]["samples"] == 0
+
+
+def test_stats_file_encoding(logger, tmp_path):
+    handler = handlers.FileHandler(str(tmp_path / "metrics.log"), encoding="latin-1")
+    handler.set_name("test_metrics_file")
+    handler.terminator = "\r\n"
+    logger.handlers.append(handler)
+    try:
+        logger.info("warnung \u00fc")
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+    assert vlogging.stats()["handlers"]["test_metrics_file"]["bytes"] == len("warnung \u00fc\r\n")
+
+
+def test_stats_sampled(logger):
+    metrics.enable(sampleInterval=10)
+    for i in range(25):
+        logger.info("message %d", i)
+    handler = vlogging.stats()["handlers"]["test_metrics"]
+    assert handler["records"] == 25
+    assert handler["emit"]["samples"] == 2
+
+
+def test_stats_errors_and_drops(logger, monkeypatch):
+    monkeypatch.setattr(logging, "raiseExceptions", False)
+    handler = logger.handlers[0]
+    handler.addFilter(filters.RateLimitFilter(rate=1, burst=1))
+    for arg in ("not a number", "dropped"):
+        logger.info("message %d", arg)
+    stats = vlogging.stats()["handlers"]["test_metrics"]
+    assert stats["errors"] == 1
+    assert stats["dropped"] == 1
+
+
+def test_stats_shared_filter(logger):
+    filter = filters.RateLimitFilter()
+    filter.dropped = 3
+    other = logging.StreamHandler(logger.handlers[0].stream)
+    logger.addHandler(other)
+    for target in (logger, *logger.handlers):
+        target.addFilter(filter)
+    try:
+        logger.info("message")
+        assert vlogging.stats()["dropped"] == 3
+    finally:
+        logger.removeHandler(other)
+        logger.removeFilter(filter)
+
+
+def test_disable(logger):
+    logger.info("message")
+    handler = logger.handlers[0]
+    assert "format" in handler.__dict__
+    metrics.disable()
+    assert loggers.Logger.callHandlers is logging.Logger.callHandlers
+    assert "format" not in handler.__dict__
+    assert not vlogging.stats()["enabled"]
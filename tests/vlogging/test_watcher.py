@@ -0,0 +1,58 @@
+##------------------------------------------------------------------------------
+## Usage:
+## pytest -s
+## pytest --durations=0 -v
+##------------------------------------------------------------------------------
+
+import os
+import pytest
+from vlogging import watcher
+
+
+def test_loadConfig_ini(tmp_path):
+    filename = tmp_path / "logging.ini"
+    filename.write_text(
+        "[handlers.queue]\n"
+        "class = vlogging.handlers.QueueHandler\n"
+        "targets = console, file\n"
+        "queueSize = 100\n"
+        "\n"
+        "[loggers.app.db]\n"
+        "level = DEBUG\n"
+        "propagate = false\n"
+    )
+    config = watcher.loadConfig(str(filename))
+    assert config == {
+        "handlers": {"queue": {"class": "vlogging.handlers.QueueHandler",
+                               "targets": ["console", "file"], "queueSize": 100}},
+        "loggers": {"app.db": {"level": "DEBUG", "propagate": False}},
+    }
+
+
+def test_loadConfig_unknown_section(tmp_path):
+    filename = tmp_path / "logging.ini"
+    filename.write_text("[handler]\nlevel = DEBUG\n")
+    with pytest.raises(ValueError):
+        watcher.loadConfig(str(filename))
+
+
+@pytest.mark.skipif(watcher.tomllib is None, reason="requires tomllib or tomli")
+def test_loadConfig_toml(tmp_path):
+    filename = tmp_path / "logging.toml"
+    filename.write_text('[loggers.vlogging]\nlevel = "INFO"\nhandlers = ["vlogging_handler"]\n')
+    assert watcher.loadConfig(str(filename)) == {
+        "loggers": {"vlogging": {"level": "INFO", "handlers": ["vlogging_handler"]}}}
+
+
+def test_ConfigWatcher_check(tmp_path):
+    filename = tmp_path / "logging.json"
+    applied = []
+    configWatcher = watcher.ConfigWatcher(str(filename), applied.append)
+    assert not configWatcher.check()
+    filename.write_text('{"loggers": {}}')
+    assert configWatcher.check()
+    assert not configWatcher.check()
+    filename.write_text('{"loggers": {"app": {}}}')
+    os.utime(filename, ns=(0, 0))
+    assert configWatcher.check()
+    assert applied == [{"loggers": {}}, {"loggers": {"app": {}}}]